@@ -0,0 +1,31 @@
+###########################################################################
+# Converts the sheets of each year's EOY workbook ('{year} EOY Data - USU.xlsx') to Parquet, once.
+# The output is one file per sheet and year, with the data types pinned in src/schemas.py:
+# - ./data/parquet/student/year=2017/part-0.parquet
+# - ./data/parquet/scram/year=2017/part-0.parquet
+# - ./data/parquet/course-master/year=2017/part-0.parquet
+# - ./data/parquet/course-membership/year=2017/part-0.parquet
+# - ./data/parquet/transcript-assessments/year=2017/part-0.parquet
+# - ... and the same for every other year
+#
+# Sheets already converted from the current version of a workbook are skipped, so this is cheap to re-run.
+# Use --force to convert every sheet again.
+
+import sys
+
+from src.config import years
+from src.parallel import map_years
+from src.workbooks import convert_workbook
+
+force = '--force' in sys.argv[1:]
+
+# Each year's workbook is parsed in its own worker process when AC_WORKERS is set (see src/parallel.py)
+converted = map_years(convert_workbook, years, force=force)
+
+for year, sheets in converted.items():
+    if sheets:
+        print(f'{year}: ' + ', '.join(f'{sheet_name} ({rows} rows)' for sheet_name, rows in sheets.items()))
+    else:
+        print(f'{year}: up to date')
+
+print("Workbooks converted to ./data/parquet")
@@ -1,43 +1,61 @@
 ###########################################################################
-# The code will output a single pickle file containing all student tables: student_data.pkl
-# This file includes two dictionaries:
-# 1. student_tables:
+# The code will output the student tables, one Arrow file per year: ./data/student_tables/year=[year]/part-0.arrow
+# Load them with the functions in src/students.py:
+# 1. student_tables = read_student_tables(years):
 #    - A dictionary where:
 #      - Keys: Years (e.g., 2017, 2018, 2022, etc.).
 #      - Values: DataFrames containing the full student table for each year.
 #    - Example: student_tables[2017] provides the full student table for 2017.
+#    - Use columns=[...] to only load the columns you need (e.g., read_student_tables(years, columns=['student_number'])).
 
 #======================================================
 # Filtering has been moved back to the begining of the process
 # IsOnePercent = Y has been filtered out of the data.
 #======================================================
 
+import os
+
 import pandas as pd
-import pickle
 
-# List of years to process
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.cache import read_cached_years, write_cached_years, year_keys
+from src.config import years
+from src.parallel import map_years
+from src.schemas import student_key_dtype
+from src.students import student_table_path, write_student_tables
+from src.workbooks import read_sheet, sheet_inputs
 
 ##########################################################################################################################################################
-# Columns to drop if they exist in the student_table. Some years are missing columns.
-# Not all the columns below exist in every year
-columns_to_drop = [
-    "ExitDate", "ResidentStatus", "KindergartenType", "EarlyGrad", "ReadGradeLevelFall", 
-    "ReadGradeLevelSpring", "Biliteracy1Level", "Biliteracy1Language", "Biliteracy2Level",
-    "Biliteracy2Language", "EarlyNumeracyStatusBOY", "EarlyNumeracyStatusMOY", 
-    "EarlyNumeracyStatusEOY", "EarlyNumeracyIntervention"
+# Columns to keep from the Student sheet. Only these columns are read, every other column is never loaded.
+# Not all the columns below exist in every year (missing columns are skipped)
+student_columns = [
+    # Used in this script
+    "StudentNumber", "GradeLevel",
+    # Used by 02_academic-table.py
+    "DaysAttended", "SchoolMembership", "CumulativeGPA", "ExcusedAbsences", "UnexcusedAbsences", "AbsencesDueToSuspension",
+    # Used by 03_demographic-table.py
+    "Gender", "LimitedEnglish", "HighSchlComplStatus", "ExitCode", "TribalAffiliation", "EllNativeLanguage",
+    "EllParentLanguage", "EllInstructionType", "Ethnicity", "AmerIndianAlaskan", "Asian", "BlackAfricanAmer",
+    "HawaiianPacificIsl", "White", "Migrant", "Services504", "MilitaryChild", "RefugeeStudent", "Immigrant",
+    "ReadingIntervention", "PassedCivicsExam", "ReadGradeLevel", "Gifted", "EntryDate", "FirstEnrollInUS",
+    "EllMonitoredEntryDate", "HomeStatus", "PartTimeHomeSchool"
 ]
 
-# Initialize dictionaries to store tables for all years
-student_tables = {} # Stores all students for each year
-
-# Start the for loop
-for year in years:
-    # Load the Excel file for the specific year
-    file_path = f'data/{year} EOY Data - USU.xlsx'
-    student = pd.read_excel(file_path, sheet_name='Student')
+##########################################################################################################################################################
+# Process one year of student data. Years are independent, so they can run in parallel worker processes (see src/parallel.py)
+def process_student_year(year):
+    """
+    Loads the Student and SCRAM sheets for a year and filters the student table down to one row per high school student.
+
+    Parameters:
+    - year (int): The year to process.
+
+    Returns:
+    - pd.DataFrame: The student table for the year.
+    """
+    # Load the Student sheet for the specific year
+    student = read_sheet(year, 'Student', columns=student_columns)
     # Load the scram data to filter out IsOnePercent = Y
-    scram = pd.read_excel(file_path, sheet_name='SCRAM')
+    scram = read_sheet(year, 'SCRAM', columns=['StudentNumber', 'IsOnePercent'])
     
     # Rename 'StudentNumber' to 'student_number' in all tables that contain 'student_number'
     student = student.rename(columns={'StudentNumber': 'student_number'})
@@ -47,14 +65,11 @@ for year in years:
     # Filter the student table down to 1 row per student. This will make everything easier moving forward
     # This is handling one year of data at a time, so this is filtering to one student_number per year
 
-    # Drop the columns from the list above. If the data does not contain that column ignore the error and continue.
-    student_table = student.drop(columns=[col for col in columns_to_drop if col in student.columns], errors='ignore')
-    
     # Create a table with student_number and IsOnePercent from the scram data
     scram_filter = scram[['student_number', 'IsOnePercent']].copy()
 
     # Merge the student table and the scram_filter table
-    student_table = pd.merge(student_table, scram_filter, on='student_number', how='left')
+    student_table = pd.merge(student, scram_filter, on='student_number', how='left')
     
     # Drop rows from student_table where IsOnePercent is NOT null. 
     # This column contains only 'Y' or null, so removing all non-null values accounts for any potential data entry inconsistencies.
@@ -70,6 +85,10 @@ for year in years:
     student_table.dropna(subset=['student_number'], inplace=True)
     student_table = student_table.dropna(subset=['GradeLevel'])
 
+    # student_number was validated when the sheet was converted (see student_key in src/schemas.py)
+    # Now that the missing values are gone it can be stored as a plain integer key used by every later script
+    student_table['student_number'] = student_table['student_number'].astype(student_key_dtype)
+
     # Make sure GradeLevel is an int
     student_table['GradeLevel'] = student_table['GradeLevel'].astype(int)
 
@@ -79,17 +98,23 @@ for year in years:
     # Filter out students that are not in high school
     student_table = student_table[student_table['GradeLevel'] > 8]
 
-    ##########################################################################################################################################################
-    # Add the processed tables to their respective dictionaries
-    student_tables[year] = student_table
+    return student_table
+
+
+##########################################################################################################################################################
+# With AC_INCREMENTAL=1, the student tables saved by an earlier run (with the same code and sheets) are kept as they are
+# (see src/cache.py), so only the new years are processed and the files of the other years aren't touched
+keys = year_keys(__file__, {year: sheet_inputs(year, ['Student', 'SCRAM']) for year in years})
+kept_years = [year for year in read_cached_years(__file__, keys) if os.path.exists(student_table_path(year))]
+new_years = [year for year in years if year not in kept_years]
+
+# Process the new years and store the student tables in a dictionary (keys are years)
+student_tables = map_years(process_student_year, new_years)
 
 ##########################################################################################################################################################
-# Save the dictionaries into a single pickle file (student_data.pkl)
-# 'wb' opens the file in binary write mode (required for pickle)
-# 'as f' assigns the file object to 'f' for use within the block
-# pickle.dump((student_tables), f) saves the dictionary 
-with open('./data/student_data.pkl', 'wb') as f:
-    pickle.dump((student_tables), f)
+# Save the student tables, one file per year (see src/students.py)
+write_student_tables(student_tables, keep_years=kept_years)
+write_cached_years(__file__, {year: {} for year in new_years}, keys)
 
 print('===========================================')
 print("Student tables exported successfully!")
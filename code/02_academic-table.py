@@ -1,13 +1,18 @@
-# The code will output two data files: 02_academic_exploratory_data.csv and 02_academic_modeling_data.csv
+# The code will output two data files: 02_academic_exploratory.parquet and 02_academic_modeling.parquet (see src/artifacts.py)
 # Exploratory data will have one row per student per year
 # Modeling data will have one row per student
 
 import pandas as pd
 import numpy as np
-import pickle
 
-# Define the list of years to process
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.artifacts import write_artifact
+from src.cache import read_cached_years, write_cached_years, year_keys
+from src.config import years
+from src.courses import course_is_advanced, is_advanced
+from src.parallel import map_years
+from src.reductions import indicator_per_key, latest_per_key
+from src.students import read_student_tables, student_table_path
+from src.workbooks import read_sheets, sheet_inputs
 
 ######################################################################################################################################################
 # All of the data will be left joined with the df and model_df
@@ -40,11 +45,6 @@ def process_numeric_student_columns(student_table, model_df, df, columns, rename
     # Rename columns
     selected_table = selected_table.rename(columns=rename_map)
     
-    # Ensure student_number is a string in all DataFrames
-    selected_table['student_number'] = selected_table['student_number'].astype(str)
-    model_df['student_number'] = model_df['student_number'].astype(str)
-    df['student_number'] = df['student_number'].astype(str)
-    
     # Merge into model_df
     model_df = pd.merge(model_df, selected_table, on='student_number', how='left')
     
@@ -62,29 +62,40 @@ extracurricular_list.head()
 df_dict = {}
 model_dict = {}
 
-# Load the pickled data
-# 'rb' opens the file in binary read mode (required for pickle).
-# 'as f' assigns the file object to 'f' for use within the block.
-# pickle.load(f) loads the saved Python objects (two dictionaries of DataFrames).
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
-
-# Begin the for loop to process all the years of data
-for year in years:
+# Columns used from each sheet. Only these columns are read.
+sheet_columns = {
+    'Course Master': ['CourseTitle', 'CollegeGrantingCr', 'WhereTaughtCampus', 'CourseRecordID'],
+    'Course Membership': ['StudentNumber', 'CourseRecordID', 'CourseNumber', 'ConcurrEnrolled', 'GradeEarned'],
+    'SCRAM': ['StudentNumber', 'ScramMembership', 'RegularPercent', 'Environment', 'ExtendedSchoolYear']
+}
+
+# With AC_INCREMENTAL=1, the years saved by an earlier run (with the same code and input files) are loaded from data/cache
+# instead of processed again (see src/cache.py). Only the new years go through the two loops below.
+year_inputs = {
+    year: [student_table_path(year), 'data/Extracurricular Classes.xlsx'] + sheet_inputs(year, list(sheet_columns))
+    for year in years
+}
+keys = year_keys(__file__, year_inputs)
+cached_years = read_cached_years(__file__, keys)
+new_years = [year for year in years if year not in cached_years]
+
+# Load the student tables for the new years (see src/students.py)
+student_tables = read_student_tables(new_years)
+
+# Load the Course Master, Course Membership and SCRAM sheets for the new years (in parallel if workers are set in src/config.py)
+year_sheets = map_years(read_sheets, new_years, sheet_columns=sheet_columns)
+
+# Begin the for loop to process all the new years of data
+for year in new_years:
     # Reset the df and model_df after each iteration
     df = None
     model_df = None
 
     ######################################################################################################################################################
-    # File Paths
-    master_file = f'data/{year} EOY Data - USU.xlsx'
-    membership_file = f'data/{year} EOY Data - USU.xlsx'
-    scram_file = f'data/{year} EOY Data - USU.xlsx'
-
     # Load Data
-    master = pd.read_excel(master_file, sheet_name='Course Master')
-    membership = pd.read_excel(membership_file, sheet_name='Course Membership')
-    scram = pd.read_excel(scram_file, sheet_name='SCRAM')
+    master = year_sheets[year]['Course Master']
+    membership = year_sheets[year]['Course Membership']
+    scram = year_sheets[year]['SCRAM']
 
     # Retrieve the data for the specified year from the student_tables dictionary
     student_table = student_tables[year]
@@ -111,41 +122,31 @@ for year in years:
     # and count the number of ac classes a student has taken (ac_count).
     # df will include all new columns while model_df will only include ac_ind
 
+    # Check which courses in the master table are advanced courses (see src/courses.py)
+    # CourseTitle is stripped of leading spaces and uppercased for the AP and BTEC checks
+    master_filtered = master[['CourseTitle', 'CollegeGrantingCr', 'WhereTaughtCampus', 'CourseRecordID']].copy()
+    master_filtered['course_advanced'] = course_is_advanced(master_filtered, normalize_titles=True)
+
     # Merge membership and master data on the CourseRecordID from the membership table
     membership_filtered = membership[['student_number', 'CourseRecordID', 'CourseNumber', 'ConcurrEnrolled', 'GradeEarned']]
-    master_filtered = master[['CourseTitle', 'CollegeGrantingCr', 'WhereTaughtCampus', 'CourseRecordID']]
     student_course_data = pd.merge(membership_filtered, master_filtered, on='CourseRecordID', how='left')
 
     # Drop identical rows
     student_course_data = student_course_data.drop_duplicates()
 
-    # Make sure CourseTitle has no leading spaces and is uppercase
-    student_course_data['CourseTitle'] = student_course_data['CourseTitle'].str.strip().str.upper()
-
-    # Identify advanced courses
+    # Identify advanced courses: an advanced course in the master table, or concurrent enrollment
     # The result is converted to an integer type (1 for True, 0 for False)
-    student_course_data['advanced_course'] = (
-        (student_course_data['CollegeGrantingCr'].notnull()) | # Check for college credit
-        (student_course_data['WhereTaughtCampus'].notnull()) | # Check for campus location
-        (student_course_data['ConcurrEnrolled'] == 'Y') | # Check for concurrent enrollment
-        (student_course_data['CourseTitle'].str.startswith('AP', na=False)) | # Check for AP courses
-        (student_course_data['CourseTitle'].str.startswith('BTEC', na=False)) # Check for BTEC courses
+    student_course_data['advanced_course'] = is_advanced(
+        student_course_data['course_advanced'], student_course_data['ConcurrEnrolled']
     ).astype(int)
 
     # If CourseTitle is in the advanced_course list then add a 1 to the new column
-    advanced_summary = student_course_data.groupby('student_number', as_index=False).agg(
-        ac_ind=('advanced_course', lambda x: 1 if x.sum() > 0 else 0),  # Has at least one advanced course
-        ac_count=('advanced_course', 'sum')  # Total advanced courses
-    )
+    # ac_ind: has at least one advanced course, ac_count: total advanced courses (see src/reductions.py)
+    advanced_summary = indicator_per_key(student_course_data, 'advanced_course', 'ac_ind', count_name='ac_count')
 
     # Dropping any duplicate rows from advanced_summary just in case any remain.
     advanced_summary = advanced_summary.drop_duplicates()
 
-    # Make sure student_number is a string
-    advanced_summary['student_number'] = advanced_summary['student_number'].astype(str)
-    df['student_number'] = df['student_number'].astype(str)
-    model_df['student_number'] = model_df['student_number'].astype(str)
-
     # Add ac_ind to model_df
     model_df = pd.merge(model_df, advanced_summary[['student_number','ac_ind']], on='student_number', how='left')
 
@@ -178,10 +179,6 @@ for year in years:
     # Rename the GradeEarned column to 'ac_gpa'
     avg_ac_grade.rename(columns={'GradeEarned': 'ac_gpa'}, inplace=True)
 
-    # Make sure student_number is a string
-    avg_ac_grade['student_number'] = avg_ac_grade['student_number'].astype(str)
-    df['student_number'] = df['student_number'].astype(str)
-
     # Add avg_gpa to the df
     df = pd.merge(df, avg_ac_grade, on='student_number', how='left')
 
@@ -210,16 +207,14 @@ for year in years:
     )
 
     # Summarize extracurricular participation per student
-    extracurricular_summary = student_course_data.groupby('student_number', as_index=False).agg(
-        extracurricular_ind=('is_extracurricular', lambda x: 1 if x.sum() > 0 else 0),  # 1 if any extracurriculars are taken
-        extracurricular_count=('is_extracurricular', 'sum'))  # Total count of extracurricular courses
+    # extracurricular_ind: 1 if any extracurriculars are taken, extracurricular_count: total extracurricular courses
+    extracurricular_summary = indicator_per_key(
+        student_course_data, 'is_extracurricular', 'extracurricular_ind', count_name='extracurricular_count'
+    )
 
     # Dropping any duplicate rows from extracurricular_summary just in case any remain.
     extracurricular_summary = extracurricular_summary.drop_duplicates()
 
-    # Make sure student_number is a string
-    extracurricular_summary['student_number'] = extracurricular_summary['student_number'].astype(str)
-    
     # Only add extracurricular_ind to model_df
     model_df = pd.merge(model_df, extracurricular_summary[['student_number', 'extracurricular_ind']], on='student_number', how='left')
 
@@ -270,9 +265,6 @@ for year in years:
     scram = scram.loc[scram.groupby('student_number')['ScramMembership'].idxmax()]
     scram.reset_index(drop=True, inplace=True)
 
-    # Make sure student_number is a string
-    scram['student_number'] = scram['student_number'].astype(str)
-
     # We will merge with df['student_number'] at the beginning to only work with the filtered student_numbers
     # This way we can adjust the student numbers at the top on the script once.
     scram = pd.merge(df['student_number'], scram, on='student_number', how='left')
@@ -331,9 +323,6 @@ for year in years:
 
     ################################################################
     # Merge the scram data with the df and model_df
-    # Make sure student_number is a string
-    scram['student_number'] = scram['student_number'].astype(str)
-    scram_dummies['student_number'] = scram_dummies['student_number'].astype(str)
 
     scram = scram.sort_values(by=['scram_membership'], ascending=False)
     scram = scram.drop_duplicates(subset=['student_number'], keep=False)
@@ -364,7 +353,7 @@ for year in years:
 # The days_absent column is created to standardize the representation of total absences across all years
 # This will be done separately for df_dict and model_dict
 
-for year in years:
+for year in new_years:
     ################################################################
     # Process df_dict for the current year
     df_year = df_dict[f'df_{year}']
@@ -391,8 +380,8 @@ for year in years:
         df_year['days_absent'] = df_year['school_membership'] - df_year['days_attended']
     
     # Update days_attended and school_membership to 180 if days_attended is > 180 or school_membership is > 180
-    df_year.loc[(df['days_attended'] > 180), 'days_attended'] = 180
-    df_year.loc[(df['school_membership'] > 180), 'school_membership'] = 180
+    df_year.loc[(df_year['days_attended'] > 180), 'days_attended'] = 180
+    df_year.loc[(df_year['school_membership'] > 180), 'school_membership'] = 180
 
     # Update school_membership to 180 if school_membership is < days_attended and days_attended is not 0
     df_year.loc[
@@ -439,6 +428,11 @@ for year in years:
     # Save the updated DataFrame back to the dictionary
     model_dict[f'model_df_{year}'] = model_year
 
+# Save the new years for later runs, and add the years saved by earlier runs (in the order of years)
+write_cached_years(__file__, {year: {'df': df_dict[f'df_{year}'], 'model_df': model_dict[f'model_df_{year}']} for year in new_years}, keys)
+df_dict = {f'df_{year}': cached_years[year]['df'] if year in cached_years else df_dict[f'df_{year}'] for year in years}
+model_dict = {f'model_df_{year}': cached_years[year]['model_df'] if year in cached_years else model_dict[f'model_df_{year}'] for year in years}
+
 
 ######################################################################################################################################################
 # Concatenate data from multiple years into two main DataFrames:
@@ -493,10 +487,6 @@ model_attendance.loc[model_attendance['school_membership'] == 0, 'percent_days_a
 
 model_attendance.head()
 
-# Make sure student number is a string
-model_attendance['student_number'] = model_attendance['student_number'].astype(str)
-model_df['student_number'] = model_df['student_number'].astype(str)
-
 # Merge student_attendance with model_df
 model_df = pd.merge(model_df, model_attendance, on='student_number', how='left')
 
@@ -531,9 +521,6 @@ advanced_course_indicator = concat_model[['student_number', 'ac_ind']].copy()
 # Group by student_number and the row with the max ac_ind
 advanced_course_indicator = advanced_course_indicator.groupby('student_number', as_index=False)['ac_ind'].max()
 
-# Make sure student number is a string
-advanced_course_indicator['student_number'] = advanced_course_indicator['student_number'].astype(str)
-
 advanced_course_indicator.head()
 
 # Merge with model_df
@@ -550,9 +537,6 @@ extracurricular_indicator = concat_model[['student_number', 'extracurricular_ind
 # Group by student_number and get the row with the max extracurricular_ind
 extracurricular_indicator = extracurricular_indicator.groupby('student_number', as_index=False)['extracurricular_ind'].max()
 
-# Make sure student_number is a string
-extracurricular_indicator['student_number'] = extracurricular_indicator['student_number'].astype(str)
-
 extracurricular_indicator.head()
 
 # Merge with model_df
@@ -565,14 +549,8 @@ model_df.head()
 # Add the most recent overall_gpa per student to the model_df
 combined_overall_gpa = concat_model[['student_number', 'overall_gpa', 'current_grade']].copy()
 
-# Sort by grade level in descending order
-combined_overall_gpa = combined_overall_gpa.sort_values(by='current_grade', ascending=False)
-
-# Remove duplicates, keeping the row with the largest current_grade
-combined_overall_gpa = combined_overall_gpa.drop_duplicates(subset='student_number', keep='first')
-
-# Make sure student number is a string
-combined_overall_gpa['student_number'] = combined_overall_gpa['student_number'].astype(str)
+# Keep the row with the largest current_grade per student (see src/reductions.py)
+combined_overall_gpa = latest_per_key(combined_overall_gpa, 'current_grade')
 
 combined_overall_gpa.head()
 
@@ -589,9 +567,6 @@ scram_membership_sum = concat_model[['student_number', 'scram_membership']].copy
 # Sum the scram_membership data for each student_number to aggregate across years
 scram_membership_sum = scram_membership_sum.groupby('student_number', as_index=False).sum()
 
-# Make sure student number is a string
-scram_membership_sum['student_number'] = scram_membership_sum['student_number'].astype(str)
-
 scram_membership_sum.head()
 
 # Merge with model_df
@@ -613,11 +588,8 @@ combined_scram = concat_model.loc[:, concat_model.columns.intersection(concat_sc
 # Filter the DataFrame for the specified columns
 # combined_scram = concat_model[concat_scram_colums]
 
-# Sort by grade level in descending order
-combined_scram = combined_scram.sort_values(by='current_grade', ascending=False)
-
-# Remove duplicates, keeping the row with the largest current_grade
-combined_scram = combined_scram.drop_duplicates(subset='student_number', keep='first')
+# Keep the row with the largest current_grade per student (see src/reductions.py)
+combined_scram = latest_per_key(combined_scram, 'current_grade')
 
 # Drop current_grade from the Data Frame as it is not needed in the model_df
 #combined_scram = combined_scram.drop(columns='current_grade')
@@ -625,9 +597,6 @@ combined_scram = combined_scram.drop_duplicates(subset='student_number', keep='f
 # Drop the regular_percent_nan column
 combined_scram = combined_scram.drop(columns='regular_percent_nan')
 
-# Make sure student number is a string
-combined_scram['student_number'] = combined_scram['student_number'].astype(str)
-
 combined_scram.head()
 
 # Merge with model_df
@@ -678,8 +647,8 @@ model_df.fillna(0, inplace=True)
 df.fillna(0, inplace=True)
 
 # Export both files
-df.to_csv('./data/02_academic_exploratory.csv', index=False)
-model_df.to_csv('./data/02_academic_modeling.csv', index=False)
+write_artifact(df, '02_academic_exploratory')
+write_artifact(model_df, '02_academic_modeling')
 
 print('===========================================')
 print("Academic data exported successfully!")
@@ -1,118 +1,108 @@
-# The code will output two data files: 03_demographic_exploratory_data.csv and 03_demographic_modeling_data.csv
+# The code will output two data files: 03_demographic_exploratory.parquet and 03_demographic_modeling.parquet (see src/artifacts.py)
 
 import pandas as pd
-import pickle
 
-# Define the list of years to process
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.artifacts import read_artifact, write_artifact
+from src.cache import read_cached_years, write_cached_years, year_keys
+from src.config import years
+from src.dates import parse_dates
+from src.encoding import learn_vocabulary, one_hot
+from src.reductions import latest_per_key, reduce_per_key
+from src.students import read_student_tables, student_table_path
 
 ######################################################################################################################################################
-# Function to process categorical variables. Add non-dummied columns to df and dummy-coded columns to model_df
-def process_categorical_column(df, model_df, reference_table, column_name, dummy_name, key_column='student_number'):
+# Function to process the categorical and binary columns of a year's student table in one pass
+def process_student_columns(student_table, categorical_columns, binary_columns, year, key_column='student_number'):
     """
-    Processes a categorical column by adding the non-dummied column to df and dummy-coded columns to model_df.
+    Processes all the categorical and binary columns of a student table with one projection of the table:
+    - Categorical columns: nulls are filled with 'nan', and the column is added as it is to both df and model_df
+      (model_df's categorical columns are dummy coded once the years are combined, see src/encoding.py).
+    - Binary columns: nulls are filled with 'N', the column is added as it is to df, and as a dummy
+      variable ({name}_y: Y=1, otherwise 0) to model_df.
+    Columns that aren't in the student table are skipped (with a message).
 
     Parameters:
-        df (pd.DataFrame): DataFrame where the non-dummied column will be added.
-        model_df (pd.DataFrame): DataFrame where dummy-coded columns will be added.
-        reference_table (pd.DataFrame): The table containing the column to be processed.
-        column_name (str): The original name of the column in the reference table.
-        dummy_name (str): The desired name for the column in the df and model_df.
+        student_table (pd.DataFrame): The student table of one year.
+        categorical_columns (list): (original name in the student table, name in df and model_df) of every categorical column.
+        binary_columns (list): (original name in the student table, name in df and model_df) of every binary column.
+        year (int): The year of the student table (for the messages).
         key_column (str): The column to use as the primary key for merging (default is 'student_number').
 
     Returns:
-        pd.DataFrame, pd.DataFrame: Updated df and model_df DataFrames.
+        pd.DataFrame, pd.DataFrame: The columns to merge into df and into model_df, with key_column.
     """
-    # Extract and rename the column
-    temp_table = reference_table[[key_column, column_name]].rename(columns={column_name: dummy_name})
-
-    # Handle null values by filling with 'nan'
-    temp_table[dummy_name] = temp_table[dummy_name].fillna('nan')
-
-    # Ensure the key column is a string in all DataFrames
-    temp_table[key_column] = temp_table[key_column].astype(str)
-    df[key_column] = df[key_column].astype(str)
-    model_df[key_column] = model_df[key_column].astype(str)
-
-    # Add the non-dummied column to df
-    df = pd.merge(df, temp_table, on=key_column, how='left')
-
-    # Generate dummy variables
-    dummies = pd.get_dummies(temp_table[dummy_name], prefix=dummy_name, dtype=int)
+    # If a column does not exist, print which column is missing for what year
+    for original_col, new_col in categorical_columns + binary_columns:
+        if original_col not in student_table.columns:
+            print(f"Column '{original_col}' not found in the '{year}' student_table. Skipping...")
 
-    # Rename dummy columns to lowercase
-    dummies.columns = dummies.columns.str.lower()
+    categorical = [(original_col, new_col) for original_col, new_col in categorical_columns if original_col in student_table.columns]
+    binary = [(original_col, new_col) for original_col, new_col in binary_columns if original_col in student_table.columns]
+    categorical_names = [new_col for _, new_col in categorical]
+    binary_names = [new_col for _, new_col in binary]
 
-    # Merge dummy variables into model_df
-    model_df = pd.merge(model_df, pd.concat([temp_table[key_column], dummies], axis=1), on=key_column, how='left')
+    # Select and rename all the columns at once
+    columns = student_table[[key_column] + [original_col for original_col, _ in categorical + binary]]
+    columns = columns.rename(columns=dict(categorical + binary))
 
-    # Fill any remaining nulls in dummy variables with 0
-    model_df[dummies.columns] = model_df[dummies.columns].fillna(0)
+    # Handle null values by filling with 'nan' (dummy coded as {column}_nan) and 'N'
+    columns[categorical_names] = columns[categorical_names].fillna('nan')
+    columns[binary_names] = columns[binary_names].fillna('N')
 
-    return df, model_df
+    # Create the binary dummy variables (Y=1, N=0)
+    dummies = columns[binary_names].eq('Y').astype(int)
+    dummies.columns = [f"{new_col}_y" for new_col in binary_names]
 
+    return columns, pd.concat([columns[[key_column] + categorical_names], dummies], axis=1)
 
 ######################################################################################################################################################
-# Function to process binary columns: add to df, replace nulls, and dummy code
-def student_binary_columns(df, model_df, reference_table, column_name, dummy_name, key_column='student_number'):
-    """
-    Processes a binary column from a reference DataFrame (student_table) by adding the non-dummy column to df
-    and dummy-coded columns to model_df.
-
-    Parameters:
-        df (pd.DataFrame): DataFrame where the non-dummy column will be added.
-        model_df (pd.DataFrame): DataFrame where dummy-coded columns will be added.
-        reference_table (pd.DataFrame): The table containing the column to be processed.
-        column_name (str): The original name of the column in the reference table.
-        dummy_name (str): The desired name for the column in the df and model_df.
-        key_column (str): The column to use as the primary key for merging (default is 'student_number').
-
-    Returns:
-        pd.DataFrame, pd.DataFrame: Updated df and model_df DataFrames.
-    """
-    # Extract and rename the target column
-    temp_table = reference_table[[key_column, column_name]].rename(columns={column_name: dummy_name})
 
-    # Fill null values with 'N'
-    temp_table[dummy_name] = temp_table[dummy_name].fillna('N')
-
-    # Ensure the key column is a string in all DataFrames
-    temp_table[key_column] = temp_table[key_column].astype(str)
-    df[key_column] = df[key_column].astype(str)
-    model_df[key_column] = model_df[key_column].astype(str)
-
-    # Add the non-dummied column to df
-    df = pd.merge(df, temp_table, on=key_column, how='left')
-
-    # Create a binary dummy variable (Y=1, N=0)
-    temp_table[f"{dummy_name}_y"] = temp_table[dummy_name].map({'Y': 1, 'N': 0})
-
-    # Create a DataFrame containing only key_column and the dummy variable
-    dummy_table = temp_table[[key_column, f"{dummy_name}_y"]]
-
-    # Merge the dummy variable into model_df
-    model_df = pd.merge(model_df, dummy_table, on=key_column, how='left')
-
-    # Fill any remaining nulls in dummy variable with 0
-    model_df[f"{dummy_name}_y"] = model_df[f"{dummy_name}_y"].fillna(0)
-
-    return df, model_df
-
-######################################################################################################################################################
+# Define the lists of categorical columns (dummy coded) and binary columns (Y/N) to process using the function above (process_student_columns)
+# (column in the student table, name in df and model_df)
+categorical_columns = [
+    ('Gender', 'gender'),
+    ('LimitedEnglish', 'limited_english'),
+    ('HighSchlComplStatus', 'hs_complete_status'),
+    ('ExitCode', 'exit_code'),
+    ('TribalAffiliation', 'tribal_affiliation'),
+    ('EllNativeLanguage', 'ell_native_language'),
+    ('EllParentLanguage', 'ell_parent_language'),
+    ('EllInstructionType', 'ell_instruction_type')
+]
+
+binary_columns = [
+    ('Ethnicity', 'ethnicity'),
+    ('AmerIndianAlaskan', 'amerindian_alaskan'),
+    ('Asian', 'asian'),
+    ('BlackAfricanAmer', 'black_african_amer'),
+    ('HawaiianPacificIsl', 'hawaiian_pacific_isl'),
+    ('White', 'white'),
+    ('Migrant', 'migrant'),
+    ('Services504', 'services_504'),
+    ('MilitaryChild', 'military_child'),
+    ('RefugeeStudent', 'refugee_student'),
+    ('Immigrant', 'immigrant'),
+    ('ReadingIntervention', 'reading_intervention'),
+    ('PassedCivicsExam', 'passed_civics_exam'),
+    ('ReadGradeLevel', 'read_grade_level'),
+    ('Gifted', 'gifted')
+]
 
 # Create two empty dictionaries to store df and model_df for each year: df_dict and model_dict
 df_dict = {}
 model_dict = {}
 
-# Load the pickled data
-# 'rb' opens the file in binary read mode (required for pickle).
-# 'as f' assigns the file object to 'f' for use within the block.
-# pickle.load(f) loads the saved Python objects (two dictionaries of DataFrames).
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
+# With AC_INCREMENTAL=1, the years saved by an earlier run (with the same code and student table) are loaded from data/cache
+# instead of processed again (see src/cache.py). Only the new years go through the loop below.
+keys = year_keys(__file__, {year: [student_table_path(year)] for year in years})
+cached_years = read_cached_years(__file__, keys)
+new_years = [year for year in years if year not in cached_years]
 
-# Begin the for loop to process all the years of data
-for year in years:
+# Load the student tables for the new years (see src/students.py)
+student_tables = read_student_tables(new_years)
+
+# Begin the for loop to process all the new years of data
+for year in new_years:
     ######################################################################################################################################################
     # Retrieve the data for the specified year from the student_tables dictionary
     student_table = student_tables[year]
@@ -126,57 +116,10 @@ for year in years:
 
 
     ######################################################################################################################################################
-    # Define the list of categorical columns to process using the function above (process_categorical_column)
-    categorical_columns = [
-        ('Gender', 'gender'),
-        ('LimitedEnglish', 'limited_english'),
-        ('HighSchlComplStatus', 'hs_complete_status'),
-        ('ExitCode', 'exit_code'),
-        ('TribalAffiliation', 'tribal_affiliation'),
-        ('EllNativeLanguage', 'ell_native_language'),
-        ('EllParentLanguage', 'ell_parent_language'),
-        ('EllInstructionType', 'ell_instruction_type')
-    ]
-
-    # Apply the function to each column in the list if the column exists
-    for original_col, new_col in categorical_columns:
-        if original_col in student_table.columns:
-            df, model_df = process_categorical_column(df, model_df, student_table.copy(), original_col, new_col)
-        
-        # If the column does not exist, print which column is missing for what year
-        else:
-            print(f"Column '{original_col}' not found in the '{year}' student_table. Skipping...")
-
-
-
-    ######################################################################################################################################################
-    # Define the list of binary columns to process using the function above (student_binary_columns)
-    columns_to_process = [
-        ('Ethnicity', 'ethnicity'),
-        ('AmerIndianAlaskan', 'amerindian_alaskan'),
-        ('Asian', 'asian'),
-        ('BlackAfricanAmer', 'black_african_amer'),
-        ('HawaiianPacificIsl', 'hawaiian_pacific_isl'),
-        ('White', 'white'),
-        ('Migrant', 'migrant'),
-        ('Services504', 'services_504'),
-        ('MilitaryChild', 'military_child'),
-        ('RefugeeStudent', 'refugee_student'),
-        ('Immigrant', 'immigrant'),
-        ('ReadingIntervention', 'reading_intervention'),
-        ('PassedCivicsExam', 'passed_civics_exam'),
-        ('ReadGradeLevel', 'read_grade_level'),
-        ('Gifted', 'gifted')
-    ]
-
-    # Apply the function to each column in the list if the column exists
-    for original_col, new_col in columns_to_process:
-        if original_col in student_table.columns:
-            df, model_df = student_binary_columns(df, model_df, student_table, original_col, new_col)
-        
-        # If the column does not exist, print which column is missing for what year
-        else:
-            print(f"Column '{original_col}' not found in the '{year}' student_table. Skipping...")
+    # Add the categorical and binary columns to df and model_df with one merge each
+    exploratory_columns, model_columns = process_student_columns(student_table, categorical_columns, binary_columns, year)
+    df = pd.merge(df, exploratory_columns, on='student_number', how='left')
+    model_df = pd.merge(model_df, model_columns, on='student_number', how='left')
 
 
     ######################################################################################################################################################
@@ -192,15 +135,8 @@ for year in years:
 
     date_columns = ['entry_date', 'first_enroll_us', 'ell_entry_date']
 
-    # Convert date columns into datetime format
-    student_dates[date_columns] = student_dates[date_columns].apply(
-        lambda col: pd.to_datetime(col.astype(str).str.replace('-', ''), format='%Y%m%d', errors='coerce')
-    )
-
-    # Make sure student_number is a string
-    student_dates['student_number'] = student_dates['student_number'].astype(str)
-    df['student_number'] = df['student_number'].astype(str)
-    model_df['student_number'] = model_df['student_number'].astype(str)
+    # Convert date columns into datetime format (see src/dates.py)
+    student_dates[date_columns] = student_dates[date_columns].apply(parse_dates)
 
     # Merge into df
     df = pd.merge(df, student_dates, on='student_number', how='left')
@@ -234,11 +170,6 @@ for year in years:
         'PartTimeHomeSchool': 'part_time_home_school'
     })
 
-    # Make sure student_number is a string
-    extra_columns['student_number'] = extra_columns['student_number'].astype(str)
-    df['student_number'] = df['student_number'].astype(str)
-    model_df['student_number'] = model_df['student_number'].astype(str)
-
     # Merge into model_df
     model_df = pd.merge(model_df, extra_columns, on='student_number', how='left')
 
@@ -252,6 +183,11 @@ for year in years:
     df_dict[f'df_{year}']['year'] = year
     model_dict[f'model_df_{year}']['year'] = year
 
+# Save the new years for later runs, and add the years saved by earlier runs (in the order of years)
+write_cached_years(__file__, {year: {'df': df_dict[f'df_{year}'], 'model_df': model_dict[f'model_df_{year}']} for year in new_years}, keys)
+df_dict = {f'df_{year}': cached_years[year]['df'] if year in cached_years else df_dict[f'df_{year}'] for year in years}
+model_dict = {f'model_df_{year}': cached_years[year]['model_df'] if year in cached_years else model_dict[f'model_df_{year}'] for year in years}
+
 
 ######################################################################################################################################################
 # Concatenate data from multiple years into two main DataFrames:
@@ -261,6 +197,11 @@ for year in years:
 df = pd.concat(df_dict.values(), ignore_index=True)
 concat_model = pd.concat(model_dict.values(), ignore_index=True)
 
+# Dummy code the categorical columns of concat_model against the categories found over all years (see src/encoding.py)
+# A student in a year without the column gets 0 in all of its dummy columns
+vocabulary = learn_vocabulary(concat_model, [new_col for _, new_col in categorical_columns])
+concat_model = pd.concat([concat_model.drop(columns=list(vocabulary)), one_hot(concat_model, vocabulary)], axis=1)
+
 # Remove duplicate rows if there are any
 df = df.drop_duplicates(keep='first')
 concat_model = concat_model.drop_duplicates(keep='first')
@@ -292,19 +233,12 @@ binary_categorical_data = concat_model.copy()
 # Drop the excluded columns from the data
 binary_categorical_data = binary_categorical_data.drop(columns= exclude_columns)
 
-# Sort the data by the year column in descending order
-binary_categorical_data = binary_categorical_data.sort_values(by='year', ascending=False)
-
-# Remove duplicate rows based on the 'student_number' column to keep the row with the most recent year
-binary_categorical_data = binary_categorical_data.drop_duplicates(subset='student_number', keep='first')
+# Keep the row with the most recent year per student (see src/reductions.py)
+binary_categorical_data = latest_per_key(binary_categorical_data, 'year')
 
 # Drop the year column from the data
 binary_categorical_data = binary_categorical_data.drop(columns='year')
 
-# Make sure student_number is a string
-binary_categorical_data['student_number'] = binary_categorical_data['student_number'].astype(str)
-model_df['student_number'] = model_df['student_number'].astype(str)
-
 binary_categorical_data.head()
 
 # Merge the binary and categorical data with the model_df
@@ -317,17 +251,8 @@ model_df.head()
 # Migrant status can change after 3 years. 
 # Ensure that if a student was ever labeled migrant, we include that row in model_df
 
-# Select relevant columns
-migrant = concat_model[['student_number', 'migrant_y']].copy()
-
-# Sort migrant_y in descending order
-migrant = migrant.sort_values(by='migrant_y', ascending=False)
-
-# Drop all duplicates except the first instance
-migrant = migrant.drop_duplicates(subset='student_number', keep='first')
-
-# Make sure student_number is a string
-migrant['student_number'] = migrant['student_number'].astype(str)
+# Keep the highest migrant_y of each student (see src/reductions.py)
+migrant = reduce_per_key(concat_model, ['migrant_y'], 'max')
 
 # Merge with model_df
 model_df = pd.merge(model_df, migrant, on='student_number', how='left')
@@ -341,28 +266,12 @@ model_df.head()
 # Columns to process
 date_columns = ['ell_entry_date', 'entry_date', 'first_enroll_us']
 
-# Create a DataFrame to hold the results
-earliest_dates = model_df[['student_number']].copy()
-
-# Ensure the date columns are in datetime format and process each column separately
-for col in date_columns:
-    # Create a DataFrame with student_number and the current date column
-    temp_date = concat_model[['student_number', col]].copy()
-    
-    # Ensure the column is in datetime format
-    temp_date[col] = pd.to_datetime(temp_date[col], errors='coerce')
-    
-    # Sort by student_number and the date column in ascending order
-    temp_date = temp_date.sort_values(by=['student_number', col], ascending=[True, True])
-    
-    # Drop duplicates to keep the earliest date for each student
-    temp_date = temp_date.drop_duplicates(subset='student_number', keep='first')
-    
-    # Merge the earliest date back into the results DataFrame
-    earliest_dates = pd.merge(earliest_dates, temp_date, on='student_number', how='left')
+# Keep the earliest date of each student in all the date columns at once (see src/reductions.py)
+# The dates were parsed for each year (see src/dates.py), and missing dates are skipped
+earliest_dates = reduce_per_key(concat_model, date_columns, 'min')
 
-# Ensure student_number is a string
-earliest_dates['student_number'] = earliest_dates['student_number'].astype(str)
+# Line the earliest dates up with the students in model_df
+earliest_dates = pd.merge(model_df[['student_number']], earliest_dates, on='student_number', how='left')
 
 earliest_dates.fillna(0, inplace=True)
 earliest_dates.head()
@@ -403,17 +312,9 @@ home_status_df['home_status'] = pd.to_numeric(home_status_df['home_status'], err
 # Create a column 'homeless_y'. If a student had a home_status that was not 0 homeless_y = 1
 home_status_df['homeless_y'] = (home_status_df['home_status'] != 0).astype(int)
 
-# Sort by home_status in descening order
-home_status_df = home_status_df.sort_values(by='home_status', ascending=False)
-
 # Drop home_status column as it is no longer needed
 home_status_df = home_status_df.drop(columns=['home_status'])
 
-# Make sure student_number is a string
-home_status_df['student_number'] = home_status_df['student_number'].astype(str)
-df['student_number'] = df['student_number'].astype(str)
-model_df['student_number'] = model_df['student_number'].astype(str)
-
 #=================================================================
 # Before dropping duplicates, merge home_status_df with df
 df = pd.merge(df, home_status_df, on=['student_number', 'year'], how='left')
@@ -423,8 +324,8 @@ df = pd.merge(df, home_status_df, on=['student_number', 'year'], how='left')
 #df = df.drop(columns=['home_status'])
 #=================================================================
 
-# Drop duplicates, keeping the first occurrence (which will be homeless if applicable)
-home_status_df = home_status_df.drop_duplicates(subset=['student_number'], keep='first')
+# Keep the highest homeless_y of each student (1 if the student was ever homeless, see src/reductions.py)
+home_status_df = reduce_per_key(home_status_df, ['homeless_y'], 'max')
 
 # home_status_df now only contains one row per student_number, so we can now merge with model_df
 model_df = pd.merge(model_df, home_status_df, on='student_number', how='left')
@@ -448,14 +349,9 @@ part_time_home_df = concat_model[['student_number', 'part_time_home_school', 'ye
 # Create part_time_home_school_y column (1 if part_time_home_school is not null, else 0)
 part_time_home_df['part_time_home_school_y'] = part_time_home_df['part_time_home_school'].notna().astype(int)
 
-# Sort by part_time_home_school_y in descending order to prioritize students with part-time home school history
-part_time_home_df = part_time_home_df.sort_values(by='part_time_home_school_y', ascending=False)
-
 # Drop home_status column as it is no longer needed
 part_time_home_df = part_time_home_df.drop(columns=['part_time_home_school'])
 
-# Convert student_number to string for consistency
-part_time_home_df['student_number'] = part_time_home_df['student_number'].astype(str)
 part_time_home_df.head()
 #=================================================================
 # Before dropping duplicates, merge part_time_home_df with df
@@ -465,11 +361,11 @@ df = pd.merge(df, part_time_home_df, on=['student_number', 'year'], how='left')
 #df = df.drop(columns=['part_time_home_school'])
 #=================================================================
 
-# Drop duplicates, keeping the first occurrence (which is sorted by part_time_home_school_y in descending order)
-part_time_home_df = part_time_home_df.drop_duplicates(subset=['student_number'], keep='first')
+# Keep the highest part_time_home_school_y of each student (1 if the student was ever in part-time home school, see src/reductions.py)
+part_time_home_df = reduce_per_key(part_time_home_df, ['part_time_home_school_y'], 'max')
 
-# Merge part_time_home_df with model_df (after dropping duplicates)
-model_df = pd.merge(model_df, part_time_home_df[['student_number', 'part_time_home_school_y']], on='student_number', how='left')
+# Merge part_time_home_df with model_df (after reducing to one row per student)
+model_df = pd.merge(model_df, part_time_home_df, on='student_number', how='left')
 
 model_df.head()
 df.head()
@@ -500,18 +396,18 @@ df.head()
 # However, after this script, they are no longer needed and should be removed.
 
 # To properly handle this:
-# 1. Load 02_academic_exploratory.csv and 02_academic_modeling.csv, which contain the regular_percent columns.
+# 1. Load 02_academic_exploratory and 02_academic_modeling, which contain the regular_percent columns.
 # 2. Create copies: 
-#       a. academic_exploratory_data and academic_modeling_data to retain the original CSV files
+#       a. academic_exploratory_data and academic_modeling_data to retain the original files
 #       b. academic_df and academic_model_df to calculate disability_status
 # 3. Remove the regular_percent columns from academic_exploratory_data and academic_modeling_data.
 # 4. Export the updated academic_exploratory_data and academic_modeling_data files using the same file paths from the 02-script, 
-#    ensuring 02_academic_exploratory.csv and 02_academic_modeling.csv no longer contain regular_percent columns.
+#    ensuring 02_academic_exploratory and 02_academic_modeling no longer contain regular_percent columns.
 #    This will be done at the end of the script to avoid any issues.
 
 # Import the academic tables
-academic_df = pd.read_csv('data/02_academic_exploratory.csv')
-academic_model_df = pd.read_csv('data/02_academic_modeling.csv')
+academic_df = read_artifact('02_academic_exploratory')
+academic_model_df = read_artifact('02_academic_modeling')
 
 # Create dataframes to store the entire imported csv files
 academic_exploratory_data = academic_df.copy()
@@ -548,10 +444,6 @@ disability_data["disability_status"] = disability_data[['regular_percent_1.0', '
 # Keep only student_number and disability_status
 disability_data = disability_data[['student_number', 'disability_status']]
 
-# Make sure student_number is a string
-ell_data['student_number'] = ell_data['student_number'].astype(str)
-disability_data['student_number'] = disability_data['student_number'].astype(str)
-
 # Merge ELL and disability data
 ell_disability_data = pd.merge(ell_data, disability_data, on='student_number', how='left')
 
@@ -590,9 +482,6 @@ academic_df["disability_status"] = academic_df["regular_percent"].apply(lambda x
 # Only keep student_number and disability_status
 academic_df = academic_df[['student_number', 'disability_status', 'year']].copy()
 
-# Make sure student_number is a string
-academic_df['student_number'] = academic_df['student_number'].astype(str)
-
 # Merge disability_status from academic_df into df
 df = pd.merge(df, academic_df, on=['student_number', 'year'], how='left')
 
@@ -728,12 +617,12 @@ df.head()
 # Export the data
 
 # Export the updated academic files using the same file paths from the 02-script
-academic_exploratory_data.to_csv('data/02_academic_exploratory.csv', index=False)
-academic_modeling_data.to_csv('data/02_academic_modeling.csv', index=False)
+write_artifact(academic_exploratory_data, '02_academic_exploratory')
+write_artifact(academic_modeling_data, '02_academic_modeling')
 
 # Export both files
-df.to_csv('./data/03_demographic_exploratory.csv', index=False)
-model_df.to_csv('./data/03_demographic_modeling.csv', index=False)
+write_artifact(df, '03_demographic_exploratory')
+write_artifact(model_df, '03_demographic_modeling')
 
 
 print("Demographic data exported successfully!")
@@ -1,9 +1,12 @@
-# The code will output one data file: 04_assessment_data.csv
+# The code will output one data file: 04_assessment_data.parquet (see src/artifacts.py)
 import pandas as pd
-import pickle
 
-# Define the list of years to process
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.artifacts import write_artifact
+from src.cache import read_cached_years, write_cached_years, year_keys
+from src.config import years
+from src.parallel import map_years
+from src.students import read_student_tables, student_table_path
+from src.workbooks import read_sheet, sheet_inputs
 
 # Create an empty dictionary to store the df data for each year
 # Only one file will be exported, so df will represent the exploratory and modeling data.
@@ -21,16 +24,23 @@ df_dict = {}
 # - Concatenate the data from all years into a single DataFrame.
 # - Further filter the combined data to include only the highest 'composite_score' per student across all years.
 
-# Load the pickled data (student_tables)
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
+# With AC_INCREMENTAL=1, the years saved by an earlier run (with the same code and input files) are loaded from data/cache
+# instead of processed again (see src/cache.py). Only the new years go through the loop below.
+keys = year_keys(__file__, {year: [student_table_path(year)] + sheet_inputs(year, ['Transcript Assessments']) for year in years})
+cached_years = read_cached_years(__file__, keys)
+new_years = [year for year in years if year not in cached_years]
 
-for year in years:
-    # File Paths
-    assessment_file = f'data/{year} EOY Data - USU.xlsx'
+# Load the student numbers from the student tables (see src/students.py)
+student_tables = read_student_tables(new_years, columns=['student_number'])
 
+# Load the Transcript Assessments sheet for the new years (in parallel if workers are set in src/config.py)
+# Only the columns used below are read
+assessment_columns = ['StudentNumber', 'TestName', 'TestDate', 'Subtest', 'TestScore']
+assessments = map_years(read_sheet, new_years, sheet_name='Transcript Assessments', columns=assessment_columns)
+
+for year in new_years:
     # Load Data
-    assessment = pd.read_excel(assessment_file, sheet_name='Transcript Assessments')
+    assessment = assessments[year]
     
     # Retrieve the data for the specified year from the student_tables dictionary
     student_table = student_tables[year]
@@ -93,10 +103,6 @@ for year in years:
     # Reset the index to make student_number a column again
     assessment_grid = assessment_grid.reset_index()
 
-    # Make sure student_number is a string
-    assessment_grid['student_number'] = assessment_grid['student_number'].astype(str)
-    df['student_number'] = df['student_number'].astype(str)
-
     # Merge assessment_grid into the df
     df = pd.merge(df, assessment_grid, on='student_number', how='left')
 
@@ -115,6 +121,10 @@ for year in years:
     # Results stored as assessment_[year]
     df_dict[f'assessment_{year}'] = df.copy()
 
+# Save the new years for later runs, and add the years saved by earlier runs (in the order of years)
+write_cached_years(__file__, {year: {'assessment': df_dict[f'assessment_{year}']} for year in new_years}, keys)
+df_dict = {f'assessment_{year}': cached_years[year]['assessment'] if year in cached_years else df_dict[f'assessment_{year}'] for year in years}
+
 
 ######################################################################################################################################################
 # Since students may have taken the test multiple times across different years, we will apply the same filtering process as above.
@@ -141,7 +151,7 @@ df = df.drop(columns='test_date')
 
 ######################################################################################################################################################
 # Export the data
-df.to_csv('./data/04_assessment_data.csv', index=False)
+write_artifact(df, '04_assessment_data')
 
 print('===========================================')
 print("Assessment data exported successfully!")
@@ -20,27 +20,31 @@
 # PART 2: Student-Teacher Exposure Grids
 # ----------------------------------
 # - Uses the same Course Master and Course Membership data as Part 1
-# - Adds student-level data (from pickled student_tables) to get accurate student_number information
-# - Also loads academic outcome data from 02_academic_modeling.csv to merge in each student's ac_ind
-# - Builds:
+# - Adds student-level data (from the student tables) to get accurate student_number information
+# - Also loads academic outcome data from 02_academic_modeling to merge in each student's ac_ind
+# - Builds sparse student × teacher grids (1 = the student had the teacher, see src/grids.py):
 #     - A grid of all students and all teachers
 #     - A grid of all students and only non-AC teachers
 #     - A grid for each school showing student exposure to non-AC teachers
 
 # Files Exported:
-# - ./data/all_teacher_grid.csv
-# - ./data/non_ac_teacher_grid.csv
-# - ./data/sky_view_non_ac_teacher_grid.csv
-# - ./data/green_canyon_non_ac_teacher_grid.csv
-# - ./data/ridgeline_non_ac_teacher_grid.csv
-# - ./data/mountain_crest_non_ac_teacher_grid.csv
-# - ./data/cache_high_non_ac_teacher_grid.csv
-# - ./data/spring_creek_middle_non_ac_teacher_grid.csv
-# - ./data/north_cache_middle_non_ac_teacher_grid.csv
-# - ./data/south_cache_middle_non_ac_teacher_grid.csv
+# - ./data/all_teacher_grid.npz
+# - ./data/non_ac_teacher_grid.npz
+# - ./data/[school]_non_ac_teacher_grid.npz for every school in school_name_map (see src/config.py), e.g.:
+#   - ./data/sky_view_non_ac_teacher_grid.npz
+#   - ./data/green_canyon_non_ac_teacher_grid.npz
+#   - ./data/spring_creek_middle_non_ac_teacher_grid.npz
 
 import pandas as pd
-import pickle
+
+from src.artifacts import read_artifact
+from src.config import post_covid_years, school_name_map, years
+from src.courses import course_is_advanced, is_advanced
+from src.grids import incidence_grid, school_grid_name, split_grid, subgrid, write_grid
+from src.parallel import map_years
+from src.reductions import indicator_per_key, latest_per_key
+from src.students import read_student_tables
+from src.workbooks import read_sheet
 
 ######################################################################################################################################################
 # ----------------------------------
@@ -51,12 +55,31 @@ import pickle
 all_membership = []
 all_master = []
 
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+# Columns used from each sheet in Part 1 and Part 2. Only these columns are read.
+master_sheet_columns = ['Teacher1ID', 'SchoolNumber', 'CourseRecordID', 'CollegeGrantingCr', 'WhereTaughtCampus', 'CourseTitle']
+membership_sheet_columns = ['StudentNumber', 'CourseRecordID', 'SchoolNumber', 'ConcurrEnrolled']
+
+def load_course_tables(year):
+    """
+    Loads the Course Master and Course Membership sheets for a year and drops duplicate rows.
+
+    Parameters:
+    - year (int): The year to load.
+
+    Returns:
+    - (pd.DataFrame, pd.DataFrame): The master and membership tables.
+    """
+    master_table = read_sheet(year, 'Course Master', columns=master_sheet_columns).drop_duplicates(keep='first')
+    membership_table = read_sheet(year, 'Course Membership', columns=membership_sheet_columns).drop_duplicates(keep='first')
+    return master_table, membership_table
+
+# Load the tables for every year once (in parallel if workers are set in src/config.py). Part 2 uses them as well.
+course_tables = map_years(load_course_tables, years)
 
 for year in years:
     # Load Course Master and Course Membership data for the year
-    master_table = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name= 'Course Master').drop_duplicates(keep='first')
-    membership_table = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name= 'Course Membership').drop_duplicates(keep='first')
+    master_table, membership_table = course_tables[year]
+    membership_table = membership_table.copy()
     membership_table['year'] = year
 
     # Extract relevant columns and append to lists
@@ -81,8 +104,8 @@ df = df.drop(columns=['CourseRecordID'])
 
 ######################################################################################################################################################
 # Filter and prep data
-# Create a list of secondary school numbers
-secondary_school_ids = [330, 406, 410, 710, 706, 705, 703, 702]
+# Create a list of secondary school numbers (the schools in school_name_map)
+secondary_school_ids = list(school_name_map)
 
 # Keep records for secondary schools only
 df = df[df['school_number'].isin(secondary_school_ids)]
@@ -93,18 +116,7 @@ df = df.drop_duplicates(subset=['teacher_id', 'school_number'], keep='first')
 # Remove teachers who did not teach in the years below
 df = df[df['year'].isin(years)]
 
-# Map the school numbers to their names
-school_name_map = {
-    330: "Spring Creek Middle",
-    406: "North Cache Middle",
-    410: "South Cache Middle",
-    702: "Mountain Crest",
-    703: "Green Canyon",
-    705: "Ridgeline",
-    706: "Sky View",
-    710: "Cache High"
-}
-
+# Map the school numbers to their names (see src/config.py)
 # Create a new column with school names from the map
 df['school_name'] = df['school_number'].map(school_name_map)
 
@@ -120,8 +132,6 @@ high_school = df[df['school_number'].isin(high_school_ids)]
 middle_school = df[df['school_number'].isin(middle_school_ids)]
 
 # Create a dataframe to store post-covid data for high school and middle school
-years_temp = pd.Series(years)
-post_covid_years = years_temp[years_temp >= 2022].tolist()
 post_high = high_school[high_school['year'].isin(post_covid_years)]
 post_middle = middle_school[middle_school['year'].isin(post_covid_years)]
 
@@ -172,9 +182,8 @@ post_middle_grid.columns = [f'teacher_{int(c)}' for c in post_middle_grid.column
 membership_columns = {'StudentNumber': 'int32', 'CourseRecordID': 'string', 'SchoolNumber': 'int32', 'ConcurrEnrolled': 'string'}
 master_columns = {'Teacher1ID': 'int32', 'CourseRecordID': 'string', 'CollegeGrantingCr': 'string', 'WhereTaughtCampus': 'string', 'CourseTitle': 'string'}
 
-# Load the pickled data (student_tables)
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
+# Load the student numbers from the student tables (see src/students.py)
+student_tables = read_student_tables(years, columns=['student_number'])
 
 # Concatenate all years of data for each dataset into single DataFrames
 # This combines data from all years to create a complete record of the teachers had by students
@@ -185,9 +194,8 @@ all_master = []
 all_student_tables = []
 
 for year in years:
-    # Load Course Master and Course Membership data for the year
-    master_table = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name= 'Course Master').drop_duplicates(keep='first')
-    membership_table = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name= 'Course Membership').drop_duplicates(keep='first')
+    # Load Course Master and Course Membership data for the year (loaded in Part 1)
+    master_table, membership_table = course_tables[year]
 
     # Retrieve the data for the specified year from the student_tables dictionary
     student_table_year = student_tables[year]
@@ -215,6 +223,9 @@ master = master.rename(columns={'Teacher1ID': 'teacher_id', 'CourseRecordID': 'c
 # - The most recent school each teacher taught at (school_name)
 # - One row per unique student_number and teacher_id combination
 
+# Check which courses in the master table are advanced courses before joining it with the much larger membership table (see src/courses.py)
+master['course_advanced'] = course_is_advanced(master)
+
 # Create a dataframe that will store all of the information used to create the 'teacher_data' data frame
 all_teacher_data = pd.merge(membership, master, on='course_record_id', how='inner')
 
@@ -222,45 +233,23 @@ all_teacher_data = pd.merge(membership, master, on='course_record_id', how='inne
 # This is necessary to determine each teacher's most recent school
 all_teacher_data = pd.merge(all_teacher_data, student_table, on='student_number', how='inner')
 
-# Create a flag for whether a course is considered an advanced course
-all_teacher_data['advanced_course'] = (
-    (all_teacher_data['CollegeGrantingCr'].notnull()) | # Check for college credit
-    (all_teacher_data['WhereTaughtCampus'].notnull()) | # Check for campus location
-    (all_teacher_data['ConcurrEnrolled'] == 'Y') | # Check for concurrent enrollment
-    (all_teacher_data['CourseTitle'].str.startswith('AP', na=False)) | # Check for AP courses
-    (all_teacher_data['CourseTitle'].str.startswith('BTEC', na=False)) # Check for BTEC courses
-).fillna(False).astype(int)
+# Create a flag for whether a course is considered an advanced course: an advanced course in the master table, or concurrent enrollment
+all_teacher_data['advanced_course'] = is_advanced(all_teacher_data['course_advanced'], all_teacher_data['ConcurrEnrolled']).astype(int)
 
-# Group by teacher_id to determine which teachers taught at least one advanced course
-teacher_data = all_teacher_data.groupby('teacher_id', as_index=False).agg(
-    teacher_ac_ind=('advanced_course', lambda x: 1 if x.sum() > 0 else 0),  # Has at least one advanced course
-)
+# Group by teacher_id to determine which teachers taught at least one advanced course (see src/reductions.py)
+teacher_data = indicator_per_key(all_teacher_data, 'advanced_course', 'teacher_ac_ind', key='teacher_id')
 
 #======================================================================================================================
 # Extract relevant columns to determine the most recent school each teacher has taught at
 teacher_school = all_teacher_data[['teacher_id', 'school_number', 'year']].copy()
 
-# Sort by year in descending order so the most recent year comes first
-teacher_school = teacher_school.sort_values(by='year', ascending=False)
-
-# Keep the most recent school per teacher
-teacher_school = teacher_school.drop_duplicates(subset = ['teacher_id'], keep='first')
+# Keep the most recent school per teacher, the lowest school number if there are two that year (see src/reductions.py)
+teacher_school = latest_per_key(teacher_school, 'year', key='teacher_id', tie_break='school_number')
 
 # Drop the 'year' column since it's no longer needed
 teacher_school = teacher_school.drop(columns='year')
 
-# Map the school numbers to their names
-school_name_map = {
-    330: "Spring Creek Middle",
-    406: "North Cache Middle",
-    410: "South Cache Middle",
-    702: "Mountain Crest",
-    703: "Green Canyon",
-    705: "Ridgeline",
-    706: "Sky View",
-    710: "Cache High"
-}
-
+# Map the school numbers to their names (see src/config.py)
 # Create a new column with school names from the map
 teacher_school['school_name'] = teacher_school['school_number'].map(school_name_map)
 
@@ -283,9 +272,6 @@ student_teacher = student_teacher[student_teacher['teacher_id'].isin(teacher_dat
 # Remove duplicate combinations of student_number and teacher_id
 student_teacher = student_teacher.drop_duplicates()
 
-# Add a column that indicates if a student has had a teacher (this will help when creating the different grids)
-teacher_data['had_teacher'] = 1
-
 # Merge the filtered student_teacher pairs with teacher_data to attach school_name and ac_ind
 teacher_data = pd.merge(student_teacher, teacher_data, on='teacher_id', how='left')
 
@@ -313,123 +299,30 @@ teacher_data = pd.merge(student_teacher, teacher_data, on='teacher_id', how='lef
 # After each grid is created, we will merge in the ac_ind indicator from the academic dataset
 # This helps us see how having certain teachers connects to whether students took an ac_course
 # Read in the academic data
-academic_table = pd.read_csv('data/02_academic_modeling.csv')
+academic_table = read_artifact('02_academic_modeling')
 
 # We only want the student_number and ac_ind from this table
 ac_ind_table = academic_table[['student_number', 'ac_ind']].copy()
 
 #======================================================================================================================
-# Grid creation will be the same for all tables, it will only differ when filtering
 # Grid: All teachers and all students
-all_teacher_grid = teacher_data[['student_number', 'teacher_id', 'had_teacher']].copy()
-
-all_teacher_grid = all_teacher_grid.pivot_table(
-    index='student_number',
-    columns='teacher_id',
-    values='had_teacher',
-    aggfunc='max',      # If multiple matches, take the max (ensures value is 1)
-    fill_value=0        # Fill missing entries with 0 (means student didn’t have that teacher)
-)
-# Rename the columns to make them more descriptive (i.e. teacher_[x])
-all_teacher_grid.columns = [f'teacher_{int(col)}' for col in all_teacher_grid.columns]
+# The grids are sparse matrices with their labels (see src/grids.py): the full grid is built once from the
+# student–teacher pairs, and the other grids select its columns (teachers)
+all_teacher_grid = incidence_grid(teacher_data[['student_number', 'teacher_id']], ac_ind_table.set_index('student_number')['ac_ind'])
 
-# Reset the index to include student_number as a column for merging
-all_teacher_grid = all_teacher_grid.reset_index()
-
-# Add students ac_ind to the grid
-all_teacher_grid = pd.merge(all_teacher_grid, ac_ind_table, on='student_number', how='left')
-
-# Reorder columns: student_number, ac_ind, then everything else
-cols = ['student_number', 'ac_ind'] + [col for col in all_teacher_grid.columns if col not in ['student_number', 'ac_ind']]
-all_teacher_grid = all_teacher_grid[cols]
-
-all_teacher_grid.head()
+# The teacher_ac_ind and school_name of each teacher in the grid (in the order of its columns)
+grid_teachers = teacher_data.drop_duplicates(subset='teacher_id').set_index('teacher_id').loc[all_teacher_grid['teacher_id']]
+non_ac_teachers = (grid_teachers['teacher_ac_ind'] == 0).to_numpy()
 
 #======================================================================================================================
 # Grid: Non-AC teachers and all students
-non_ac_teacher_data = teacher_data[teacher_data['teacher_ac_ind'] == 0]
-
-non_ac_teacher_grid = non_ac_teacher_data[['student_number', 'teacher_id', 'had_teacher']].copy()
-
-non_ac_teacher_grid = non_ac_teacher_grid.pivot_table(
-    index='student_number',
-    columns='teacher_id',
-    values='had_teacher',
-    aggfunc='max',      # If multiple matches, take the max (ensures value is 1)
-    fill_value=0        # Fill missing entries with 0 (means student didn’t have that teacher)
-)
-
-non_ac_teacher_grid.columns = [f'teacher_{int(col)}' for col in non_ac_teacher_grid.columns]
-
-non_ac_teacher_grid = non_ac_teacher_grid.reset_index()
-
-non_ac_teacher_grid = pd.merge(non_ac_teacher_grid, ac_ind_table, on='student_number', how='left')
-
-cols = ['student_number', 'ac_ind'] + [col for col in non_ac_teacher_grid.columns if col not in ['student_number', 'ac_ind']]
-non_ac_teacher_grid = non_ac_teacher_grid[cols]
-
-non_ac_teacher_grid.head()
+non_ac_teacher_grid = subgrid(all_teacher_grid, non_ac_teachers)
 
 #======================================================================================================================
 # Grids: Non-AC teachers at each school and all students
-
-# List of schools to process
-schools = [
-    'Sky View',
-    'Green Canyon',
-    'Ridgeline',
-    'Mountain Crest',
-    'Cache High',
-    'Spring Creek Middle',
-    'North Cache Middle',
-    'South Cache Middle'
-]
-
-# Dictionary to store resulting DataFrames
-school_grids = {}
-
-# Loop through each school and create the non-ac teacher grid
-for school in schools:
-    # Filter to non-AC teachers at the current school
-    df = teacher_data[
-        (teacher_data['teacher_ac_ind'] == 0) &
-        (teacher_data['school_name'] == school)
-    ][['student_number', 'teacher_id', 'had_teacher']].copy()
-
-    # Pivot to student × teacher grid
-    df = df.pivot_table(
-        index='student_number',
-        columns='teacher_id',
-        values='had_teacher',
-        aggfunc='max',
-        fill_value=0
-    )
-
-    # Rename teacher columns
-    df.columns = [f'teacher_{int(col)}' for col in df.columns]
-
-    # Add student_number as a column
-    df = df.reset_index()
-
-    # Merge with ac_ind_table
-    df = pd.merge(df, ac_ind_table, on='student_number', how='left')
-
-    # Reorder columns
-    cols = ['student_number', 'ac_ind'] + [col for col in df.columns if col not in ['student_number', 'ac_ind']]
-    df = df[cols]
-
-    # Store the result
-    var_name = f"{school.lower().replace(' ', '_')}_grid"
-    school_grids[var_name] = df
-
-school_grids['sky_view_grid'].head()
-school_grids['green_canyon_grid'].head()
-school_grids['ridgeline_grid'].head()
-school_grids['mountain_crest_grid'].head()
-school_grids['cache_high_grid'].head()
-school_grids['spring_creek_middle_grid'].head()
-school_grids['north_cache_middle_grid'].head()
-school_grids['south_cache_middle_grid'].head()
+# One grid for every school in school_name_map: the non-AC teachers are split by school in one pass (see src/grids.py)
+non_ac_teacher_schools = grid_teachers['school_name'].where(non_ac_teachers).to_numpy()
+school_grids = split_grid(all_teacher_grid, non_ac_teacher_schools, list(school_name_map.values()))
 
 
 ######################################################################################################################################################
@@ -446,17 +339,11 @@ post_middle_grid.to_csv('data/ms_post_covid_teacher_data.csv')
 # ----------------------------------
 # PART 2: Student–Teacher Exposure Grids
 # ----------------------------------
-all_teacher_grid.to_csv('./data/all_teacher_grid.csv', index=False)
-non_ac_teacher_grid.to_csv('./data/non_ac_teacher_grid.csv', index=False)
-
-school_grids['sky_view_grid'].to_csv('./data/sky_view_non_ac_teacher_grid.csv', index=False)
-school_grids['green_canyon_grid'].to_csv('./data/green_canyon_non_ac_teacher_grid.csv', index=False)
-school_grids['ridgeline_grid'].to_csv('./data/ridgeline_non_ac_teacher_grid.csv', index=False)
-school_grids['mountain_crest_grid'].to_csv('./data/mountain_crest_non_ac_teacher_grid.csv', index=False)
-school_grids['cache_high_grid'].to_csv('./data/cache_high_non_ac_teacher_grid.csv', index=False)
-school_grids['spring_creek_middle_grid'].to_csv('./data/spring_creek_middle_non_ac_teacher_grid.csv', index=False)
-school_grids['north_cache_middle_grid'].to_csv('./data/north_cache_middle_non_ac_teacher_grid.csv', index=False)
-school_grids['south_cache_middle_grid'].to_csv('./data/south_cache_middle_non_ac_teacher_grid.csv', index=False)
+write_grid(all_teacher_grid, 'all_teacher_grid')
+write_grid(non_ac_teacher_grid, 'non_ac_teacher_grid')
+
+for school, school_grid in school_grids.items():
+    write_grid(school_grid, school_grid_name(school))
 
 print('===========================================')
 print('Teacher data exported successfully!')
@@ -1,17 +1,19 @@
-# The code will output two data files: 06_school_exploratory_data.csv and 06_school_modeling_data.csv
+# The code will output two data files: 06_school_exploratory_data.parquet and 06_school_modeling_data.parquet (see src/artifacts.py)
 import pandas as pd
-import pickle
 
-# Define the years to process
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.artifacts import write_artifact
+from src.config import years
+from src.parallel import map_years
+from src.reductions import latest_per_key, presence_grid
+from src.students import read_student_tables
+from src.workbooks import read_sheet
 
 # Specify the columns and their corresponding data types for each dataset to speed up the concatenation
 membership_columns = {'StudentNumber': 'int32', 'SchoolNumber': 'int16'}
 date = ['CourseEntryDate']
 
-# Load the pickled data (student_tables)
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
+# Load the student numbers from the student tables (see src/students.py)
+student_tables = read_student_tables(years, columns=['student_number'])
 
 # Concatenate all years of data for each dataset into single DataFrames
 # This combines data from all years to create a complete record of the schools attended by students
@@ -20,13 +22,35 @@ with open('./data/student_data.pkl', 'rb') as f:
 all_membership = []
 all_student_tables = []
 
-# Loop through each year and load the data and drop duplicates immediatly to clean the data and speed up the loop
+# Load the membership data for one year and drop duplicates immediatly to clean the data and speed up the loop
+def load_membership_year(year):
+    """
+    Loads the Course Membership sheet for a year with the columns and data types above, and adds the year of each course entry.
+
+    Parameters:
+    - year (int): The year to load.
+
+    Returns:
+    - pd.DataFrame: The membership table for the year.
+    """
+    membership_year = read_sheet(year, 'Course Membership', columns=list(membership_columns.keys()) + date)
+    membership_year = membership_year.astype(membership_columns)
+    membership_year[date] = membership_year[date].apply(pd.to_datetime)
+    membership_year = membership_year.drop_duplicates()
+
+    membership_year['year'] = pd.to_datetime(membership_year['CourseEntryDate'], errors='coerce').dt.year
+
+    # Ensure year is an integer
+    membership_year['year'] = membership_year['year'].astype(int)
+
+    return membership_year
+
+# Load the membership data for every year (in parallel if workers are set in src/config.py)
+membership_years = map_years(load_membership_year, years)
+
+# Loop through each year and collect the data
 for year in years:
-    membership_year = pd.read_excel(
-        f'data/{year} EOY Data - USU.xlsx', sheet_name='Course Membership', usecols=list(membership_columns.keys()) + date,
-    dtype=membership_columns,
-    parse_dates=date
-        ).drop_duplicates()
+    membership_year = membership_years[year]
     
     # Retrieve the data for the specified year from the student_tables dictionary
     student_table_year = student_tables[year]
@@ -34,11 +58,9 @@ for year in years:
     # Assign the year to student_table_year table
     # I will later use this to join with students current school, to make sure data is accurate on yearly basis
     student_table_year['year'] = year  
-    membership_year['year'] = pd.to_datetime(membership_year['CourseEntryDate'], errors='coerce').dt.year
 
     # Ensure year is an integer
     student_table_year['year'] = student_table_year['year'].astype(int)
-    membership_year['year'] = membership_year['year'].astype(int)
 
     # Append year-specific data to the respective lists
     all_membership.append(membership_year)
@@ -76,14 +98,8 @@ student_school.head()
 
 
 ######################################################################################################################################################
-# Pivot the merged table to create a grid of student_numbers by school_number
-school_grid = student_school.pivot_table(
-    index='student_number',
-    columns='school_number',
-    values='school_number',  # Use school_number to create binary attendance indicators
-    aggfunc=lambda x: 1,     # Set 1 to indicate attendance
-    fill_value=0             # Fill missing values with 0 to indicate no attendance
-)
+# Create a grid of student_numbers by school_number: 1 indicates attendance, 0 no attendance (see src/reductions.py)
+school_grid = presence_grid(student_school, 'student_number', 'school_number')
 
 # Rename the columns to make them more descriptive (i.e. school_[x])
 school_grid.columns = [f'school_{int(col)}' for col in school_grid.columns]
@@ -154,11 +170,6 @@ school_history = (
 # Create column school_count
 school_history['school_count'] = school_history['schools_attended'].apply(len)
 
-# Make sure student_number is a string
-current_schools['student_number'] = current_schools['student_number'].astype(str)
-school_history['student_number'] = school_history['student_number'].astype(str)
-df['student_number'] = df['student_number'].astype(str)
-
 # Drop useless columns from current_schools
 current_schools = current_schools.drop(columns=['CourseEntryDate'])
 
@@ -182,11 +193,8 @@ middle_schools = membership.copy()
 # Filter for middle schools
 middle_schools = middle_schools[middle_schools['school_number'].isin(middle_school_ids)]
 
-# Sort by year to get the most recent record per student
-middle_schools = middle_schools.sort_values(by=['year'], ascending=False)
-
-# Keep only the most recent middle school entry per student
-middle_schools = middle_schools.drop_duplicates(subset=['student_number'], keep='first')
+# Keep only the most recent middle school entry per student, the lowest school number if there are two that year (see src/reductions.py)
+middle_schools = latest_per_key(middle_schools, 'year', tie_break='school_number')
 
 # Rename school_number to middle_school
 middle_schools = middle_schools.rename(columns={'school_number': 'middle_school'})
@@ -204,11 +212,8 @@ high_schools = membership.copy()
 # Filter for high schools only
 high_schools = high_schools[high_schools['school_number'].isin(high_school_ids)]
 
-# Sort by year to get the most recent record per student
-high_schools = high_schools.sort_values(by=['year'], ascending=False)
-
-# Drop duplicates to keep the most recent high school per student
-high_schools = high_schools.drop_duplicates(subset=['student_number'], keep='first')
+# Keep the most recent high school per student, the lowest school number if there are two that year (see src/reductions.py)
+high_schools = latest_per_key(high_schools, 'year', tie_break='school_number')
 
 # Rename school_number to high_school
 high_schools = high_schools.rename(columns={'school_number': 'high_school'})
@@ -237,8 +242,8 @@ model_df.head()
 model_df = model_df.drop(columns=[col for col in model_df.columns if col.startswith('school_')])
 
 # Export the data
-df.to_csv('./data/06_school_exploratory_data.csv', index=False)
-model_df.to_csv('./data/06_school_modeling_data.csv', index=False)
+write_artifact(df, '06_school_exploratory_data')
+write_artifact(model_df, '06_school_modeling_data')
 
 print('===========================================')
 print('School data exported successfully!')
@@ -1,6 +1,15 @@
-# The code will output two data files: '07_clearinghouse_exploratory_data.csv' and '07_clearinghouse_model_data.csv'
+# The code will output two data files: '07_clearinghouse_exploratory_data.parquet' and '07_clearinghouse_model_data.parquet' (see src/artifacts.py)
 import pandas as pd
-import pickle
+
+from src.artifacts import write_artifact
+from src.config import years
+from src.courses import course_is_advanced, is_advanced
+from src.dates import parse_dates
+from src.parallel import map_years
+from src.reductions import latest_per_key
+from src.schemas import student_key
+from src.students import read_student_tables
+from src.workbooks import read_sheets
 
 # Load the clearinghouse data. We have two files, so we will load both and combine them
 clearing_old = pd.read_csv('data/Clearing House Data - USU Version.csv').drop_duplicates()
@@ -16,16 +25,17 @@ clearing_new = clearing_new.rename(columns={'Student Number': 'student_number'})
 # Concat both files
 clearing = pd.concat([clearing_old, clearing_new], ignore_index=True)
 
+# Convert student_number to the same integer key as the student tables (see src/schemas.py)
+# IDs that aren't valid student numbers can't match a student, so they become missing
+clearing['student_number'] = student_key(clearing['student_number'], errors='coerce')
+
 # Drop duplicate rows, to ensure only unique rows remain
 clearing = clearing.drop_duplicates()
 
 
 ######################################################################################################################################################
-
-# Load the pickled data (student_tables)
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+# Load the student numbers from the student tables (see src/students.py)
+student_tables = read_student_tables(years, columns=['student_number'])
 
 # Create empty tables to store yearly data
 all_membership = []
@@ -33,9 +43,17 @@ all_master = []
 all_students = []
 all_student_years = [] # This will be used to track years for post and pre-covid data
 
+# Load the Course Master and Course Membership sheets for every year (in parallel if workers are set in src/config.py)
+# Only the columns used below are read from each sheet
+sheet_columns = {
+    'Course Master': ['CollegeGrantingCr', 'WhereTaughtCampus', 'CourseTitle', 'CourseRecordID'],
+    'Course Membership': ['StudentNumber', 'ConcurrEnrolled', 'CourseRecordID']
+}
+year_sheets = map_years(read_sheets, years, sheet_columns=sheet_columns)
+
 for year in years:
-    master_year = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name='Course Master')
-    membership_year = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name='Course Membership')
+    master_year = year_sheets[year]['Course Master']
+    membership_year = year_sheets[year]['Course Membership']
     student_year = student_tables[year]
     student_year['year'] = year # This will be used to track years for post and pre-covid data
 
@@ -54,8 +72,6 @@ student_years = pd.concat(all_student_years, ignore_index=True) # This will be u
 # Clean up a few columns from membership table (this will be helpful later in the script)
 # Rename StudentNumber to student_number
 membership = membership.rename(columns={'StudentNumber': 'student_number'})
-# Make sure student_number is a string
-membership['student_number'] = membership['student_number'].astype(str)
 #==============================================================
 
 # Drop duplicate rows from each DataFrame
@@ -67,9 +83,6 @@ student_years = student_years.drop_duplicates() # This will be used to track yea
 #==============================================================
 # Create a df named 'student_clearing' that only includes clearinghouse data for the student_numbers we have
 # This df will be used throught the scrip
-# Make sure student_number is a string
-student['student_number'] = student['student_number'].astype(str)
-clearing['student_number'] = clearing['student_number'].astype(str)
 
 # Merge student table and clearning table
 student_clearing = pd.merge(student, clearing, on='student_number', how='left')
@@ -77,8 +90,8 @@ student_clearing = pd.merge(student, clearing, on='student_number', how='left')
 # Convert all column names to lowercase
 student_clearing.columns = student_clearing.columns.str.lower()
 
-# Convert enrollment_begin to datetime (first remove the .0 and cast to int) This will be used throught the script
-student_clearing['enrollment_begin'] = pd.to_datetime(student_clearing['enrollment_begin'].astype('Int64'), format='%Y%m%d')
+# Convert enrollment_begin (YYYYMMDD, e.g. 20190826.0) to datetime (see src/dates.py) This will be used throught the script
+student_clearing['enrollment_begin'] = parse_dates(student_clearing['enrollment_begin'])
 
 # Create model_df and df to left join with at the end of each data engineering step
 df = student.copy()
@@ -133,19 +146,17 @@ model_df = pd.merge(model_df, college_grad, on='student_number', how='left')
 
 ######################################################################################################################################################
 # Create a grid using student_number as rows and advanced courses course_titles as column headings
+# Check which courses in the master table are advanced courses (see src/courses.py)
+master['course_advanced'] = course_is_advanced(master)
+
 # Merge the master and membership table to get a list of advanced courses
 ac_list = pd.merge(master, membership, on='CourseRecordID', how='left').drop_duplicates()
 
 # Rename columns
 ac_list = ac_list.rename(columns={'CourseTitle': 'course_title'})
 
-# Filter down ac_list to only include advanced courses
-ac_list = ac_list[
-    (ac_list['CollegeGrantingCr'].notnull()) |
-    (ac_list['WhereTaughtCampus'].notnull()) |
-    (ac_list['ConcurrEnrolled'] == 'Y') |
-    (ac_list['course_title'].str.startswith('AP', na=False)) |
-    (ac_list['course_title'].str.startswith('BTEC', na=False))]
+# Filter down ac_list to only include advanced courses (an advanced course in the master table, or concurrent enrollment)
+ac_list = ac_list[is_advanced(ac_list['course_advanced'], ac_list['ConcurrEnrolled'])]
 
 # I manually standardized the course_title values in a Excel file, since many entries represented the same course but were labeled slightly differently
 # Load the manually cleaned mapping Excel file
@@ -200,10 +211,6 @@ ac_subject.columns.name = None
 ac_type = ac_type.drop_duplicates()
 ac_subject = ac_subject.drop_duplicates()
 
-# Make sure student_number is a string
-ac_type['student_number'] = ac_type['student_number'].astype(str)
-ac_subject['student_number'] = ac_subject['student_number'].astype(str)
-
 # Join the grids with the student_table to include all student_numbers not just student_numbers for students who have taken an advanced Course
 ac_type = pd.merge(student, ac_type, on='student_number', how='left')
 ac_subject = pd.merge(student, ac_subject, on='student_number', how='left')
@@ -352,11 +359,8 @@ df = pd.merge(df, college_grid, on='student_number', how='left')
 # Add logic to identify the most recent high school year per student
 # (This will be important if we separate by pre- and post-COVID years in the combined script.)
 
-# Get the most recent year per student from the student table
-latest_year = student_years.copy()
-latest_year = latest_year.sort_values(by='year', ascending=False)
-latest_year = latest_year.drop_duplicates(subset=['student_number'], keep='first')
-latest_year['student_number'] = latest_year['student_number'].astype(str)
+# Get the most recent year per student from the student table (see src/reductions.py)
+latest_year = latest_per_key(student_years, 'year')
 
 
 # Merge with df and model_df
@@ -367,8 +371,8 @@ model_df = pd.merge(model_df, latest_year, on='student_number', how='left')
 ######################################################################################################################################################
 # Export data
 
-df.to_csv('./data/07_clearinghouse_exploratory_data.csv', index=False)
-model_df.to_csv('./data/07_clearinghouse_model_data.csv', index=False)
+write_artifact(df, '07_clearinghouse_exploratory_data')
+write_artifact(model_df, '07_clearinghouse_model_data')
 
 print('===========================================')
 print('Clearinghouse data exported successfully!')
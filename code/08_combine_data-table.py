@@ -3,25 +3,30 @@
 # ----------------------------------
 # PART 1: Phase One Combine Data
 # ----------------------------------
-# This code compiles all modeling and exploratory data into four CSV files: 
-# 'model_data.csv', 'exploratory_data.csv' for full historical data 
-# and 'post_covid_model_data.csv', 'post_covid_exploratory_data.csv' for post-COVID data
+# This code compiles all modeling and exploratory data into four Parquet files (see src/artifacts.py): 
+# 'modeling_data.parquet', 'exploratory_data.parquet' for full historical data 
+# and 'post_covid_modeling_data.parquet', 'post_covid_exploratory_data.parquet' for post-COVID data
 
 # ----------------------------------
 # PART 2: Phase Two Combine Data with Clearinghouse Data
 # ----------------------------------
-# This code compiles all modeling and exploratory data into two CSV files: 
-# 'clearinghouse_model_data.csv', 'clearinghouse_explore_data.csv'
+# This code compiles all modeling and exploratory data into two Parquet files: 
+# 'clearinghouse_model_data.parquet', 'clearinghouse_exploratory_data.parquet'
 
 import pandas as pd
-import pickle
 
-# Define the years to process
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.artifacts import read_artifact, write_artifact
+from src.combine import left_join
+from src.config import post_covid_years, years
+from src.students import read_student_tables
 
-# Post Covid years
-years_temp = pd.Series(years)
-post_covid_years = years_temp[years_temp >= 2022].tolist()
+# Cohorts to export: file name prefix -> years of students included
+# Every cohort is filtered from the same combined data, so another cohort window (e.g., 'pre_covid_': [2017, 2018])
+# only needs an entry here, not another round of joins
+cohorts = {
+    '': years,
+    'post_covid_': post_covid_years,
+}
 
 ######################################################################################################################################################
 # ----------------------------------
@@ -30,31 +35,30 @@ post_covid_years = years_temp[years_temp >= 2022].tolist()
 
 # Load in the modeling datasets that will be joined later
 # []_model represents modeling files
-academic_model = pd.read_csv('data/02_academic_modeling.csv')
-demographic_model = pd.read_csv('data/03_demographic_modeling.csv')
-assessment_model = pd.read_csv('data/04_assessment_data.csv')
+academic_model = read_artifact('02_academic_modeling')
+demographic_model = read_artifact('03_demographic_modeling')
+assessment_model = read_artifact('04_assessment_data')
 # teacher_model = pd.read_csv('data/05_teacher_modeling_data.csv')
-school_model = pd.read_csv('data/06_school_modeling_data.csv')
+school_model = read_artifact('06_school_modeling_data')
 
 # Load in the exploratory datasets that will be joined later
 # []_df represents exploratory files
-academic_df = pd.read_csv('data/02_academic_exploratory.csv')
-demographic_df = pd.read_csv('data/03_demographic_exploratory.csv')
-assessment_df = pd.read_csv('data/04_assessment_data.csv')
+academic_df = read_artifact('02_academic_exploratory')
+demographic_df = read_artifact('03_demographic_exploratory')
+assessment_df = read_artifact('04_assessment_data')
 # teacher_df = pd.read_csv('data/05_teacher_exploratory_data.csv')
-school_df = pd.read_csv('data/06_school_exploratory_data.csv')
+school_df = read_artifact('06_school_exploratory_data')
 
-# Load the pickled data (student_tables)
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
+# Load the student numbers from the student tables (see src/students.py)
+student_tables = read_student_tables(years, columns=['student_number'])
 
-# Function to process student data for given years (so post_covid years and all years can be processed at the same time)
-def process_student_data(years, prefix=""):
+# Function to process student data for all the cohorts at the same time (so post_covid years and all years are joined once)
+def process_student_data(years, cohorts):
     """
-    Processes student data for the specified years and exports both exploratory and modeling datasets.
+    Combines the student data for the specified years and exports both exploratory and modeling datasets for each cohort.
     Parameters:
-    - years (list): The list of years to process.
-    - prefix (str): Optional prefix for output file names (e.g., "post_covid_").
+    - years (list): The list of years to process (every cohort's years must be included).
+    - cohorts (dict): File name prefix (e.g., "post_covid_") -> the years of students included in the cohort.
     """
 
     all_students = []
@@ -69,29 +73,40 @@ def process_student_data(years, prefix=""):
     model_df = model_df.drop(columns='year')
     model_df = model_df.drop_duplicates(keep='first')
 
-    # Merge model_df with all modeling datasets
-    model_df = pd.merge(model_df, academic_model, on='student_number', how='left')
-    model_df = pd.merge(model_df, demographic_model, on='student_number', how='left')
-    model_df = pd.merge(model_df, assessment_model, on='student_number', how='left')
-    # model_df = pd.merge(model_df, teacher_model, on='student_number', how='left')
-    model_df = pd.merge(model_df, school_model, on='student_number', how='left')
-
-    # Merge df with all exploratory datasets
-    df = pd.merge(df, academic_df, on=['student_number', 'year'], how='left')
-    df = pd.merge(df, demographic_df, on=['student_number', 'year'], how='left')
-    df = pd.merge(df, assessment_df, on=['student_number'], how='left')
-    # df = pd.merge(df, teacher_df, on=['student_number', 'year'], how='left')
-    df = pd.merge(df, school_df, on=['student_number', 'year'], how='left')
+    # Join all modeling datasets onto model_df in one pass (see src/combine.py)
+    model_df = left_join(model_df, [
+        (academic_model, ['student_number']),
+        (demographic_model, ['student_number']),
+        (assessment_model, ['student_number']),
+        # (teacher_model, ['student_number']),
+        (school_model, ['student_number']),
+    ])
+
+    # Join all exploratory datasets onto df in one pass
+    df = left_join(df, [
+        (academic_df, ['student_number', 'year']),
+        (demographic_df, ['student_number', 'year']),
+        (assessment_df, ['student_number']),
+        # (teacher_df, ['student_number', 'year']),
+        (school_df, ['student_number', 'year']),
+    ])
 
     df = df.drop_duplicates(keep='first')
-    df.to_csv(f'./data/{prefix}exploratory_data.csv', index=False)
-    model_df.to_csv(f'./data/{prefix}modeling_data.csv', index=False)
 
-# Process full historical data
-process_student_data(years, prefix="")
+    # Every row only depends on its own student (and year), so each cohort is a filter of the combined data
+    model_df = model_df.set_index('student_number')
+    for prefix, cohort_years in cohorts.items():
+        cohort_df = df[df['year'].isin(cohort_years)]
+
+        # Keep the cohort's students in the order they first appear in the cohort's years
+        cohort_students = cohort_df['student_number'].drop_duplicates()
+        cohort_model = model_df.loc[cohort_students].reset_index()
+
+        write_artifact(cohort_df, f'{prefix}exploratory_data')
+        write_artifact(cohort_model, f'{prefix}modeling_data')
 
-# Process post-COVID data
-process_student_data(post_covid_years, prefix="post_covid_")
+# Process full historical data and the post-COVID data
+process_student_data(years, cohorts)
 
 print('===========================================')
 print('Data exported successfully!')
@@ -105,25 +120,24 @@ print('===========================================')
 
 # Load in the modeling datasets that will be joined later
 # []_model represents modeling files
-academic_model = pd.read_csv('data/02_academic_modeling.csv')
-demographic_model = pd.read_csv('data/03_demographic_modeling.csv')
-assessment_model = pd.read_csv('data/04_assessment_data.csv')
+academic_model = read_artifact('02_academic_modeling')
+demographic_model = read_artifact('03_demographic_modeling')
+assessment_model = read_artifact('04_assessment_data')
 # teacher_model = pd.read_csv('data/05_teacher_modeling_data.csv')
-school_model = pd.read_csv('data/06_school_modeling_data.csv')
-clearinghouse_model = pd.read_csv('data/07_clearinghouse_model_data.csv')
+school_model = read_artifact('06_school_modeling_data')
+clearinghouse_model = read_artifact('07_clearinghouse_model_data')
 
 # Load in the exploratory datasets that will be joined later
 # []_df represents exploratory files
-academic_df = pd.read_csv('data/02_academic_exploratory.csv')
-demographic_df = pd.read_csv('data/03_demographic_exploratory.csv')
-assessment_df = pd.read_csv('data/04_assessment_data.csv')
+academic_df = read_artifact('02_academic_exploratory')
+demographic_df = read_artifact('03_demographic_exploratory')
+assessment_df = read_artifact('04_assessment_data')
 # teacher_df = pd.read_csv('data/05_teacher_exploratory_data.csv')
-school_df = pd.read_csv('data/06_school_exploratory_data.csv')
-clearinghouse_df = pd.read_csv('data/07_clearinghouse_exploratory_data.csv')
+school_df = read_artifact('06_school_exploratory_data')
+clearinghouse_df = read_artifact('07_clearinghouse_exploratory_data')
 
-# Load the pickled data (student_tables)
-with open('./data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
+# Load the student numbers from the student tables (see src/students.py)
+student_tables = read_student_tables(years, columns=['student_number'])
 
 # Drop ac_ind from academic_model and academic_df
 academic_df = academic_df.drop(columns='ac_ind')
@@ -141,21 +155,25 @@ model_df = df.copy()
 model_df = model_df.drop(columns='year')
 model_df = model_df.drop_duplicates(keep='first')
 
-# Merge model_df with all modeling datasets
-model_df = pd.merge(model_df, academic_model, on='student_number', how='left')
-model_df = pd.merge(model_df, demographic_model, on='student_number', how='left')
-model_df = pd.merge(model_df, assessment_model, on='student_number', how='left')
-# model_df = pd.merge(model_df, teacher_model, on='student_number', how='left')
-model_df = pd.merge(model_df, school_model, on='student_number', how='left')
-model_df = pd.merge(model_df, clearinghouse_model, on='student_number', how='left')
-
-# Merge df with all exploratory datasets
-df = pd.merge(df, academic_df, on=['student_number', 'year'], how='left')
-df = pd.merge(df, demographic_df, on=['student_number', 'year'], how='left')
-df = pd.merge(df, assessment_df, on=['student_number'], how='left')
-# df = pd.merge(df, teacher_df, on=['student_number', 'year'], how='left')
-df = pd.merge(df, school_df, on=['student_number', 'year'], how='left')
-df = pd.merge(df, clearinghouse_df, on=['student_number'], how='left')
+# Join all modeling datasets onto model_df in one pass (see src/combine.py)
+model_df = left_join(model_df, [
+    (academic_model, ['student_number']),
+    (demographic_model, ['student_number']),
+    (assessment_model, ['student_number']),
+    # (teacher_model, ['student_number']),
+    (school_model, ['student_number']),
+    (clearinghouse_model, ['student_number']),
+])
+
+# Join all exploratory datasets onto df in one pass
+df = left_join(df, [
+    (academic_df, ['student_number', 'year']),
+    (demographic_df, ['student_number', 'year']),
+    (assessment_df, ['student_number']),
+    # (teacher_df, ['student_number', 'year']),
+    (school_df, ['student_number', 'year']),
+    (clearinghouse_df, ['student_number']),
+])
 
 df = df.drop_duplicates(keep='first')
 df = df.fillna(0)
@@ -200,8 +218,8 @@ model_df = model_df.fillna(0)
 ######################################################################################################################################################
 # Export the data that includes all years
 
-df.to_csv('data/clearinghouse_exploratory_data.csv')
-model_df.to_csv('data/clearinghouse_model_data.csv')
+write_artifact(df, 'clearinghouse_exploratory_data')
+write_artifact(model_df, 'clearinghouse_model_data')
 
 print('===========================================')
 print('Data exported successfully!')
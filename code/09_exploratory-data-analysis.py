@@ -3,8 +3,8 @@ import pandas as pd
 import warnings
 import ast
 
-# Specify all years
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.artifacts import read_artifact
+from src.config import years
 
 # Suppress warnings and set display options
 warnings.filterwarnings("ignore")
@@ -14,7 +14,7 @@ pd.set_option('display.float_format', lambda x: f'{x:.2f}')
 ##########################################################################
 # PHASE ONE - Exploratory Data
 # Load dataset
-data = pd.read_csv("data/exploratory_data.csv")
+data = read_artifact('exploratory_data')
 
 # Title
 print("\033[1m" + "=" * 75)
@@ -193,8 +193,8 @@ if __name__ == "__main__":
 
 ##########################################################################
 # PHASE TWO - Clearinghouse Exploratory Data
-# Load the df from CSV file
-df = pd.read_csv("data/clearinghouse_exploratory_data.csv")
+# Load the df (see src/artifacts.py)
+df = read_artifact('clearinghouse_exploratory_data')
 
 print("Clearinghouse Exploratory Data Analysis\n")
 
@@ -1,51 +1,46 @@
-import polars as pl
 import pandas as pd
 
-all_teachers = pl.read_csv('./data/all_teacher_grid.csv')
-non_ac_teachers = pl.read_csv('./data/non_ac_teacher_grid.csv')
-sky_view = pl.read_csv('./data/sky_view_non_ac_teacher_grid.csv')
-green_canyon = pl.read_csv('./data/green_canyon_non_ac_teacher_grid.csv')
-ridgeline = pl.read_csv('./data/ridgeline_non_ac_teacher_grid.csv')
-mountain_crest = pl.read_csv('./data/mountain_crest_non_ac_teacher_grid.csv')
-cache_high = pl.read_csv('./data/cache_high_non_ac_teacher_grid.csv')
-spring_creek_middle = pl.read_csv('./data/spring_creek_middle_non_ac_teacher_grid.csv')
-north_cache_middle = pl.read_csv('./data/north_cache_middle_non_ac_teacher_grid.csv')
-south_cache_middle = pl.read_csv('./data/south_cache_middle_non_ac_teacher_grid.csv')
-
-data_frames = [
-    all_teachers, non_ac_teachers, sky_view, green_canyon, ridgeline, 
-    mountain_crest, cache_high, spring_creek_middle, north_cache_middle, south_cache_middle
-]
-target_columns = ['ac_ind'] * len(data_frames)
-sheet_names = [
-    'all_teachers', 'non_ac_teachers', 'sky_view', 'green_canyon', 'ridgeline', 
-    'mountain_crest', 'cache_high', 'spring_creek_middle', 'north_cache_middle', 'south_cache_middle'
-]
-
-def compute_correlation(df, target_column):
-    numeric_df = df.select(pl.all().exclude('student_number')).to_pandas()
-    corr_matrix = numeric_df.corr()
-
-    if target_column not in corr_matrix:
-        return pl.DataFrame({'Variable': [], target_column: []})
-
-    corr_with_target = pl.from_pandas(
-        corr_matrix.reset_index().rename(columns={"index": "Variable"})
-    ).select(['Variable', target_column])
-
-    return corr_with_target.sort(target_column, descending=True)
+from src.config import correlation_resamples, school_name_map
+from src.correlations import grid_correlations
+from src.grids import read_grid, school_grid_name
+
+# The grids saved by 05_teacher-table.py (see src/grids.py): all teachers, non-AC teachers, and the non-AC teachers
+# of every school in school_name_map (e.g., sky_view_non_ac_teacher_grid) -> sheet name (e.g., sky_view)
+grid_names = {'all_teacher_grid': 'all_teachers', 'non_ac_teacher_grid': 'non_ac_teachers'}
+for school in school_name_map.values():
+    grid_names[school_grid_name(school)] = school.lower().replace(' ', '_')
+
+def compute_correlation(grid, target_column='ac_ind'):
+    """
+    Correlates every teacher of a grid with the target, straight from the sparse grid (see src/correlations.py).
+    With AC_CORRELATION_RESAMPLES set (see src/config.py), every teacher also gets a permutation p-value, a bootstrap
+    confidence interval and significance_ind.
+
+    Parameters:
+    - grid (dict): The grid (see src/grids.py).
+    - target_column (str): Name of the target column in the output.
+
+    Returns:
+    - pd.DataFrame: Variable and its correlation with the target, highest first (empty if the grid has no students).
+    """
+    if grid['matrix'].shape[0] == 0:
+        return pd.DataFrame({'Variable': [], target_column: []})
+
+    corr_with_target = grid_correlations(grid, correlation_resamples).reset_index()
+
+    # Missing correlations (e.g., a teacher every student in the grid had) come first, as they did before
+    return corr_with_target.sort_values(target_column, ascending=False, na_position='first', kind='stable')
 
 with pd.ExcelWriter('data/teacher_correlations.xlsx') as writer:
     sheet_written = False
-    for df, target_column, sheet_name in zip(data_frames, target_columns, sheet_names):
-        corr_data = compute_correlation(df, target_column)
+    for name, sheet_name in grid_names.items():
+        corr_data = compute_correlation(read_grid(name))
 
-        if not corr_data.is_empty():
-            corr_data.to_pandas().to_excel(writer, sheet_name=sheet_name, index=False)
+        if not corr_data.empty:
+            corr_data.to_excel(writer, sheet_name=sheet_name, index=False)
             sheet_written = True
         else:
             print(f"Correlation data for '{sheet_name}' is empty and was skipped.")
 
     if not sheet_written:
         raise ValueError("No sheets were written. All correlation data were empty.")
-
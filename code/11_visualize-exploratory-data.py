@@ -5,11 +5,14 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
 import ast
-import pickle
-# from scipy.stats import gaussian_kde
 
-# Specify all years
-years = [2017, 2018, 2022, 2023, 2024, 2025]
+from src.artifacts import read_artifact
+from src.config import years
+from src.courses import course_is_advanced, is_advanced
+from src.schemas import student_key
+from src.students import read_student_tables
+from src.workbooks import read_sheet
+# from scipy.stats import gaussian_kde
 
 # Set warnings to ignore
 warnings.filterwarnings("ignore")
@@ -37,8 +40,8 @@ sns.set_style("whitegrid")  # Set Seaborn style
 
 ##########################################################################
 # PHASE ONE - Exploratory Data Visualizations
-# Load the data from CSV files
-data = pd.read_csv("data/exploratory_data.csv")
+# Load the data (see src/artifacts.py)
+data = read_artifact('exploratory_data')
 
 # Title
 print("\033[1m" + "=" * 75)
@@ -228,8 +231,8 @@ if __name__ == "__main__":
 
 ##########################################################################
 # PHASE TWO - Clearinghouse Exploratory Data Visualizations
-# Load the df from CSV file
-df = pd.read_csv("data/clearinghouse_exploratory_data.csv", low_memory=False)
+# Load the df (see src/artifacts.py)
+df = read_artifact('clearinghouse_exploratory_data')
 
 print("Clearinghouse Exploratory Data Analysis\n")
 
@@ -423,11 +426,11 @@ clearing_new = clearing_new.rename(columns={'Student Number': 'student_number'})
 
 # Combine the datasets
 clearing = pd.concat([clearing_old, clearing_new], ignore_index=True)
+clearing['student_number'] = student_key(clearing['student_number'], errors='coerce')
 clearing = clearing.drop_duplicates()
 
-# Load the pickled student data
-with open('data/student_data.pkl', 'rb') as f:
-    student_tables = pickle.load(f)
+# Load the student numbers from the student tables
+student_tables = read_student_tables(years, columns=['student_number'])
 
 # Create empty tables to store yearly data
 all_membership = []
@@ -436,8 +439,8 @@ all_students = []
 all_student_years = []
 
 for year in years:
-    master_year = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name='Course Master')
-    membership_year = pd.read_excel(f'data/{year} EOY Data - USU.xlsx', sheet_name='Course Membership')
+    master_year = read_sheet(year, 'Course Master', columns=['CollegeGrantingCr', 'WhereTaughtCampus', 'CourseTitle', 'CourseRecordID'])
+    membership_year = read_sheet(year, 'Course Membership', columns=['StudentNumber', 'ConcurrEnrolled', 'CourseRecordID'])
     student_year = student_tables[year]
     student_year['year'] = year
 
@@ -454,23 +457,15 @@ student_years = pd.concat(all_student_years, ignore_index=True)
 
 # Standardize columns
 membership = membership.rename(columns={'StudentNumber': 'student_number'})
-membership['student_number'] = membership['student_number'].astype(str)
 
 # Merge student table and clearing data
-student['student_number'] = student['student_number'].astype(str)
-clearing['student_number'] = clearing['student_number'].astype(str)
 student_clearing = pd.merge(student, clearing, on='student_number', how='left')
 
-# Create ac_list for advanced courses
+# Create ac_list for advanced courses (see src/courses.py)
+master['course_advanced'] = course_is_advanced(master)
 ac_list = pd.merge(master, membership, on='CourseRecordID', how='left').drop_duplicates()
 ac_list = ac_list.rename(columns={'CourseTitle': 'course_title'})
-ac_list = ac_list[
-    (ac_list['CollegeGrantingCr'].notnull()) |
-    (ac_list['WhereTaughtCampus'].notnull()) |
-    (ac_list['ConcurrEnrolled'] == 'Y') |
-    (ac_list['course_title'].str.startswith('AP', na=False)) |
-    (ac_list['course_title'].str.startswith('BTEC', na=False))
-]
+ac_list = ac_list[is_advanced(ac_list['course_advanced'], ac_list['ConcurrEnrolled'])]
 
 def visualize_most_popular_courses(ac_list):
     """
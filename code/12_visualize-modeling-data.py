@@ -3,13 +3,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from src.artifacts import read_artifact
+
 # Set the seaborn style for better visuals
 sns.set(style="whitegrid")
 
 # Function to load and prepare data
-def load_data(filepath='data/modeling_data.csv'):
-    """Load and prepare the modeling data"""
-    df = pd.read_csv(filepath)
+def load_data(name='modeling_data'):
+    """Load and prepare the modeling data (see src/artifacts.py)"""
+    df = read_artifact(name)
     return df
 
 # Function to categorize columns
@@ -203,10 +205,10 @@ def plot_feature_importance(feature_importance_df, group_name, n_top=10):
     return plt.gcf(), None
 
 # Main function to generate all visualizations
-def generate_all_visualizations(data_path='data/modeling_data.csv'):
+def generate_all_visualizations(data_name='modeling_data'):
     """Generate visualizations for all feature groups"""
     # Load data
-    df = load_data(data_path)
+    df = load_data(data_name)
     
     # Categorize columns
     categories = categorize_columns(df.columns)
@@ -263,7 +265,7 @@ def generate_all_visualizations(data_path='data/modeling_data.csv'):
     return visualizations
 
 # Execute the visualization generator
-visualizations = generate_all_visualizations('data/modeling_data.csv')
+visualizations = generate_all_visualizations('modeling_data')
 
 # Main execution code (uncomment to run)
 if __name__ == "__main__":
@@ -1,9 +1,10 @@
-import pandas as pd
 import bambi as bmb
 import arviz as az
 import os
 import glob
 
+from src.artifacts import read_artifact
+
 
 ########################################################
 # SPECIFY WHAT MODEL TO RUN
@@ -19,9 +20,9 @@ multilevel_model_ind = 1 # Run a multilevel model
 
 # Load in the data based on the indicators
 if post_covid_data_ind == 1:
-    df = pd.read_csv('data/post_covid_modeling_data.csv', low_memory = False)
+    df = read_artifact('post_covid_modeling_data')
 else:
-    df = pd.read_csv('data/modeling_data.csv', low_memory = False)
+    df = read_artifact('modeling_data')
 
 # Define the folder path where the model output will be saved
 folder_path = "output/"
@@ -1,9 +1,10 @@
-import pandas as pd
 import bambi as bmb
 import arviz as az
 import os
 import glob
 
+from src.artifacts import read_artifact
+
 
 ########################################################
 # SPECIFY WHAT MODEL TO RUN
@@ -20,9 +21,9 @@ college_grad_model_ind = 1 # Run a model for college graduation
 
 # Load in the data based on the indicators
 # if post_covid_data_ind == 1:
-#     df = pd.read_csv('data/post_covid_modeling_data.csv', low_memory = False)
+#     df = read_artifact('post_covid_modeling_data')
 # else:
-df = pd.read_csv('data/clearinghouse_model_data.csv', low_memory = False)
+df = read_artifact('clearinghouse_model_data')
 
 # Define the folder path where the model output will be saved
 folder_path = "output/"
@@ -37,7 +38,7 @@ if not os.path.exists(folder_path):
 #######################################################
 
 # Columns to exclude from modeling
-col_drop = ['Unnamed: 0', 'student_number', 'hs_advanced_math_y', 'tribal_affiliation_g', 'year', 'passed_civics_exam_y']
+col_drop = ['student_number', 'hs_advanced_math_y', 'tribal_affiliation_g', 'year', 'passed_civics_exam_y']
 for col in df.columns:
     if col.startswith('teacher') or col.startswith('exit') or col.startswith('envi'):
         col_drop.append(col)
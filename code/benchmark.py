@@ -0,0 +1,48 @@
+###########################################################################
+# Times the stages of the pipeline on simulated data at several scales (see src/benchmark.py).
+# Records the wall time, peak memory and rows written by each stage in data/benchmarks/history.jsonl,
+# and flags stages that got slower or use more memory than the baseline in data/benchmarks/baseline.json.
+#
+# Usage (from the project root):
+#   uv run code/benchmark.py --scales 0.1 1 10
+#   uv run code/benchmark.py --scales 1 --stages 01 02 03 04 05 06 07 08 10 13 14 15
+#   uv run code/benchmark.py --scales 1 10 --save-baseline
+#
+# Exits with status 1 if a stage failed or regressed, so it can be used as a check before merging changes.
+
+import argparse
+import sys
+
+from src.benchmark import (benchmark_dir, default_stages, default_tolerance, find_regressions, load_baseline,
+                           run_benchmark, save_baseline)
+from src.stages import stages
+
+parser = argparse.ArgumentParser(description='Time the pipeline stages on simulated data.')
+parser.add_argument('--scales', type=float, nargs='+', default=[1.0], help='scales of the simulated data (default: 1)')
+parser.add_argument('--stages', nargs='+', default=default_stages, choices=list(stages),
+                    help='stages to run, in order (default: 01 to 08)')
+parser.add_argument('--seed', type=int, default=2025, help='seed of the simulated data (default: 2025)')
+parser.add_argument('--format', choices=['xlsx', 'parquet'], default='parquet',
+                    help="format of the simulated EOY sheets (with 'xlsx', add stage 00 to time the conversion)")
+parser.add_argument('--bench-dir', default=benchmark_dir, help=f'folder for the data, history and baseline (default: {benchmark_dir})')
+parser.add_argument('--tolerance', type=float, default=default_tolerance,
+                    help=f'allowed relative increase in time and memory (default: {default_tolerance})')
+parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+args = parser.parse_args()
+
+records = run_benchmark(args.scales, args.stages, seed=args.seed, file_format=args.format, bench_dir=args.bench_dir)
+
+regressions = find_regressions(records, load_baseline(args.bench_dir), args.tolerance)
+if args.save_baseline:
+    save_baseline(records, args.bench_dir)
+
+print('===========================================')
+if regressions:
+    print('Regressions compared with the baseline:')
+    for regression in regressions:
+        print(f'- {regression}')
+else:
+    print('No regressions compared with the baseline')
+print('===========================================')
+
+sys.exit(1 if regressions else 0)
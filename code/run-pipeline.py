@@ -0,0 +1,52 @@
+###########################################################################
+# Runs the pipeline: every numbered script that's out of date, in order (see src/pipeline.py and src/stages.py).
+# A script is skipped if its code and the contents of the files it reads haven't changed since it last ran,
+# so after a change only the scripts that depend on it run again (e.g., changing 13_antecedent-model.py only runs 13).
+#
+# Usage (from the project root):
+#   uv run code/run-pipeline.py              # every script
+#   uv run code/run-pipeline.py 08 10        # what's needed for 08 and 10 (00 to 08, and 10)
+#   uv run code/run-pipeline.py --dry-run    # only show what would run
+#   uv run code/run-pipeline.py --force 05   # run 05 and everything it needs, even if up to date
+#   uv run code/run-pipeline.py --jobs 4     # run up to 4 scripts at the same time (e.g., 04, 05, 06 and 07)
+#   uv run code/run-pipeline.py --incremental  # after adding a year, only process the new year where possible
+#
+# With --jobs, every script also uses AC_WORKERS worker processes (see src/parallel.py), so keep jobs x workers
+# around the number of cores.
+
+import argparse
+import os
+import sys
+
+from src.pipeline import run_pipeline
+from src.stages import stages
+
+parser = argparse.ArgumentParser(description='Run the pipeline scripts that are out of date.')
+parser.add_argument('targets', nargs='*', metavar='stage', help=f"stages to bring up to date ({', '.join(stages)}; default: all)")
+parser.add_argument('--force', action='store_true', help='run the selected stages even if they are up to date')
+parser.add_argument('--dry-run', action='store_true', help='only show what would run')
+parser.add_argument('--jobs', '-j', type=int, default=1,
+                    help='number of stages to run at the same time (default: 1; output goes to data/logs)')
+parser.add_argument('--incremental', action='store_true',
+                    help='only process the years that are new or changed (same as AC_INCREMENTAL=1, see src/cache.py)')
+args = parser.parse_args()
+
+# The scripts read AC_INCREMENTAL when they start (see src/config.py)
+if args.incremental:
+    os.environ['AC_INCREMENTAL'] = '1'
+
+unknown = [stage for stage in args.targets if stage not in stages]
+if unknown:
+    parser.error(f"unknown stage {', '.join(unknown)} (choose from {', '.join(stages)})")
+
+try:
+    results = run_pipeline(args.targets or None, force=args.force, dry_run=args.dry_run, jobs=args.jobs)
+except RuntimeError as error:
+    print(error)
+    sys.exit(1)
+
+done = 'would run' if args.dry_run else 'ran'
+ran = [stage for stage, result in results.items() if result == done]
+print('===========================================')
+print(f"{done.capitalize()}: {', '.join(ran) if ran else 'nothing, everything is up to date'}")
+print('===========================================')
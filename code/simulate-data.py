@@ -0,0 +1,34 @@
+###########################################################################
+# Writes simulated input data with the same files, sheets and columns as the district's data (see src/simulate.py),
+# so the pipeline can be run and timed without the real data.
+#
+# Usage (from the project root):
+#   uv run code/simulate-data.py --data-dir simulated/data --scale 1
+#   uv run code/simulate-data.py --data-dir simulated/data --scale 50 --format parquet
+#
+# Then run the scripts from the folder above the data folder (e.g., `cd simulated && uv run ../code/01_student-table.py`).
+# Existing files are never replaced unless --force is given, so this can't overwrite the real data by accident.
+
+import argparse
+
+from src.simulate import simulate_data
+
+parser = argparse.ArgumentParser(description='Write simulated EOY workbooks, clearinghouse files and course lists.')
+parser.add_argument('--data-dir', default='data', help='folder to write the files to (default: data)')
+parser.add_argument('--scale', type=float, default=1.0, help='multiplier on district size (default: 1)')
+parser.add_argument('--seed', type=int, default=2025, help='random seed (default: 2025)')
+parser.add_argument('--years', type=int, nargs='+', help='years to simulate (default: the pipeline years)')
+parser.add_argument('--format', choices=['xlsx', 'parquet'], default='xlsx',
+                    help="'xlsx' for EOY workbooks, 'parquet' to write the converted sheets directly (needed at large scales)")
+parser.add_argument('--force', action='store_true', help='replace files that already exist')
+args = parser.parse_args()
+
+rows = simulate_data(args.data_dir, years=args.years, scale=args.scale, seed=args.seed,
+                     file_format=args.format, overwrite=args.force)
+
+for year, sheets in rows.items():
+    print(f'{year}: ' + ', '.join(f'{sheet_name} ({count:,} rows)' for sheet_name, count in sheets.items()))
+
+print('===========================================')
+print(f'Simulated data written to {args.data_dir}')
+print('===========================================')
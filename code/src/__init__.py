@@ -0,0 +1 @@
+# Shared functions for the numbered scripts in /code
@@ -0,0 +1,143 @@
+# Save and load the data passed between the scripts (e.g., 02_academic_modeling from 02_academic-table.py to 08_combine_data-table.py)
+#
+# Each artifact is a Parquet file in /data (e.g., data/02_academic_modeling.parquet). Parquet keeps the data types, so a
+# script gets back exactly what the previous script saved instead of re-inferring every column from a CSV file.
+# The columns below are pinned to the same data types every run. Lists (e.g., schools_attended) are pinned as text, as
+# they were in the CSV files, so rows can still be compared (e.g., drop_duplicates) and parsed with ast.literal_eval.
+# Dummy-coded columns (e.g., gender_m, school_702) keep the data type they were made with.
+# Text that read_csv treats as missing (e.g., the 'None' school label from 06_school-table.py) is saved as missing too,
+# so the scripts reading an artifact see the same values they saw when the artifacts were CSV files.
+# Set export_csv in src/config.py (AC_EXPORT_CSV=1) to also save a CSV copy of every artifact for use outside the pipeline.
+
+import fnmatch
+import os
+
+import pandas as pd
+
+from src import config
+from src.files import atomic_write
+from src.schemas import make_storable, student_key_dtype
+
+# Text that read_csv reads as a missing value (pandas' default na_values)
+_missing_text = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+_student = {'student_number': student_key_dtype}
+_student_year = {**_student, 'year': 'int16'}
+_scores = {
+    'composite_score': 'float64', 'english_score': 'float64', 'math_score': 'float64',
+    'reading_score': 'float64', 'science_score': 'float64', 'writing_score': 'float64'
+}
+_clearinghouse = {
+    'start_college_y': 'float64', 'college_grad_y': 'float64', 'ap': 'float64', 'btech': 'float64', 'ce': 'float64',
+    'arts': 'float64', 'cte': 'float64', 'english': 'float64', 'math': 'float64', 'science': 'float64', 'social_science': 'float64'
+}
+_schools = {'schools_attended': 'str', 'school_count': 'int64'}
+_academic = {
+    'ac_ind': 'int64', 'ac_count': 'int64', 'ac_gpa': 'float64', 'overall_gpa': 'float64', 'days_attended': 'int64',
+    'days_absent': 'int64', 'school_membership': 'int64', 'percent_days_attended': 'float64', 'extracurricular_ind': 'int64',
+    'extracurricular_count': 'int64', 'current_grade': 'int64', 'scram_membership': 'float64', 'regular_percent': 'float64'
+}
+
+# Artifact name (or pattern, e.g., post_covid_modeling_data matches '*modeling_data') -> pinned column data types
+# The first matching name is used, so specific names come before patterns
+artifact_schemas = {
+    # 02_academic-table.py (03_demographic-table.py saves both again without the regular_percent columns)
+    '02_academic_exploratory': {**_student_year, **_academic},
+    '02_academic_modeling': {**_student, **_academic},
+    # 03_demographic-table.py
+    '03_demographic_exploratory': {**_student_year, 'homeless_y': 'int64', 'part_time_home_school_y': 'int64'},
+    '03_demographic_modeling': _student,
+    # 04_assessment-table.py
+    '04_assessment_data': {**_student, **_scores},
+    # 06_school-table.py
+    '06_school_exploratory_data': {**_student_year, **_schools},
+    '06_school_modeling_data': _student,
+    # 07_clearinghouse-table.py
+    '07_clearinghouse_exploratory_data': {**_student, **_clearinghouse},
+    '07_clearinghouse_model_data': {**_student_year, **_clearinghouse},
+    # 08_combine_data-table.py (with and without the post_covid_ prefix)
+    'clearinghouse_exploratory_data': {**_student_year, **_academic, **_scores, **_clearinghouse, **_schools},
+    'clearinghouse_model_data': {**_student_year, **_academic, **_scores, **_clearinghouse},
+    '*exploratory_data': {**_student_year, **_academic, **_scores, **_schools},
+    '*modeling_data': {**_student, **_academic, **_scores},
+}
+
+
+def artifact_schema(name):
+    """
+    Returns the pinned column data types for an artifact.
+
+    Parameters:
+    - name (str): Name of the artifact (e.g., '02_academic_modeling').
+
+    Returns:
+    - dict: Column name -> data type.
+    """
+    for pattern, schema in artifact_schemas.items():
+        if fnmatch.fnmatchcase(name, pattern):
+            return schema
+    raise KeyError(f"No schema for artifact '{name}'. Add it to artifact_schemas in src/artifacts.py")
+
+
+def artifact_path(name):
+    """
+    Returns the Parquet path of an artifact (e.g., data/02_academic_modeling.parquet).
+    """
+    return os.path.join(config.data_dir, f'{name}.parquet')
+
+
+def _pin_dtypes(df, schema):
+    """
+    Converts the columns of an artifact to their pinned data types. Columns that don't exist are skipped.
+    Integer columns with missing values are stored as floats, which is also how they would be read back from a CSV file.
+    """
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == 'str':
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+            continue
+        values = pd.to_numeric(df[column], errors='coerce')
+        if dtype.startswith('int') and values.isna().any():
+            dtype = 'float64'
+        df[column] = values.astype(dtype)
+    return df
+
+
+def write_artifact(df, name):
+    """
+    Saves an artifact with its pinned data types (and a CSV copy if export_csv is set in src/config.py).
+    The index isn't saved.
+
+    Parameters:
+    - df (pd.DataFrame): The data to save.
+    - name (str): Name of the artifact (e.g., '02_academic_modeling').
+    """
+    df = _pin_dtypes(df.copy(), artifact_schema(name))
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].mask(df[column].map(lambda x: isinstance(x, str) and x in _missing_text))
+    df = make_storable(df)
+    path = artifact_path(name)
+
+    # A script running at the same time never reads a partial file (see src/files.py)
+    atomic_write(path, lambda temp_path: df.to_parquet(temp_path, index=False))
+
+    if config.export_csv:
+        df.to_csv(os.path.join(config.data_dir, f'{name}.csv'), index=False)
+
+
+def read_artifact(name, columns=None):
+    """
+    Loads an artifact saved by write_artifact.
+
+    Parameters:
+    - name (str): Name of the artifact (e.g., '02_academic_modeling').
+    - columns (list): Names of the columns to load (defaults to all columns).
+
+    Returns:
+    - pd.DataFrame: The artifact's data.
+    """
+    return pd.read_parquet(artifact_path(name), columns=columns)
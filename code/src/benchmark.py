@@ -0,0 +1,218 @@
+# Time the pipeline on simulated data at several scales (see src/simulate.py and benchmark.py)
+#
+# Each stage is run as its own process, the way it's run by hand, from a project folder with simulated data
+# (e.g., data/benchmarks/scale-1/data). For every stage the wall time, peak memory (RSS) and rows written are recorded.
+# Every run is appended to a history file (one JSON record per stage, e.g., data/benchmarks/history.jsonl) and compared
+# with a stored baseline (data/benchmarks/baseline.json), so a stage that got slower or uses more memory is flagged.
+# Peak memory is the largest of the stage's process and the worker processes it started (see src/parallel.py).
+
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from src.simulate import simulate_data
+from src.stages import code_dir, output_rows, script_path
+
+# Default folder for the simulated data, logs, history and baseline
+benchmark_dir = os.path.join('data', 'benchmarks')
+
+# Stages run by default (10, 13, 14 and 15 can be added, see benchmark.py)
+default_stages = ['01', '02', '03', '04', '05', '06', '07', '08']
+
+# A stage is flagged if it's this much slower (or uses this much more memory) than the baseline
+default_tolerance = 0.25
+
+# Differences smaller than this many seconds are ignored (small stages vary more than the tolerance from run to run)
+min_seconds = 0.5
+
+
+def scale_dir(scale, bench_dir=benchmark_dir):
+    """
+    Returns the project folder used for a scale (e.g., data/benchmarks/scale-10).
+    """
+    return os.path.join(bench_dir, f'scale-{scale:g}')
+
+
+def prepare_data(scale, seed=2025, file_format='parquet', bench_dir=benchmark_dir):
+    """
+    Simulates the data for a scale, unless the same data (scale, seed and format) is already there.
+
+    Returns:
+    - str: The project folder to run the stages from.
+    """
+    root = scale_dir(scale, bench_dir)
+    settings = {'scale': scale, 'seed': seed, 'file_format': file_format}
+    settings_path = os.path.join(root, 'simulated.json')
+
+    if os.path.exists(settings_path):
+        with open(settings_path) as f:
+            if json.load(f) == settings:
+                return root
+
+    simulate_data(os.path.join(root, 'data'), scale=scale, seed=seed, file_format=file_format, overwrite=True)
+    with open(settings_path, 'w') as f:
+        json.dump(settings, f)
+    return root
+
+
+def _peak_rss_mb(usage):
+    """Converts ru_maxrss to megabytes (it's in kilobytes on Linux and bytes on macOS)."""
+    return usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def run_stage(stage, root):
+    """
+    Runs a stage's script from a project folder and measures it. The output is saved to root/logs/{stage}.log.
+
+    Parameters:
+    - stage (str): The stage (e.g., '01').
+    - root (str): The project folder to run the stage from.
+
+    Returns:
+    - dict: seconds, peak_rss_mb (None where it can't be measured), rows and returncode.
+    """
+    os.makedirs(os.path.join(root, 'logs'), exist_ok=True)
+
+    with open(os.path.join(root, 'logs', f'{stage}.log'), 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, script_path(stage)], cwd=root, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            # wait4 gives the resource usage of this process only (including the worker processes it waited for)
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss_mb = _peak_rss_mb(usage)
+        else:
+            process.wait()
+            peak_rss_mb = None
+        seconds = time.perf_counter() - start
+
+    return {
+        'seconds': round(seconds, 3),
+        'peak_rss_mb': None if peak_rss_mb is None else round(peak_rss_mb, 1),
+        'rows': output_rows(stage, root) if process.returncode == 0 else None,
+        'returncode': process.returncode,
+    }
+
+
+def _commit():
+    """Returns the current git commit of the code, if there is one."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=code_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(scales, stages=None, seed=2025, file_format='parquet', bench_dir=benchmark_dir):
+    """
+    Runs the stages at every scale and appends the results to the history file.
+    If a stage fails, the later stages at that scale are skipped (they need its outputs).
+
+    Parameters:
+    - scales (list): The scales to run (see src/simulate.py).
+    - stages (list): The stages to run, in order (default is 01 to 08).
+    - seed (int): Seed for the simulated data.
+    - file_format (str): Format of the simulated EOY sheets ('xlsx' also times converting them, add stage 00).
+    - bench_dir (str): Folder for the simulated data, logs, history and baseline.
+
+    Returns:
+    - list: One record (dict) per stage that ran.
+    """
+    stages = stages or default_stages
+    commit = _commit()
+    timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    records = []
+
+    for scale in scales:
+        root = prepare_data(scale, seed, file_format, bench_dir)
+        for stage in stages:
+            result = run_stage(stage, root)
+            record = {'timestamp': timestamp, 'commit': commit, 'scale': scale, 'seed': seed, 'stage': stage, **result}
+            records.append(record)
+            print(format_record(record), flush=True)
+            if result['returncode'] != 0:
+                print(f"Stage {stage} failed, see {os.path.join(root, 'logs', f'{stage}.log')}")
+                break
+
+    os.makedirs(bench_dir, exist_ok=True)
+    with open(os.path.join(bench_dir, 'history.jsonl'), 'a') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+    return records
+
+
+def format_record(record):
+    """
+    Formats a record as one line (e.g., 'scale 10  stage 02    12.31 s    850.2 MB    1,234,567 rows').
+    """
+    rss = '-' if record['peak_rss_mb'] is None else f"{record['peak_rss_mb']:.1f}"
+    rows = 'failed' if record['returncode'] != 0 else f"{record['rows']:,} rows"
+    return f"scale {record['scale']:<6g} stage {record['stage']}  {record['seconds']:9.2f} s  {rss:>9} MB  {rows}"
+
+
+def save_baseline(records, bench_dir=benchmark_dir):
+    """
+    Stores the results of a run as the baseline (by scale and stage). Failed stages aren't stored.
+    Results for other scales or stages already in the baseline are kept.
+    """
+    baseline = load_baseline(bench_dir)
+    for record in records:
+        if record['returncode'] == 0:
+            baseline.setdefault(f"{record['scale']:g}", {})[record['stage']] = {
+                key: record[key] for key in ['seconds', 'peak_rss_mb', 'rows', 'commit']
+            }
+    with open(os.path.join(bench_dir, 'baseline.json'), 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def load_baseline(bench_dir=benchmark_dir):
+    """
+    Loads the stored baseline (scale -> stage -> measurements), or an empty one if there is none.
+    """
+    path = os.path.join(bench_dir, 'baseline.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_regressions(records, baseline, tolerance=default_tolerance):
+    """
+    Compares a run with the baseline.
+
+    Parameters:
+    - records (list): Records from run_benchmark.
+    - baseline (dict): Baseline from load_baseline.
+    - tolerance (float): Allowed relative increase in time and memory (e.g., 0.25 is 25%).
+
+    Returns:
+    - list: A message for every stage that failed, got slower, uses more memory or wrote a different number of rows.
+    """
+    regressions = []
+    for record in records:
+        label = f"scale {record['scale']:g} stage {record['stage']}"
+        if record['returncode'] != 0:
+            regressions.append(f'{label}: failed')
+            continue
+
+        base = baseline.get(f"{record['scale']:g}", {}).get(record['stage'])
+        if base is None:
+            continue
+
+        seconds, base_seconds = record['seconds'], base['seconds']
+        if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > min_seconds:
+            regressions.append(f'{label}: {seconds:.2f} s vs {base_seconds:.2f} s in the baseline')
+
+        rss, base_rss = record['peak_rss_mb'], base.get('peak_rss_mb')
+        if rss is not None and base_rss is not None and rss > base_rss * (1 + tolerance):
+            regressions.append(f'{label}: {rss:.1f} MB vs {base_rss:.1f} MB in the baseline')
+
+        if base.get('rows') is not None and record['rows'] != base['rows']:
+            regressions.append(f"{label}: wrote {record['rows']:,} rows vs {base['rows']:,} in the baseline")
+
+    return regressions
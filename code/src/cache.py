@@ -0,0 +1,118 @@
+# Save each year's results of a script and reuse them in later runs, so adding a year only processes the new year
+#
+# Scripts that prepare the years one at a time before combining them (e.g., 02_academic-table.py) save the tables
+# they made for each year in data/cache/{script}/year={year}/ (one Parquet file per table). Only runs with
+# AC_INCREMENTAL=1 (see src/config.py) save and reuse them: a year saved by an earlier run is loaded instead of
+# processed again, as long as the script's code and the year's input files (e.g., its workbook, converted sheets and
+# student table, see sheet_inputs() in src/workbooks.py) are the same as when it was saved.
+# The steps that combine the years (e.g., the attendance sums or the most recent year's values) always run on every year.
+# A year's key file is written after its tables, so a run that's interrupted never leaves a year that looks complete.
+
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+from src import config
+from src.pipeline import code_files
+from src.schemas import make_storable
+from src.stages import code_dir
+
+
+def _cache_dir(script, year):
+    """Returns the folder with a script's results for a year (e.g., data/cache/02_academic-table/year=2017)."""
+    name = os.path.splitext(os.path.basename(script))[0]
+    return os.path.join(config.cache_dir, name, f'year={year}')
+
+
+def year_keys(script, inputs):
+    """
+    Computes the key of each year's results from the script's code (and the src modules it imports) and the
+    size and modified time of the year's input files.
+
+    Parameters:
+    - script (str): Path of the script (its __file__).
+    - inputs (dict): Year -> paths of the files the year's results are made from.
+
+    Returns:
+    - dict: Year -> hex digest.
+    """
+    code = hashlib.sha256()
+    for path in code_files(os.path.abspath(script)):
+        with open(path, 'rb') as f:
+            code.update(f'{os.path.relpath(path, code_dir)}:'.encode() + hashlib.sha256(f.read()).digest())
+
+    keys = {}
+    for year, paths in inputs.items():
+        digest = code.copy()
+        for path in paths:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode())
+            else:
+                digest.update(f'{path}:missing\n'.encode())
+        keys[year] = digest.hexdigest()
+    return keys
+
+
+def read_cached_years(script, keys):
+    """
+    Loads the results saved for the years whose key hasn't changed. Nothing is loaded unless incremental runs are
+    turned on (see config.incremental).
+
+    Parameters:
+    - script (str): Path of the script (its __file__).
+    - keys (dict): Year -> key (see year_keys).
+
+    Returns:
+    - dict: Year -> {table name: pd.DataFrame}, for the years that can be reused.
+    """
+    if not config.incremental:
+        return {}
+
+    cached = {}
+    for year, key in keys.items():
+        folder = _cache_dir(script, year)
+        key_path = os.path.join(folder, 'key.txt')
+        if not os.path.exists(key_path):
+            continue
+        with open(key_path) as f:
+            if f.read().strip() != key:
+                continue
+        cached[year] = {
+            os.path.splitext(os.path.basename(path))[0]: pd.read_parquet(path)
+            for path in sorted(glob.glob(os.path.join(folder, '*.parquet')))
+        }
+    return cached
+
+
+def write_cached_years(script, year_tables, keys):
+    """
+    Saves the results of each year, replacing what was saved for the year before. Nothing is saved unless incremental
+    runs are turned on (see config.incremental). Columns that mix numbers and text are saved as text (see make_storable).
+
+    Parameters:
+    - script (str): Path of the script (its __file__).
+    - year_tables (dict): Year -> {table name: pd.DataFrame} (empty when the results are saved elsewhere,
+      e.g., the student tables).
+    - keys (dict): Year -> key (see year_keys).
+    """
+    if not config.incremental:
+        return
+
+    for year, tables in year_tables.items():
+        folder = _cache_dir(script, year)
+        os.makedirs(folder, exist_ok=True)
+
+        # Remove the key first, so the year isn't reused if the run stops before all of its tables are saved
+        key_path = os.path.join(folder, 'key.txt')
+        if os.path.exists(key_path):
+            os.remove(key_path)
+        for path in glob.glob(os.path.join(folder, '*.parquet')):
+            os.remove(path)
+
+        for name, table in tables.items():
+            make_storable(table.copy()).to_parquet(os.path.join(folder, f'{name}.parquet'))
+        with open(key_path, 'w') as f:
+            f.write(keys[year])
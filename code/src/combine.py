@@ -0,0 +1,63 @@
+# Join the per-topic tables (academic, demographic, assessment, ...) onto the students in 08_combine_data-table.py
+#
+# Chaining pd.merge(..., how='left') copies the growing table once per merge. Here each table is indexed by its keys
+# (e.g., student_number, or student_number and year), lined up with the students' rows, and all the columns are put
+# together in a single step at the end, so the full table is only built once.
+# The result is the same as the chain of merges: same rows, columns, column order and data types.
+# Tables where a key appears more than once (so a left join would add rows), or that share column names with the
+# columns already joined (so pd.merge would add _x/_y suffixes), are joined with pd.merge instead.
+
+import pandas as pd
+
+
+def _row_positions(base, table, keys):
+    """
+    Returns the position in table of the row matching each row of base (-1 where there is no match),
+    or None if table can't be lined up with base (a key appears more than once).
+    """
+    index = pd.Index(table[keys[0]]) if len(keys) == 1 else pd.MultiIndex.from_frame(table[keys])
+    if not index.is_unique:
+        return None
+    if len(keys) == 1:
+        return index.get_indexer(base[keys[0]])
+    return index.get_indexer(pd.MultiIndex.from_frame(base[keys]))
+
+
+def left_join(base, tables):
+    """
+    Left joins several tables onto base, in order, as if by chaining pd.merge(..., how='left').
+
+    Parameters:
+    - base (pd.DataFrame): The rows of the result (e.g., student_number and year for every student).
+    - tables (list): (pd.DataFrame, list of key columns) pairs, joined in the order given.
+
+    Returns:
+    - pd.DataFrame: base with the columns of every table, with a fresh index.
+    """
+    result = base.reset_index(drop=True)
+    pieces = []
+    columns = set(result.columns)
+
+    def flush(result, pieces):
+        # Put the lined-up columns together with the rows joined so far
+        if not pieces:
+            return result
+        return pd.concat([result] + pieces, axis=1)
+
+    for table, keys in tables:
+        values = table.drop(columns=keys)
+        positions = None if columns & set(values.columns) else _row_positions(result, table, keys)
+
+        if positions is None:
+            result = pd.merge(flush(result, pieces), table, on=keys, how='left')
+            pieces = []
+            columns = set(result.columns)
+            continue
+
+        # Take the matching rows (missing where there's no match, as in a left merge) in the order of base
+        piece = values.reset_index(drop=True).reindex(positions)
+        piece.index = result.index
+        pieces.append(piece)
+        columns |= set(values.columns)
+
+    return flush(result, pieces)
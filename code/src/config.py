@@ -0,0 +1,65 @@
+# Settings shared by the scripts and the functions in /code/src
+# Paths are relative to the project root, which is where the scripts are run from (e.g., `python code/01_student-table.py`)
+
+import os
+
+# Folder with the EOY workbooks and all exported data
+data_dir = 'data'
+
+# Secondary school numbers -> school names (05_teacher-table.py makes a grid of the non-AC teachers of each school, and
+# 10_teacher-correlations.py a sheet for each grid, in this order)
+school_name_map = {
+    706: "Sky View",
+    703: "Green Canyon",
+    705: "Ridgeline",
+    702: "Mountain Crest",
+    710: "Cache High",
+    330: "Spring Creek Middle",
+    406: "North Cache Middle",
+    410: "South Cache Middle"
+}
+
+# School years processed by every script (one '{year} EOY Data - USU.xlsx' workbook per year)
+# To add a year, add it here and run the pipeline with AC_INCREMENTAL=1 so only the new year is processed
+years = [2017, 2018, 2022, 2023, 2024, 2025]
+
+# Years after COVID, used to split the data into all years and post-COVID years
+post_covid_years = [year for year in years if year >= 2022]
+
+# Folder for the EOY workbook sheets converted to Parquet, by sheet and year (see src/workbooks.py)
+parquet_dir = os.path.join(data_dir, 'parquet')
+
+# Folder for the student tables made by 01_student-table.py, one file per year (see src/students.py)
+student_tables_dir = os.path.join(data_dir, 'student_tables')
+
+# Number of worker processes used to load and prepare the years in parallel (see src/parallel.py)
+# Set it with the AC_WORKERS environment variable (e.g., `AC_WORKERS=6 uv run code/01_student-table.py`)
+workers = int(os.environ.get('AC_WORKERS', 1))
+
+# Also save a CSV copy of every artifact passed between the scripts (see src/artifacts.py)
+# Set it with the AC_EXPORT_CSV environment variable (e.g., `AC_EXPORT_CSV=1 uv run code/08_combine_data-table.py`)
+export_csv = os.environ.get('AC_EXPORT_CSV', '0') == '1'
+
+# File where the pipeline runner records what each stage was last run from (see src/pipeline.py)
+pipeline_state_path = os.path.join(data_dir, 'pipeline_state.json')
+
+# Folder for the output of each stage when the pipeline runner runs several stages at the same time (see src/pipeline.py)
+pipeline_logs_dir = os.path.join(data_dir, 'logs')
+
+# Reuse the per-year results saved by earlier runs for the years whose code and inputs haven't changed (see src/cache.py)
+# Set it with the AC_INCREMENTAL environment variable (e.g., `AC_INCREMENTAL=1 uv run code/02_academic-table.py`)
+incremental = os.environ.get('AC_INCREMENTAL', '0') == '1'
+
+# Folder for the per-year results saved by the scripts, by script and year (see src/cache.py)
+cache_dir = os.path.join(data_dir, 'cache')
+
+# Number of resamples used to test the teacher correlations in 10_teacher-correlations.py (see src/correlations.py)
+# With 0, only the correlations are computed; otherwise every teacher also gets a permutation p-value and a bootstrap
+# confidence interval. Set it with the AC_CORRELATION_RESAMPLES environment variable (e.g., AC_CORRELATION_RESAMPLES=2000)
+correlation_resamples = int(os.environ.get('AC_CORRELATION_RESAMPLES', 0))
+
+# Seed of the resamples, so the p-values and intervals are the same on every run (and with any number of workers)
+correlation_seed = 2025
+
+# Significance level of the p-values (significance_ind) and confidence level of the intervals (1 - correlation_alpha)
+correlation_alpha = 0.05
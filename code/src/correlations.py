@@ -0,0 +1,192 @@
+# Correlate the teachers of a student × teacher grid with the students' ac_ind (see 10_teacher-correlations.py)
+#
+# Each teacher column is 1 or 0, so its (Pearson) correlation with ac_ind is the point-biserial correlation. It only
+# needs the number of students who had each teacher and the sum of ac_ind over those students, which come straight
+# from the sparse matrix (the column counts and matrix.T @ ac_ind). The cost grows with the number of (student, teacher)
+# pairs, instead of building the dense grid and the full teacher × teacher correlation matrix (DataFrame.corr())
+# to keep one of its columns. The values are the same as DataFrame.corr() gives.
+#
+# A teacher with a handful of students can have a large correlation by chance, so the correlations can also be tested
+# by resampling the students (see significance()):
+# - permutation p-value: how often shuffling ac_ind across the students gives a correlation at least as far from 0
+# - bootstrap interval: the range of the correlations over samples of the students drawn with replacement
+# The resamples are done in batches: a batch of shuffled (or reweighted) ac_ind columns is one dense students × batch
+# matrix, so the sums for every teacher and resample come from one sparse matrix product. The batches are independent
+# and run in parallel worker processes (see src/parallel.py), each with its own seed, so the results don't depend on
+# the number of workers.
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src import config
+from src.parallel import map_tasks
+
+
+def point_biserial(matrix, target):
+    """
+    Computes the correlation of every column of a 0/1 matrix with a target.
+
+    Parameters:
+    - matrix (scipy.sparse matrix): Rows × columns (e.g., students × teachers), 1 or 0.
+    - target (np.ndarray): The target of every row (e.g., ac_ind). Rows with a missing target are left out.
+
+    Returns:
+    - np.ndarray: The correlation of every column (missing for a column, or a target, that's the same for every row).
+    """
+    matrix, target = _known_rows(matrix, target)
+    if len(target) < 2:
+        return np.full(matrix.shape[1], np.nan)
+
+    counts = matrix.getnnz(axis=0)
+    return _correlations(matrix.T @ target, counts, len(target), target.mean(), target.var())
+
+
+def _known_rows(matrix, target):
+    """Leaves out the rows with a missing target (the matrix is returned in CSC form and the target as floats)."""
+    target = np.asarray(target, dtype='float64')
+    matrix = sparse.csc_matrix(matrix)
+    if np.isnan(target).any():
+        keep = np.flatnonzero(~np.isnan(target))
+        matrix, target = matrix[keep], target[keep]
+    return matrix, target
+
+
+def _correlations(target_sums, counts, rows, target_mean, target_var):
+    """
+    Computes the point-biserial correlations from the sums: target_sums and counts are by column (and by resample if
+    they're 2-D), target_mean and target_var are over all rows (by resample if they're arrays).
+    """
+    # Share of the rows with a 1 in each column
+    share = counts / rows
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlations = (target_sums / rows - share * target_mean) / np.sqrt(share * (1 - share) * target_var)
+
+    # A column, or a target, that's the same for every row has no correlation
+    constant = (counts == 0) | (counts == rows) | (np.asarray(target_var) <= 1e-12)
+    return np.where(constant, np.nan, correlations)
+
+
+def significance(matrix, target, resamples, seed=None, alpha=None, batch_size=100, workers=None):
+    """
+    Tests the correlation of every column of a 0/1 matrix with a target by resampling the rows: a permutation p-value
+    and a bootstrap (percentile) confidence interval for every column.
+
+    Parameters:
+    - matrix (scipy.sparse matrix): Rows × columns (e.g., students × teachers), 1 or 0.
+    - target (np.ndarray): The target of every row (e.g., ac_ind). Rows with a missing target are left out.
+    - resamples (int): Number of permutations, and of bootstrap samples.
+    - seed (int): Seed of the resamples (default is config.correlation_seed).
+    - alpha (float): The interval covers 1 - alpha (default is config.correlation_alpha).
+    - batch_size (int): Number of resamples done in one matrix product (memory grows with rows × batch_size).
+    - workers (int): Number of worker processes (default is config.workers).
+
+    Returns:
+    - dict: p_value, ci_lower and ci_upper, each an np.ndarray with a value for every column (missing where the
+      correlation is missing).
+    """
+    seed = config.correlation_seed if seed is None else seed
+    alpha = config.correlation_alpha if alpha is None else alpha
+    matrix, target = _known_rows(matrix, target)
+    columns = matrix.shape[1]
+    if len(target) < 2 or resamples < 1:
+        return {name: np.full(columns, np.nan) for name in ['p_value', 'ci_lower', 'ci_upper']}
+
+    # Every batch gets its own seed, for the permutations and for the bootstrap samples
+    sizes = [min(batch_size, resamples - start) for start in range(0, resamples, batch_size)]
+    permutation_seeds, bootstrap_seeds = np.random.SeedSequence(seed).spawn(2)
+    matrix_t = matrix.T.tocsr()
+
+    exceed = map_tasks(
+        _permutation_batch, list(zip(permutation_seeds.spawn(len(sizes)), sizes)), workers,
+        matrix_t=matrix_t, target=target
+    )
+    bootstrap = map_tasks(
+        _bootstrap_batch, list(zip(bootstrap_seeds.spawn(len(sizes)), sizes)), workers,
+        matrix_t=matrix_t, target=target
+    )
+
+    # The observed correlation counts as one of the permutations, so a p-value is never 0
+    observed = _correlations(matrix_t @ target, matrix.getnnz(axis=0), len(target), target.mean(), target.var())
+    p_value = np.where(np.isnan(observed), np.nan, (1 + np.sum(exceed, axis=0)) / (1 + resamples))
+
+    # Bootstrap samples where a teacher's correlation is missing (e.g., none of the teacher's students were drawn)
+    # are left out of the teacher's interval
+    bootstrap = np.concatenate(bootstrap, axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        ci_lower, ci_upper = np.nanpercentile(bootstrap, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=1)
+    missing = np.isnan(observed)
+    return {
+        'p_value': p_value,
+        'ci_lower': np.where(missing, np.nan, ci_lower),
+        'ci_upper': np.where(missing, np.nan, ci_upper),
+    }
+
+
+def _permutation_batch(task, matrix_t, target):
+    """
+    Shuffles the target across the rows for a batch of permutations, and counts for every column how many of them
+    give a correlation at least as far from 0 as the observed one.
+    """
+    seed, size = task
+    rng = np.random.default_rng(seed)
+    counts = np.diff(matrix_t.indptr)
+
+    # The counts and the mean and variance of the target are the same for every permutation, so the distance of the
+    # correlation from 0 only depends on how far the target sum of a column is from counts × mean
+    expected = counts * target.mean()
+    observed = np.abs(matrix_t @ target - expected)
+    permuted = rng.permuted(np.repeat(target[:, None], size, axis=1), axis=0)
+    distances = np.abs(matrix_t @ permuted - expected[:, None])
+    return np.sum(distances >= observed[:, None] - 1e-9, axis=1)
+
+
+def _bootstrap_batch(task, matrix_t, target):
+    """
+    Draws a batch of bootstrap samples of the rows and computes the correlation of every column in each of them
+    (columns × samples). A sample is a weight for every row: how many times the row was drawn.
+    """
+    seed, size = task
+    rng = np.random.default_rng(seed)
+    rows = len(target)
+
+    draws = rng.integers(rows, size=(rows, size))
+    weights = np.bincount((draws * size + np.arange(size)).ravel(), minlength=rows * size).reshape(rows, size)
+    weighted_target = weights * target[:, None]
+
+    target_mean = weighted_target.sum(axis=0) / rows
+    target_var = (weighted_target * target[:, None]).sum(axis=0) / rows - target_mean ** 2
+    return _correlations(matrix_t @ weighted_target, matrix_t @ weights, rows, target_mean, target_var)
+
+
+def grid_correlations(grid, resamples=0):
+    """
+    Correlates every teacher of a grid with ac_ind (see src/grids.py), as one column of DataFrame.corr() on the
+    dense grid would: ac_ind itself (1) and then every teacher_[id].
+
+    Parameters:
+    - grid (dict): The grid (matrix, student_number, teacher_id and ac_ind).
+    - resamples (int): Number of resamples used to test the correlations (see significance()); 0 skips the test.
+
+    Returns:
+    - pd.DataFrame: Correlation with ac_ind (ac_ind column) by variable (ac_ind, teacher_[id], ...). With resamples,
+      also p_value, ci_lower, ci_upper and significance_ind (1 if p_value is below config.correlation_alpha).
+    """
+    target = np.asarray(grid['ac_ind'], dtype='float64')
+    known = target[~np.isnan(target)]
+    ac_ind = 1.0 if len(known) > 1 and known.var() > 0 else np.nan
+
+    teachers = [f'teacher_{int(teacher)}' for teacher in grid['teacher_id']]
+    correlations = pd.DataFrame(
+        {'ac_ind': np.concatenate([[ac_ind], point_biserial(grid['matrix'], target)])},
+        index=pd.Index(['ac_ind'] + teachers, name='Variable')
+    )
+    if resamples:
+        # ac_ind itself isn't tested
+        for name, values in significance(grid['matrix'], target, resamples).items():
+            correlations[name] = np.concatenate([[np.nan], values])
+        correlations['significance_ind'] = (correlations['p_value'] < config.correlation_alpha).astype(int)
+    return correlations
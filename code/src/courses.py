@@ -0,0 +1,57 @@
+# Classify courses as advanced courses (AC), with the same rule in every script
+#
+# A course a student took is an advanced course if:
+# - it grants college credit (CollegeGrantingCr is filled in),
+# - it's taught on a college campus (WhereTaughtCampus is filled in),
+# - it's an AP or BTEC course (CourseTitle starts with 'AP' or 'BTEC'),
+# - or the student took it as concurrent enrollment (ConcurrEnrolled is 'Y').
+# The first three only depend on the course, so they're checked once per row of Course Master, which is far smaller than
+# Course Membership joined with Course Master. The result is merged onto the membership rows with the rest of the course
+# columns, and only the ConcurrEnrolled check is done per membership row (see is_advanced()).
+
+import pandas as pd
+
+
+def course_is_advanced(master, title_column='CourseTitle', normalize_titles=False):
+    """
+    Checks which courses in Course Master are advanced courses on their own (college credit, college campus, AP or BTEC).
+
+    Parameters:
+    - master (pd.DataFrame): Course Master rows with CollegeGrantingCr, WhereTaughtCampus and the course title.
+    - title_column (str): The column with the course title (e.g., 'course_title' after renaming).
+    - normalize_titles (bool): Remove leading and trailing spaces and uppercase the titles before checking for AP and BTEC
+      (e.g., ' Ap Biology' is an AP course). The titles in master aren't changed.
+
+    Returns:
+    - pd.Series: True or False for every row of master.
+    """
+    title = master[title_column]
+    if normalize_titles:
+        title = title.str.strip().str.upper()
+
+    advanced = (
+        master['CollegeGrantingCr'].notnull() |  # Check for college credit
+        master['WhereTaughtCampus'].notnull() |  # Check for campus location
+        title.str.startswith('AP', na=False) |  # Check for AP courses
+        title.str.startswith('BTEC', na=False)  # Check for BTEC courses
+    )
+    return advanced.astype(bool)
+
+
+def is_advanced(course_advanced, concurr_enrolled):
+    """
+    Checks which membership rows are advanced courses: the course is an advanced course (see course_is_advanced),
+    or the student took it as concurrent enrollment.
+
+    Parameters:
+    - course_advanced (pd.Series): course_is_advanced() merged onto the membership rows (missing where the course
+      isn't in Course Master, which counts as False).
+    - concurr_enrolled (pd.Series): The ConcurrEnrolled column of the membership rows.
+
+    Returns:
+    - pd.Series: True or False for every membership row.
+    """
+    concurrent = (concurr_enrolled == 'Y')
+    if isinstance(concurrent.dtype, pd.BooleanDtype):
+        concurrent = concurrent.fillna(False)
+    return course_advanced.eq(True) | concurrent.astype(bool)
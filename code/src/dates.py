@@ -0,0 +1,61 @@
+# Parse the dates in the EOY workbooks and the clearinghouse data
+#
+# Dates come as datetimes, YYYYMMDD numbers (e.g., 20170821 or 20170821.0) or text (e.g., '20170821' or '2017-08-21').
+# A column has a few thousand distinct dates at most, however many rows it has, so each distinct value is parsed once
+# and the results are mapped back onto the rows (pd.factorize). YYYYMMDD numbers, and text in the YYYYMMDD or
+# YYYY-MM-DD form, are split into year, month and day with integer arithmetic instead of going through strings.
+# Anything else is left to pd.to_datetime(format='mixed').
+
+import numpy as np
+import pandas as pd
+
+
+def parse_dates(values):
+    """
+    Converts a column of dates to datetimes. Numbers are read as YYYYMMDD, and values that can't be parsed become NaT.
+
+    Parameters:
+    - values (pd.Series): The dates (datetimes, YYYYMMDD numbers, or text).
+
+    Returns:
+    - pd.Series: The dates as datetime64[ns], with the same index as values.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=values.index, name=values.name, dtype='datetime64[ns]')
+    if pd.api.types.is_numeric_dtype(uniques):
+        parsed = _from_yyyymmdd(np.asarray(uniques, dtype='float64'))
+    else:
+        parsed = _parse_text(pd.Series(np.asarray(uniques, dtype=object)))
+
+    # Map the parsed distinct values back onto the rows (missing values are -1)
+    dates = np.asarray(parsed, dtype='datetime64[ns]').take(codes, mode='clip')
+    dates[codes < 0] = np.datetime64('NaT')
+    return pd.Series(dates, index=values.index, name=values.name)
+
+
+def _from_yyyymmdd(numbers):
+    """Converts YYYYMMDD numbers to datetimes (NaT for numbers that aren't whole or aren't valid dates)."""
+    valid = np.isfinite(numbers) & (numbers % 1 == 0) & (numbers >= 1e7) & (numbers < 1e8)
+    numbers = np.where(valid, numbers, 19700101).astype('int64')
+
+    parts = pd.DataFrame({'year': numbers // 10000, 'month': numbers // 100 % 100, 'day': numbers % 100})
+    dates = pd.to_datetime(parts, errors='coerce').to_numpy()
+    dates[~valid] = np.datetime64('NaT')
+    return dates
+
+
+def _parse_text(values):
+    """Converts distinct values (text, or a mix of types) to datetimes: YYYYMMDD and YYYY-MM-DD by arithmetic, the rest with pd.to_datetime."""
+    text = values.astype(str).str.strip()
+    compact = text.str.replace(r'^(\d{4})-(\d{2})-(\d{2})$', r'\1\2\3', regex=True).str.replace(r'\.0$', '', regex=True)
+    is_compact = compact.str.fullmatch(r'\d{8}').to_numpy()
+
+    dates = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    dates[is_compact] = _from_yyyymmdd(compact[is_compact].astype('float64').to_numpy())
+    if (~is_compact).any():
+        dates[~is_compact] = pd.to_datetime(values[~is_compact], format='mixed', errors='coerce').to_numpy()
+    return dates
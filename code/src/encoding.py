@@ -0,0 +1,70 @@
+# Dummy code categorical columns with the same columns for every year
+#
+# pd.get_dummies() only makes a column for the categories found in the data it's given, so dummy coding each year
+# separately gives the years different columns, which have to be lined up (and their gaps filled with 0) when the years
+# are combined. Here the categories are found once, over all years (the vocabulary, see learn_vocabulary()), and every
+# column is then dummy coded against that fixed list in one pass (see one_hot()). Every row gets the same dummy
+# columns, in the same order, whichever years it comes from. The dummy columns are named as pd.get_dummies() names
+# them, in lowercase (e.g., gender_f, exit_code_1.0, exit_code_nan).
+#
+# The categories are compared as text: a column can mix numbers and text (e.g., numeric exit codes with 'nan' for the
+# missing ones), and a year reused from data/cache stores them as text (see make_storable() in src/schemas.py), so 1.0
+# and '1.0' are the same category, and the categories are sorted as text.
+
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+
+
+def _as_text(values):
+    """Converts the values of a column to text, keeping the missing values missing (e.g., 1.0 -> '1.0')."""
+    return values.astype(str).where(values.notna())
+
+
+def learn_vocabulary(data, columns):
+    """
+    Finds the categories of each column, as text (sorted, as pd.get_dummies() orders them).
+
+    Parameters:
+    - data (pd.DataFrame): The data with every year (e.g., the per-year tables concatenated).
+    - columns (list): The categorical columns to dummy code (missing columns are skipped).
+
+    Returns:
+    - dict: Column -> list of its categories (missing values aren't a category).
+    """
+    return {
+        column: sorted(_as_text(data[column]).dropna().unique())
+        for column in columns if column in data.columns
+    }
+
+
+def one_hot(data, vocabulary, sparse=False):
+    """
+    Dummy codes every column in the vocabulary: one column per category, 1 if the row has that category and 0 otherwise.
+    A missing value, or a category that isn't in the vocabulary, is 0 in every dummy column of its column. Values are
+    matched to the categories as text (e.g., 1.0 and '1.0' are both the category '1.0').
+
+    Parameters:
+    - data (pd.DataFrame): The data with the categorical columns.
+    - vocabulary (dict): Column -> list of its categories (see learn_vocabulary).
+    - sparse (bool): Return sparse columns (pd.SparseDtype) instead of dense int columns.
+
+    Returns:
+    - pd.DataFrame: The dummy columns ({column}_{category} in lowercase), with the same index as data.
+    """
+    blocks, names = [], []
+    for column, categories in vocabulary.items():
+        codes = pd.Categorical(_as_text(data[column]), categories=categories).codes
+        rows = np.flatnonzero(codes >= 0)
+        blocks.append(sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, codes[rows])), shape=(len(data), len(categories))
+        ))
+        names += [f'{column}_{category}'.lower() for category in categories]
+
+    if not blocks:
+        return pd.DataFrame(index=data.index)
+
+    matrix = sp.hstack(blocks, format='csc')
+    if sparse:
+        return pd.DataFrame.sparse.from_spmatrix(matrix, index=data.index, columns=names)
+    return pd.DataFrame(matrix.toarray(), index=data.index, columns=names)
@@ -0,0 +1,28 @@
+# Write the files passed between the scripts so they're never seen half-written
+#
+# Scripts can run at the same time (e.g., with run-pipeline.py --jobs), so one may read a file while another writes it,
+# and a run can be interrupted in the middle of a write. Every file is written to a temporary file in the same folder
+# first, which then replaces the file in one step (os.replace), so a reader sees either the old file or the new one.
+
+import os
+
+
+def atomic_write(path, write, suffix=''):
+    """
+    Writes a file through a temporary file, which then replaces it. The file's folder is created if it doesn't exist.
+
+    Parameters:
+    - path (str): The file to write (e.g., data/02_academic_modeling.parquet).
+    - write (callable): Writes the file to the path it's given (e.g., lambda temp_path: df.to_parquet(temp_path)).
+    - suffix (str): Ending of the temporary file's name, for writers that add one to names without it
+      (e.g., '.npz' for np.savez_compressed; default is '').
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp{suffix}'
+    try:
+        write(temp_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
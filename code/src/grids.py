@@ -0,0 +1,167 @@
+# Save and load the student × teacher grids made by 05_teacher-table.py
+#
+# Each student had a handful of the hundreds of teachers, so a grid with one column per teacher is almost all zeros.
+# A grid is kept as a sparse matrix (scipy.sparse CSR, 1 = the student had the teacher) with its labels:
+# - matrix: students × teachers
+# - student_number: the student of each row (in order)
+# - teacher_id: the teacher of each column (in order)
+# - ac_ind: the ac_ind of each row's student (from 02_academic_modeling)
+# The full grid is built once from the (student, teacher) pairs; the other grids (e.g., non-AC teachers at one school)
+# are a selection of its columns (see subgrid() and split_grid()). Each grid is saved as one compressed .npz file with
+# the matrix and its labels (e.g., data/all_teacher_grid.npz), so memory and file size grow with the number of pairs
+# instead of students × teachers. grid_frame() gives the dense table (student_number, ac_ind, teacher_[id] columns).
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src import config
+from src.files import atomic_write
+
+def school_grid_name(school):
+    """Returns the name of a school's grid of non-AC teachers (e.g., 'Sky View' -> 'sky_view_non_ac_teacher_grid')."""
+    return f"{school.lower().replace(' ', '_')}_non_ac_teacher_grid"
+
+
+def incidence_grid(pairs, ac_ind):
+    """
+    Builds a student × teacher grid from the pairs of students and teachers.
+
+    Parameters:
+    - pairs (pd.DataFrame): student_number and teacher_id, one row per course (duplicates are counted once).
+    - ac_ind (pd.Series): ac_ind by student_number.
+
+    Returns:
+    - dict: The grid (matrix, student_number, teacher_id and ac_ind), with students and teachers in ascending order.
+    """
+    students, rows = np.unique(pairs['student_number'].to_numpy(), return_inverse=True)
+    teachers, columns = np.unique(pairs['teacher_id'].to_numpy(), return_inverse=True)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, columns)), shape=(len(students), len(teachers))
+    )
+    # A pair that appears more than once was summed, but the grid only records whether the student had the teacher
+    matrix.data[:] = 1
+
+    return {'matrix': matrix, 'student_number': students, 'teacher_id': teachers, 'ac_ind': _ac_ind(ac_ind, students)}
+
+
+def _ac_ind(ac_ind, students):
+    """Lines up ac_ind with the students of a grid (stored as floats if a student has no ac_ind, as in write_artifact)."""
+    values = ac_ind[~ac_ind.index.duplicated()].reindex(students).to_numpy()
+    return values.astype('float64' if pd.isna(values).any() else 'int64')
+
+
+def subgrid(grid, teachers):
+    """
+    Selects some teachers of a grid, keeping only the students who had at least one of them.
+
+    Parameters:
+    - grid (dict): The grid (see incidence_grid).
+    - teachers (np.ndarray): True or False for every teacher (column) of the grid.
+
+    Returns:
+    - dict: The grid with the selected teachers.
+    """
+    return _drop_empty_rows(grid, grid['matrix'][:, np.flatnonzero(teachers)], grid['teacher_id'][teachers])
+
+
+def split_grid(grid, groups, names):
+    """
+    Splits the teachers of a grid into groups (e.g., the non-AC teachers of each school) in one pass: the columns are
+    sorted by group once, and each group's grid is a block of the sorted columns.
+
+    Parameters:
+    - grid (dict): The grid (see incidence_grid).
+    - groups (np.ndarray): The group of every teacher (column) of the grid (missing for teachers in no group).
+    - names (list): The groups to make grids for, in order (a group without any teachers gives an empty grid).
+
+    Returns:
+    - dict: Group -> grid with the group's teachers, keeping only the students who had at least one of them.
+    """
+    codes = pd.Categorical(groups, categories=names).codes
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+
+    # Sorting the columns of the CSC form once makes every group a contiguous block of columns
+    matrix = grid['matrix'].tocsc()[:, order]
+    teacher_ids = grid['teacher_id'][order]
+    return {
+        name: _drop_empty_rows(grid, matrix[:, bounds[i]:bounds[i + 1]].tocsr(), teacher_ids[bounds[i]:bounds[i + 1]])
+        for i, name in enumerate(names)
+    }
+
+
+def _drop_empty_rows(grid, matrix, teacher_ids):
+    """Makes the grid of some of a grid's teachers (matrix has the grid's rows and those teachers' columns)."""
+    rows = np.flatnonzero(matrix.getnnz(axis=1))
+    return {
+        'matrix': matrix[rows],
+        'student_number': grid['student_number'][rows],
+        'teacher_id': teacher_ids,
+        'ac_ind': grid['ac_ind'][rows],
+    }
+
+
+def grid_path(name):
+    """
+    Returns the path of a grid (e.g., data/all_teacher_grid.npz).
+    """
+    return os.path.join(config.data_dir, f'{name}.npz')
+
+
+def write_grid(grid, name):
+    """
+    Saves a grid as a compressed .npz file (and a CSV copy of its dense table if export_csv is set in src/config.py).
+
+    Parameters:
+    - grid (dict): The grid (see incidence_grid).
+    - name (str): Name of the grid (e.g., 'all_teacher_grid').
+    """
+    matrix = grid['matrix'].tocsr()
+    path = grid_path(name)
+
+    # A script running at the same time never reads a partial file (see src/files.py)
+    # (np.savez_compressed adds .npz to names that don't end with it)
+    atomic_write(path, lambda temp_path: np.savez_compressed(
+        temp_path,
+        data=matrix.data, indices=matrix.indices, indptr=matrix.indptr, shape=np.array(matrix.shape),
+        student_number=grid['student_number'], teacher_id=grid['teacher_id'], ac_ind=grid['ac_ind']
+    ), suffix='.npz')
+
+    if config.export_csv:
+        grid_frame(grid).to_csv(os.path.join(config.data_dir, f'{name}.csv'), index=False)
+
+
+def read_grid(name):
+    """
+    Loads a grid saved by write_grid.
+
+    Parameters:
+    - name (str): Name of the grid (e.g., 'all_teacher_grid').
+
+    Returns:
+    - dict: The grid (matrix, student_number, teacher_id and ac_ind).
+    """
+    with np.load(grid_path(name)) as f:
+        matrix = sparse.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+        return {'matrix': matrix, 'student_number': f['student_number'], 'teacher_id': f['teacher_id'], 'ac_ind': f['ac_ind']}
+
+
+def grid_frame(grid):
+    """
+    Converts a grid to a dense table: student_number, ac_ind, then one teacher_[id] column per teacher (1 or 0).
+
+    Parameters:
+    - grid (dict): The grid (see incidence_grid).
+
+    Returns:
+    - pd.DataFrame: One row per student.
+    """
+    teachers = pd.DataFrame(
+        grid['matrix'].toarray().astype('int64'), columns=[f'teacher_{int(teacher)}' for teacher in grid['teacher_id']]
+    )
+    labels = pd.DataFrame({'student_number': grid['student_number'], 'ac_ind': grid['ac_ind']})
+    return pd.concat([labels, teachers], axis=1)
@@ -0,0 +1,51 @@
+# Run the per-year steps of a script (or any independent tasks) in parallel
+#
+# The years are independent until they are concatenated, so each year's sheets can be loaded and prepared in
+# its own worker process. The number of processes comes from src/config.py (workers, set with AC_WORKERS).
+# With one worker, or where processes can't be forked (Windows), the years run one after another.
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src import config
+
+
+def map_years(function, years, workers=None, **kwargs):
+    """
+    Calls function(year, **kwargs) for every year and collects the results.
+    Worker processes are forked from the script, so the function can be defined in the script itself.
+
+    Parameters:
+    - function (callable): Function that takes a year as its first argument.
+    - years (list): Years to process.
+    - workers (int): Number of worker processes (default is config.workers).
+    - **kwargs: Extra keyword arguments passed to the function.
+
+    Returns:
+    - dict: Year -> result, in the same order as years.
+    """
+    return dict(zip(years, map_tasks(function, years, workers, **kwargs)))
+
+
+def map_tasks(function, tasks, workers=None, **kwargs):
+    """
+    Calls function(task, **kwargs) for every task (e.g., a batch of resamples) in parallel, as map_years does for years.
+
+    Parameters:
+    - function (callable): Function that takes a task as its first argument.
+    - tasks (list): Tasks to process.
+    - workers (int): Number of worker processes (default is config.workers).
+    - **kwargs: Extra keyword arguments passed to the function.
+
+    Returns:
+    - list: The result of every task, in the same order as tasks.
+    """
+    workers = min(workers or config.workers, len(tasks))
+    task = partial(function, **kwargs) if kwargs else function
+
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [task(item) for item in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+        return list(executor.map(task, tasks))
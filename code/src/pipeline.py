@@ -0,0 +1,322 @@
+# Run the pipeline: every stage that's out of date, in order (see run-pipeline.py)
+#
+# Each stage (see src/stages.py) has a key: a hash of its code (the script and the src modules it imports) and of the
+# contents of its input files. The key is recorded when the stage runs, and the stage is skipped the next time if its
+# key is the same and its outputs are still there. Keys are built from file contents, so a stage that runs again but
+# writes the same files doesn't make the stages after it run again.
+# 03 rewrites the 02_academic files it reads (see 'updates' in src/stages.py), so it can only run right after 02.
+# A stage and the stages that rewrite its outputs are run together, and 03's key uses 02's key instead of those files.
+# File hashes are cached by size and modified time, so unchanged files (e.g., the converted sheets) aren't read again.
+# Stages that don't depend on each other can run at the same time (jobs), each as soon as its dependencies are done.
+
+import ast
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src import config
+from src.files import atomic_write
+from src.stages import code_dir, dependencies, script_path, stages, updated_by
+
+
+def _file_hash(path, cache):
+    """
+    Computes the SHA-256 hash of a file's contents, reusing the cached hash if its size and modified time are the same.
+    """
+    stat = os.stat(path)
+    cached = cache.get(path)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    cache[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return cache[path][2]
+
+
+def code_files(script):
+    """
+    Returns the code a script runs: the script and the modules in /code/src it imports (directly or through other modules).
+    """
+    files = []
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in files or not os.path.exists(path):
+            continue
+        files.append(path)
+
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module == 'src':
+                modules = [f'src.{alias.name}' for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and node.module.startswith('src.'):
+                modules = [node.module]
+            elif isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names if alias.name.startswith('src.')]
+            else:
+                continue
+            pending.extend(os.path.join(code_dir, *module.split('.')) + '.py' for module in modules)
+
+    return sorted(files)
+
+
+def input_files(stage, root='.'):
+    """
+    Returns the input files of a stage that exist, not counting the files it rewrites (see 'updates' in src/stages.py).
+    """
+    updates = {path for pattern in stages[stage].get('updates', []) for path in glob.glob(os.path.join(root, pattern))}
+    paths = {path for pattern in stages[stage]['inputs'] for path in glob.glob(os.path.join(root, pattern))}
+    return sorted(paths - updates)
+
+
+def outputs_exist(stage, root='.'):
+    """
+    Checks that every output of a stage (every pattern in src/stages.py) has at least one file.
+    """
+    return all(glob.glob(os.path.join(root, pattern)) for pattern in stages[stage]['outputs'])
+
+
+def stage_key(stage, keys, cache, root='.'):
+    """
+    Computes the key of a stage from its code and the contents of its input files.
+
+    Parameters:
+    - stage (str): The stage (e.g., '02').
+    - keys (dict): Keys of the stages already checked (used for the stages whose outputs this stage rewrites).
+    - cache (dict): File hashes from earlier runs (see _file_hash).
+    - root (str): The project root.
+
+    Returns:
+    - str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    for path in code_files(script_path(stage)):
+        digest.update(f'{os.path.relpath(path, code_dir)}:{_file_hash(path, cache)}\n'.encode())
+    for path in input_files(stage, root):
+        digest.update(f'{os.path.relpath(path, root)}:{_file_hash(path, cache)}\n'.encode())
+    for other in stages:
+        if stage in updated_by(other):
+            digest.update(f'{other}:{keys[other]}\n'.encode())
+    return digest.hexdigest()
+
+
+def select_stages(targets=None):
+    """
+    Returns the stages needed to run the targets: the targets, the stages they depend on, and the stages that rewrite
+    the outputs of any of those (e.g., 03 for 02), in order.
+
+    Parameters:
+    - targets (list): The stages to bring up to date (defaults to every stage).
+
+    Returns:
+    - list: The stages, in order.
+    """
+    selected = set()
+    pending = list(targets or stages)
+    while pending:
+        stage = pending.pop()
+        if stage not in selected:
+            selected.add(stage)
+            pending.extend(dependencies(stage) + updated_by(stage))
+    return [stage for stage in stages if stage in selected]
+
+
+def _units(selected):
+    """Groups the stages into units that run together: a stage and the stages that rewrite its outputs (e.g., 02 and 03)."""
+    units = []
+    grouped = set()
+    for stage in selected:
+        if stage not in grouped:
+            unit = [stage] + [other for other in updated_by(stage) if other in selected]
+            units.append(unit)
+            grouped.update(unit)
+    return units
+
+
+def _load_state(path):
+    """Loads the keys recorded for each stage and the cached file hashes."""
+    if not os.path.exists(path):
+        return {'stages': {}, 'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(state, path):
+    """Saves the state, so an interrupted run never leaves a partial file (see src/files.py)."""
+    def write(temp_path):
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+
+    atomic_write(path, write)
+
+
+def run_stage(stage, root='.', log_path=None):
+    """
+    Runs a stage's script from the project root.
+
+    Parameters:
+    - stage (str): The stage (e.g., '02').
+    - root (str): The project root.
+    - log_path (str): File for the script's output (default is the console).
+
+    Returns:
+    - int: The script's exit code.
+    """
+    if log_path is None:
+        return subprocess.run([sys.executable, script_path(stage)], cwd=root).returncode
+
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, 'w') as log:
+        return subprocess.run([sys.executable, script_path(stage)], cwd=root, stdout=log, stderr=subprocess.STDOUT).returncode
+
+
+def _run_unit(unit, root, log_dir):
+    """
+    Runs the stages of a unit one after another, stopping at the first one that fails.
+
+    Returns:
+    - list: (stage, exit code, seconds) for every stage that ran.
+    """
+    finished = []
+    for stage in unit:
+        start = time.perf_counter()
+        returncode = run_stage(stage, root, log_dir and os.path.join(log_dir, f'{stage}.log'))
+        finished.append((stage, returncode, time.perf_counter() - start))
+        if returncode != 0:
+            break
+    return finished
+
+
+def _check_unit(unit, state, keys, root):
+    """
+    Computes the keys of a unit's stages and returns the reasons the unit needs to run (empty if it's up to date).
+    Stages without any input files (e.g., 00 when only the converted sheets are there) can't run, so their existing
+    outputs are used as they are.
+    """
+    reasons = []
+    for stage in unit:
+        keys[stage] = stage_key(stage, keys, state['files'], root)
+        if stages[stage]['inputs'] and not input_files(stage, root):
+            if not outputs_exist(stage, root):
+                raise FileNotFoundError(f'Stage {stage} has no input files ({", ".join(stages[stage]["inputs"])}) and no outputs')
+            continue
+        if state['stages'].get(stage) != keys[stage]:
+            reasons.append(f'{stage} changed' if stage in state['stages'] else f'{stage} never ran')
+        elif not outputs_exist(stage, root):
+            reasons.append(f'{stage} outputs missing')
+    return reasons
+
+
+def _plan(units, state, keys, force, root):
+    """Prints what would run, without running anything. Units after one that would run are listed as running too."""
+    results = {}
+    for unit in units:
+        label = ' + '.join(unit)
+        upstream_runs = sorted({stage for member in unit for stage in dependencies(member) if results.get(stage) == 'would run'})
+        if upstream_runs:
+            # Its inputs may not be there yet, so the unit isn't checked
+            keys.update({stage: stage_key(stage, keys, state['files'], root) for stage in unit})
+            reasons = [f'{stage} would run' for stage in upstream_runs]
+        else:
+            reasons = _check_unit(unit, state, keys, root)
+        if force:
+            reasons = ['forced']
+        print(f"{label}: {'would run (' + ', '.join(reasons) + ')' if reasons else 'up to date'}")
+        results.update({stage: 'would run' if reasons else 'skipped' for stage in unit})
+    return results
+
+
+def run_pipeline(targets=None, force=False, dry_run=False, jobs=1, root='.'):
+    """
+    Runs the stages needed for the targets that are out of date.
+    Stages that don't depend on each other (e.g., 04, 06 and 07 after 01) run at the same time when jobs is above 1,
+    so the pipeline takes as long as its longest chain of dependent stages. Each stage starts as soon as the stages
+    it depends on are done, and is checked (and skipped if it's up to date) at that point.
+
+    Parameters:
+    - targets (list): The stages to bring up to date (defaults to every stage).
+    - force (bool): Run every selected stage, even if it's up to date.
+    - dry_run (bool): Only print what would run.
+    - jobs (int): Number of stages to run at the same time. With more than one, the output of each stage is saved
+      to data/logs/{stage}.log instead of printed.
+    - root (str): The project root (where the scripts are run from).
+
+    Returns:
+    - dict: Stage -> 'ran', 'skipped', 'failed' or 'would run'.
+    """
+    state_path = os.path.join(root, config.pipeline_state_path)
+    state = _load_state(state_path)
+    keys = {}
+    units = [tuple(unit) for unit in _units(select_stages(targets))]
+
+    if dry_run:
+        return _plan(units, state, keys, force, root)
+
+    # The units each unit has to wait for
+    unit_of = {stage: unit for unit in units for stage in unit}
+    waits_for = {unit: {unit_of[other] for stage in unit for other in dependencies(stage)} - {unit} for unit in units}
+
+    log_dir = os.path.join(root, config.pipeline_logs_dir) if jobs > 1 else None
+    results = {}
+    done = set()
+    pending = list(units)
+    running = {}
+    failure = None
+    start = time.perf_counter()
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            while pending or running:
+                # Start (or skip) every unit whose dependencies are done, as long as there's a free job
+                ready = [unit for unit in pending if waits_for[unit] <= done]
+                while ready and failure is None and len(running) < jobs:
+                    unit = ready.pop(0)
+                    pending.remove(unit)
+                    label = ' + '.join(unit)
+                    reasons = _check_unit(unit, state, keys, root)
+                    if force:
+                        reasons = ['forced']
+                    if not reasons:
+                        print(f'{label}: up to date', flush=True)
+                        results.update({stage: 'skipped' for stage in unit})
+                        done.add(unit)
+                        ready = [unit for unit in pending if waits_for[unit] <= done]
+                        continue
+                    print(f"{label}: running ({', '.join(reasons)})", flush=True)
+                    running[executor.submit(_run_unit, unit, root, log_dir)] = unit
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    unit = running.pop(future)
+                    for stage, returncode, seconds in future.result():
+                        if returncode != 0:
+                            state['stages'].pop(stage, None)
+                            results[stage] = 'failed'
+                            log = f", see {os.path.join(log_dir, f'{stage}.log')}" if log_dir else ''
+                            failure = failure or f"Stage {stage} ({stages[stage]['script']}) failed with exit code {returncode}{log}"
+                            print(f'{stage}: failed after {seconds:.1f} s', flush=True)
+                        else:
+                            state['stages'][stage] = keys[stage]
+                            results[stage] = 'ran'
+                            print(f'{stage}: done in {seconds:.1f} s', flush=True)
+                    if all(results.get(stage) == 'ran' for stage in unit):
+                        done.add(unit)
+    finally:
+        _save_state(state, state_path)
+
+    if failure:
+        raise RuntimeError(failure)
+    print(f'Finished in {time.perf_counter() - start:.1f} s')
+    return results
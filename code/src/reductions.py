@@ -0,0 +1,107 @@
+# Reduce the rows of every student (or other key) to one, e.g., the earliest date or the most recent year's row
+#
+# The scripts often keep one value per student by sorting the whole table and dropping the duplicates, once for every
+# column (e.g., the earliest entry_date, then the earliest first_enroll_us, ...), and then merge each result back.
+# A column-wise reduction is one groupby over the key for all the columns at once: each column gets its own minimum
+# (or maximum, ...), skipping missing values, without sorting the table (see reduce_per_key()).
+#
+# Keeping a whole row per student (e.g., all the columns of the student's most recent year) was done the same way:
+# sort by year, then drop_duplicates(keep='first'), which sorts the whole (often wide) table. latest_per_key() finds
+# the row with the highest value per key with hashing only (the highest value per key, then the first row that has it),
+# so the cost grows linearly with the number of rows, and only the selected rows are copied. When a key has several rows
+# with its highest value (e.g., a student at two high schools in the same year), tie_break picks one of them by a column
+# (e.g., the lowest school_number) instead of by the order of the rows, the same way: the lowest value per key among
+# those rows, then the first row that has it.
+#
+# The 0/1 indicators per key (e.g., ac_ind: the student took at least one advanced course) were a Python lambda per group
+# (1 if x.sum() > 0 else 0), and the student × school grid a pivot_table with aggfunc=lambda x: 1. indicator_per_key()
+# is the groupby's built-in 'max' of the 0/1 column, and presence_grid() a crosstab with the counts capped at 1, which
+# give the same results (see tests/test_reductions.py) without calling Python for every group.
+
+import numpy as np
+import pandas as pd
+
+
+def reduce_per_key(data, columns, how, key='student_number'):
+    """
+    Reduces each column to one value per key, independently of the other columns (e.g., how='min' for the earliest
+    date of each date column). Missing values are skipped; a key with only missing values keeps a missing value.
+
+    Parameters:
+    - data (pd.DataFrame): The rows to reduce (e.g., one row per student per year).
+    - columns (list): The columns to reduce.
+    - how (str): The reduction, as passed to DataFrame.groupby().agg() (e.g., 'min', 'max', 'sum').
+    - key (str or list): The column(s) identifying a student (default is 'student_number').
+
+    Returns:
+    - pd.DataFrame: One row per key, with the key column(s) and the reduced columns (in the order of columns).
+    """
+    return data.groupby(key, sort=False)[columns].agg(how).reset_index()
+
+
+def indicator_per_key(data, column, name, count_name=None, key='student_number'):
+    """
+    Reduces a 0/1 column to one indicator per key: 1 if any of the key's rows is 1, otherwise 0 (e.g., ac_ind).
+
+    Parameters:
+    - data (pd.DataFrame): The rows to reduce (e.g., one row per course).
+    - column (str): The 0/1 column (e.g., 'advanced_course').
+    - name (str): Name of the indicator (e.g., 'ac_ind').
+    - count_name (str): Also count the rows that are 1, in a column with this name (e.g., 'ac_count'; default is None).
+    - key (str): The column identifying a student (default is 'student_number').
+
+    Returns:
+    - pd.DataFrame: One row per key (in ascending order), with the key, the indicator and the count.
+    """
+    aggregations = {name: (column, 'max')}
+    if count_name is not None:
+        aggregations[count_name] = (column, 'sum')
+    return data.groupby(key, as_index=False).agg(**aggregations)
+
+
+def presence_grid(data, key, column):
+    """
+    Makes a grid with one row per key and one column per value of column: 1 if the key has a row with that value,
+    otherwise 0 (e.g., the schools each student attended). Rows with a missing key or value are left out.
+
+    Parameters:
+    - data (pd.DataFrame): The rows (e.g., one row per course).
+    - key (str): The column of the grid's rows (e.g., 'student_number').
+    - column (str): The column whose values are the grid's columns (e.g., 'school_number').
+
+    Returns:
+    - pd.DataFrame: The 0/1 grid, indexed by key, with rows and columns in ascending order.
+    """
+    return pd.crosstab(data[key], data[column]).clip(upper=1)
+
+
+def latest_per_key(data, by, key='student_number', tie_break=None):
+    """
+    Keeps one row per key: the row with the highest value of by (e.g., the most recent year). This is what sorting by by
+    in descending order and dropping the duplicates of key (keep='first') gives, without the sort.
+    Rows with a missing by are only kept for a key whose by is always missing. When several rows of a key have the highest
+    value, the one with the lowest tie_break is kept (missing last), or the first of them (in the order of data) without
+    tie_break.
+
+    Parameters:
+    - data (pd.DataFrame): The rows to select from.
+    - by (str): The column to maximize (e.g., 'year' or 'current_grade').
+    - key (str or list): The column(s) identifying a student (default is 'student_number').
+    - tie_break (str): The column to minimize among the rows with the highest by (e.g., 'school_number'; default is None).
+
+    Returns:
+    - pd.DataFrame: The selected rows, with all the columns of data, in the order of data.
+    """
+    groups = data.groupby(key, sort=False, dropna=False).ngroup().to_numpy()
+    values = data[by]
+    highest = values.groupby(groups).transform('max')
+
+    # The rows that have their key's highest value (every row, for a key whose values are all missing)
+    candidates = np.flatnonzero(((values == highest) | highest.isna()).to_numpy())
+    if tie_break is not None:
+        # Of those, the rows that have their key's lowest tie_break (every candidate, for a key whose are all missing)
+        tied = data[tie_break].iloc[candidates].reset_index(drop=True)
+        lowest = tied.groupby(groups[candidates]).transform('min')
+        candidates = candidates[((tied == lowest) | lowest.isna()).to_numpy()]
+    first = ~pd.Series(groups[candidates]).duplicated().to_numpy()
+    return data.iloc[candidates[first]]
@@ -0,0 +1,117 @@
+# Pinned data types for the sheets of the EOY workbooks
+#
+# Like membership_columns in 06_school-table.py, the key columns of every sheet are converted to explicit data types
+# when a workbook is converted to Parquet (see src/workbooks.py), so every script gets the same types for every year:
+# - Student numbers are converted to the canonical student key (see student_key below) and school numbers to 16-bit
+#   integers (nullable, in case a row is missing one)
+# - CourseRecordID is a string, so it joins between Course Master and Course Membership whatever Excel stored
+# - Date columns are datetimes, whether Excel stored them as dates, YYYYMMDD numbers or text (see src/dates.py)
+# Columns not listed here keep the type pandas infers from the workbook.
+
+import pandas as pd
+
+from src.dates import parse_dates
+
+# Version of the pinned data types below. Sheets converted with another version are converted again (see src/workbooks.py)
+schema_version = 3
+
+# Data type of the student key every table is joined on (student_number)
+student_key_dtype = 'int32'
+
+# Sheets of the EOY workbooks used by the pipeline
+sheet_names = ['Student', 'SCRAM', 'Course Master', 'Course Membership', 'Transcript Assessments']
+
+sheet_dtypes = {
+    'Student': {'StudentNumber': 'student_key'},
+    'SCRAM': {'StudentNumber': 'student_key'},
+    'Course Master': {'CourseRecordID': 'string', 'SchoolNumber': 'Int16', 'Teacher1ID': 'Int32'},
+    'Course Membership': {'StudentNumber': 'student_key', 'CourseRecordID': 'string', 'SchoolNumber': 'Int16'},
+    'Transcript Assessments': {'StudentNumber': 'student_key'},
+}
+
+sheet_dates = {
+    'Student': ['EntryDate', 'FirstEnrollInUS', 'EllMonitoredEntryDate', 'ExitDate'],
+    'SCRAM': [],
+    'Course Master': [],
+    'Course Membership': ['CourseEntryDate'],
+    'Transcript Assessments': ['TestDate'],
+}
+
+
+def student_key(values, errors='raise'):
+    """
+    Converts student numbers to the canonical student key: 32-bit integers, so every merge on student_number is an
+    integer join and no script has to convert the key again.
+    Missing student numbers stay missing (the column is then 'Int32' instead of 'int32').
+
+    Parameters:
+    - values (pd.Series): The student numbers (numbers or text).
+    - errors (str): 'raise' to raise a ValueError for student numbers that aren't whole numbers in the 32-bit range,
+      or 'coerce' to make them missing (e.g., for outside data that may have other identifiers).
+
+    Returns:
+    - pd.Series: The student key.
+    """
+    numbers = pd.to_numeric(values, errors='coerce')
+    invalid = (numbers.isna() & values.notna()) | (numbers.notna() & ((numbers % 1 != 0) | (numbers.abs() >= 2**31)))
+
+    if invalid.any():
+        if errors == 'raise':
+            raise ValueError(f'Invalid student numbers (e.g., {values[invalid].unique()[:5].tolist()})')
+        numbers = numbers.mask(invalid)
+
+    return numbers.astype(student_key_dtype.capitalize() if numbers.isna().any() else student_key_dtype)
+
+
+def _to_string(values):
+    """Converts a column to strings, writing whole numbers without a trailing '.0' (e.g., 2017000123.0 -> '2017000123')."""
+    if pd.api.types.is_numeric_dtype(values) and (values.dropna() % 1 == 0).all():
+        values = values.astype('Int64')
+    return values.astype('string')
+
+
+def apply_schema(sheet, sheet_name):
+    """
+    Converts the columns of a sheet to the data types pinned above. Columns that don't exist in the sheet are skipped.
+
+    Parameters:
+    - sheet (pd.DataFrame): The sheet as read from the workbook.
+    - sheet_name (str): Name of the sheet (e.g., 'Course Membership').
+
+    Returns:
+    - pd.DataFrame: The sheet with pinned data types.
+    """
+    for column, dtype in sheet_dtypes.get(sheet_name, {}).items():
+        if column not in sheet.columns:
+            continue
+        if dtype == 'student_key':
+            sheet[column] = student_key(sheet[column])
+        elif dtype == 'string':
+            sheet[column] = _to_string(sheet[column])
+        else:
+            sheet[column] = pd.to_numeric(sheet[column], errors='coerce').astype(dtype)
+
+    for column in sheet_dates.get(sheet_name, []):
+        if column in sheet.columns:
+            sheet[column] = parse_dates(sheet[column])
+
+    return sheet
+
+
+def make_storable(df):
+    """
+    Makes a DataFrame storable as Parquet.
+    Excel columns can mix numbers and text (e.g., GradeEarned has 3.7 and 'P'), which Parquet can't store in one column.
+    Those columns are stored as text, which is also how they would be read back from a CSV file.
+
+    Parameters:
+    - df (pd.DataFrame): The data to store.
+
+    Returns:
+    - pd.DataFrame: The data with mixed columns converted to text.
+    """
+    for column in df.columns[df.dtypes == object]:
+        values = df[column].dropna()
+        if values.map(type).nunique() > 1:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
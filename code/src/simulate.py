@@ -0,0 +1,507 @@
+# Simulate the input data of the pipeline, for benchmarking and checking changes without the district's data
+#
+# The real data is never committed, so this writes stand-in files with the same file, sheet and column names the
+# scripts read (see simulate-data.py):
+# - data/{year} EOY Data - USU.xlsx ('Student', 'SCRAM', 'Course Master', 'Course Membership', 'Transcript Assessments')
+# - data/Extracurricular Classes.xlsx
+# - data/Advanced Course Title Mapping.xlsx
+# - data/Clearing House Data - USU Version.csv
+# - data/National Clearinghouse Data - Dec 2024.csv
+#
+# The values are random but seeded, so the same seed and scale always produce the same files. scale=1 is roughly the
+# size of the district (about 15,000 secondary students per year); scale=10 to 100 produces millions of Course Membership rows.
+# An XLSX sheet holds at most 1,048,576 rows, so at large scales write the EOY sheets straight to data/parquet instead
+# (file_format='parquet'), which is what the pipeline reads after 00_convert-workbooks.py anyway.
+
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from src import config
+from src.parallel import map_years
+from src.schemas import sheet_names
+from src.workbooks import sheet_path, write_sheet
+
+# Largest number of rows (including the header) in an XLSX sheet
+xlsx_max_rows = 1_048_576
+
+# Input files that aren't EOY workbooks
+other_files = [
+    'Extracurricular Classes.xlsx', 'Advanced Course Title Mapping.xlsx',
+    'Clearing House Data - USU Version.csv', 'National Clearinghouse Data - Dec 2024.csv'
+]
+
+# School numbers used throughout the pipeline, plus a few elementary schools
+middle_school_ids = [330, 406, 410]
+high_school_ids = [702, 703, 705, 706, 710]
+elementary_school_ids = [106, 109, 111, 118, 120]
+
+# Size of one grade cohort at scale=1.0 (about 15,000 secondary students per year)
+cohort_size = 1800
+cohort_growth = 1.03
+sections_per_teacher = 5
+teachers_per_school = {330: 45, 406: 45, 410: 45, 702: 70, 703: 80, 705: 85, 706: 80, 710: 12}
+courses_per_student = 7
+
+regular_titles = [
+    'ENGLISH 9', 'ENGLISH 10', 'ENGLISH 11', 'ENGLISH 12', 'SECONDARY MATH I', 'SECONDARY MATH II',
+    'BIOLOGY', 'CHEMISTRY', 'PHYSICS', 'US HISTORY', 'WORLD HISTORY', 'HEALTH', 'FITNESS FOR LIFE',
+    'ART FOUNDATIONS', 'CHOIR', 'BAND', 'ORCHESTRA', 'DRAMA', 'Apparel Design', 'SPANISH 1',
+    'COMPUTER SCIENCE', 'FINANCIAL LITERACY', 'DIGITAL LITERACY', 'SEMINARY RELEASE'
+]
+extracurricular_titles = ['CHOIR', 'BAND', 'ORCHESTRA', 'DRAMA']
+
+# Advanced course titles: clean title, subject and type for the title mapping workbook
+advanced_titles = {
+    'AP CALCULUS AB': ('AP Calculus AB', 'math', 'ap'),
+    'AP STATISTICS': ('AP Statistics', 'math', 'ap'),
+    'AP BIOLOGY': ('AP Biology', 'science', 'ap'),
+    'AP CHEMISTRY': ('AP Chemistry', 'science', 'ap'),
+    'AP ENGLISH LANG': ('AP English Language & Composition', 'english', 'ap'),
+    'AP US HISTORY': ('AP US History', 'social_science', 'ap'),
+    'AP STUDIO ART': ('AP Studio Art/Drawing', 'arts', 'ap'),
+    'BTEC NURSING ASSISTANT': ('BTEC Nursing Assistant', 'cte', 'btech'),
+    'BTEC WELDING': ('BTEC Welding', 'cte', 'btech'),
+    'MATH 1050': ('College Algebra', 'math', 'ce'),
+    'ENGL 1010': ('Intro to Writing', 'english', 'ce'),
+    'PSY 1010': ('General Psychology', 'social_science', 'ce'),
+    'BIOL 1010': ('General Biology', 'science', 'ce'),
+}
+concurrent_titles = ['MATH 1050', 'ENGL 1010', 'PSY 1010', 'BIOL 1010']
+course_numbers = {title.upper(): str(10000 + i * 7) for i, title in enumerate(regular_titles + list(advanced_titles))}
+
+colleges = [
+    ('003677-00', 'UTAH STATE UNIVERSITY', 'UT'), ('003675-00', 'UNIVERSITY OF UTAH', 'UT'),
+    ('003670-00', 'BRIGHAM YOUNG UNIVERSITY', 'UT'), ('003680-00', 'WEBER STATE UNIVERSITY', 'UT'),
+    ('001081-00', 'ARIZONA STATE UNIVERSITY', 'AZ'), ('001626-00', 'IDAHO STATE UNIVERSITY', 'ID'),
+]
+degrees = ['ASSOCIATE OF SCIENCE', 'BACHELOR OF SCIENCE', 'BACHELOR OF ARTS', 'MASTER OF SCIENCE']
+majors = ['BIOLOGY', 'NURSING', 'ELEMENTARY EDUCATION', 'ECONOMICS', 'MECHANICAL ENGINEERING', 'PSYCHOLOGY']
+
+
+def _choice(rng, values, n, p=None):
+    """Draws n values (objects, None allowed) with optional probabilities."""
+    return np.asarray(values, dtype=object)[rng.choice(len(values), n, p=p)]
+
+
+def _flag(rng, n, p):
+    """A 'Y'/None column, the way the EOY extract stores binary fields."""
+    return np.where(rng.random(n) < p, 'Y', None)
+
+
+def _school_year_dates(rng, year, n, days=270):
+    """Random dates within the school year that ends in `year`."""
+    start = np.datetime64(f'{year - 1}-08-15')
+    return pd.to_datetime(start + rng.integers(0, days, n).astype('timedelta64[D]'))
+
+
+def _as_yyyymmdd(dates):
+    """Converts datetimes to YYYYMMDD integers (float when missing), as in the clearinghouse files."""
+    dates = pd.Series(dates)
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).astype('float64')
+
+
+def simulate_population(rng, years, scale=1.0):
+    """
+    Builds the longitudinal student population shared by all workbooks.
+
+    Parameters:
+    - rng (np.random.Generator): Random generator.
+    - years (list): Years that will be simulated.
+    - scale (float): Multiplier on the cohort size.
+
+    Returns:
+    - pd.DataFrame: One row per student with stable attributes and 'cohort', the year the student is in grade 12.
+    """
+    cohorts = np.arange(min(years), max(years) + 13)
+    sizes = np.round(cohort_size * scale * cohort_growth ** (cohorts - cohorts[0])).astype(int)
+    cohort = np.repeat(cohorts, sizes)
+    n = len(cohort)
+
+    population = pd.DataFrame({
+        'StudentNumber': np.arange(100001, 100001 + n, dtype=np.int64),
+        'cohort': cohort,
+        'ability': rng.normal(0, 1, n),
+        'Gender': _choice(rng, ['M', 'F', 'X'], n, p=[0.49, 0.49, 0.02]),
+        'LimitedEnglish': _choice(rng, [None, 'N', 'Y', 'O', 'F'], n, p=[0.82, 0.06, 0.05, 0.04, 0.03]),
+        'TribalAffiliation': _choice(rng, [None, 'G', 'N', 'S'], n, p=[0.97, 0.01, 0.01, 0.01]),
+        'EllNativeLanguage': _choice(rng, [None, 'SPA', 'ARA', 'CHI'], n, p=[0.86, 0.1, 0.02, 0.02]),
+        'EllParentLanguage': _choice(rng, [None, 'SPA', 'ARA', 'CHI'], n, p=[0.86, 0.1, 0.02, 0.02]),
+        'EllInstructionType': _choice(rng, [None, 'E', 'T', 'D'], n, p=[0.9, 0.05, 0.03, 0.02]),
+        'Ethnicity': _flag(rng, n, 0.18),
+        'AmerIndianAlaskan': _flag(rng, n, 0.02),
+        'Asian': _flag(rng, n, 0.03),
+        'BlackAfricanAmer': _flag(rng, n, 0.02),
+        'HawaiianPacificIsl': _flag(rng, n, 0.02),
+        'White': _flag(rng, n, 0.85),
+        'Services504': _flag(rng, n, 0.05),
+        'MilitaryChild': _flag(rng, n, 0.01),
+        'RefugeeStudent': _flag(rng, n, 0.01),
+        'Immigrant': _flag(rng, n, 0.03),
+        'Gifted': _flag(rng, n, 0.06),
+        'FirstEnrollInUS': pd.to_datetime(np.datetime64('2004-08-20') + rng.integers(0, 4000, n).astype('timedelta64[D]')),
+        'middle_school': _choice(rng, middle_school_ids, n),
+        'high_school': _choice(rng, high_school_ids, n, p=[0.23, 0.25, 0.26, 0.23, 0.03]),
+        'special_ed': rng.random(n) < 0.12,
+    })
+    # Roughly 2% of students move between the two high school feeder patterns
+    movers = rng.random(n) < 0.02
+    population['other_high_school'] = np.where(movers, _choice(rng, high_school_ids, n), population['high_school'])
+    return population
+
+
+def simulate_course_master(rng, year, scale=1.0):
+    """
+    Simulates the 'Course Master' sheet: one row per course section.
+
+    Teacher IDs are stable across years (with ~10% turnover) so teacher grids span years.
+    The number of teachers grows with scale above 1.
+    """
+    sections = []
+    schools = middle_school_ids + high_school_ids + elementary_school_ids
+    record = year * 1_000_000
+    for school in schools:
+        # Schools get more teachers above scale=1 (smaller scales keep the district's number of teachers)
+        n_teachers = round(teachers_per_school.get(school, 20) * max(scale, 1.0))
+        slot = np.arange(n_teachers)
+        # Teacher IDs are derived from the school and a slot, with turnover changing the slot's owner
+        # Slots past 1,000 (scale > 10) are moved to a higher range so IDs stay unique across schools
+        generation = (year - 2017 + slot) // 10
+        teacher_ids = (slot // 1000) * 10**8 + school * 10000 + (slot % 1000) * 10 + generation
+        teacher = np.repeat(teacher_ids, sections_per_teacher)
+        n = len(teacher)
+        titles = _choice(rng, regular_titles, n)
+        if school in high_school_ids:
+            # About a quarter of high school teachers teach advanced sections (half of their load)
+            ac_teacher = np.repeat((np.arange(n_teachers) % 4) == 0, sections_per_teacher)
+            ac_section = ac_teacher & (rng.random(n) < 0.5)
+            titles = np.where(ac_section, _choice(rng, list(advanced_titles), n), titles)
+        # A few titles are keyed with stray whitespace or lowercase like the real extract
+        messy = rng.random(n) < 0.01
+        titles = np.where(messy, [' ' + str(t).lower() for t in titles], titles)
+        concurrent = np.isin(titles, concurrent_titles)
+        sections.append(pd.DataFrame({
+            'CourseRecordID': np.arange(record, record + n).astype(str),
+            'SchoolNumber': school,
+            'CourseNumber': [course_numbers[str(t).strip().upper()] for t in titles],
+            'CourseTitle': titles,
+            'Teacher1ID': teacher,
+            'Term': _choice(rng, ['S1', 'S2', 'YR'], n),
+            'CollegeGrantingCr': np.where(concurrent & (rng.random(n) < 0.8), 'USU', None),
+            'WhereTaughtCampus': np.where(concurrent & (rng.random(n) < 0.2), 'LOGAN', None),
+        }))
+        record += n
+    return pd.concat(sections, ignore_index=True)
+
+
+def simulate_year(population, year, seed, scale=1.0):
+    """
+    Simulates every sheet of one EOY workbook.
+
+    Parameters:
+    - population (pd.DataFrame): Output of simulate_population.
+    - year (int): School year (spring) being simulated.
+    - seed (np.random.SeedSequence): Seed for this year, so years can be generated independently.
+    - scale (float): Multiplier on district size (for the number of teachers, see simulate_course_master).
+
+    Returns:
+    - dict: Sheet name -> DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    grade = 12 - (population['cohort'] - year)
+    active = population[(grade >= 5) & (grade <= 12)].copy()
+    active['GradeLevel'] = grade[active.index]
+    n = len(active)
+
+    # -------------------------------------------------------------------------------------------
+    # Student sheet
+    student = pd.DataFrame({'StudentNumber': active['StudentNumber'].to_numpy(), 'GradeLevel': active['GradeLevel'].to_numpy()})
+    days_membership = rng.integers(150, 186, n)
+    absences = np.minimum(rng.poisson(np.exp(1.8 - 0.4 * active['ability'].to_numpy())), days_membership)
+    student['DaysAttended'] = days_membership - absences
+    student['SchoolMembership'] = days_membership
+    student['CumulativeGPA'] = np.clip(np.round(3.2 + 0.5 * active['ability'].to_numpy() + rng.normal(0, 0.3, n), 3), 0, 4)
+    if year >= 2022:
+        excused = rng.binomial(absences, 0.6)
+        suspension = rng.binomial(absences - excused, 0.05)
+        student['ExcusedAbsences'] = excused
+        student['UnexcusedAbsences'] = absences - excused - suspension
+        student['AbsencesDueToSuspension'] = suspension
+    for column in ['Gender', 'LimitedEnglish', 'EllNativeLanguage', 'EllParentLanguage', 'EllInstructionType']:
+        student[column] = active[column].to_numpy()
+    if year > 2017:
+        student['TribalAffiliation'] = active['TribalAffiliation'].to_numpy()
+    senior = student['GradeLevel'].to_numpy() == 12
+    student['HighSchlComplStatus'] = np.where(senior, _choice(rng, ['GQ', 'GR', 'GC', None], n, p=[0.3, 0.55, 0.1, 0.05]), None)
+    # Numeric exit codes: with 'nan' for the missing ones, the column mixes numbers and text in 03
+    student['ExitCode'] = _choice(rng, [None, 1, 2, 3, 4], n, p=[0.9, 0.04, 0.03, 0.02, 0.01])
+    for column in ['Ethnicity', 'AmerIndianAlaskan', 'Asian', 'BlackAfricanAmer', 'HawaiianPacificIsl', 'White',
+                   'Services504', 'MilitaryChild', 'RefugeeStudent', 'Immigrant', 'Gifted']:
+        student[column] = active[column].to_numpy()
+    student['Migrant'] = _flag(rng, n, 0.01)
+    student['ReadingIntervention'] = _flag(rng, n, 0.04)
+    student['PassedCivicsExam'] = np.where(student['GradeLevel'] >= 10, _flag(rng, n, 0.7), None)
+    student['ReadGradeLevel'] = _choice(rng, ['Y', 'N', None], n, p=[0.6, 0.2, 0.2])
+    student['EntryDate'] = _school_year_dates(rng, year, n, days=30)
+    student['FirstEnrollInUS'] = active['FirstEnrollInUS'].to_numpy()
+    ell = np.isin(active['LimitedEnglish'].to_numpy(), ['Y', 'O', 'F'])
+    student['EllMonitoredEntryDate'] = pd.Series(_school_year_dates(rng, year - 2, n, days=365)).where(ell)
+    if year > 2017:
+        student['HomeStatus'] = _choice(rng, [0, 1, 2, 3, 4, 5], n, p=[0.95, 0.03, 0.005, 0.005, 0.005, 0.005])
+        student['PartTimeHomeSchool'] = _choice(rng, [None, 'H', 'P', 'S'], n, p=[0.96, 0.02, 0.01, 0.01])
+    # Columns the pipeline drops straight away
+    student['ExitDate'] = pd.NaT
+    student['ResidentStatus'] = 'R'
+    student['EarlyGrad'] = None
+    student['ReadGradeLevelFall'] = None
+    student['IsOnePercentTest'] = None  # Unused wide column, like the many in the real extract
+
+    # About 2% of students have a second, earlier record in the same year
+    repeat = student.sample(frac=0.02, random_state=rng.integers(1 << 31))
+    repeat = repeat.assign(GradeLevel=repeat['GradeLevel'] - 1)
+    student = pd.concat([student, repeat], ignore_index=True)
+
+    # -------------------------------------------------------------------------------------------
+    # SCRAM sheet: special education records, some students with two rows
+    scram_students = active[active['special_ed'].to_numpy()]
+    m = len(scram_students)
+    scram = pd.DataFrame({
+        'StudentNumber': scram_students['StudentNumber'].to_numpy(),
+        'IsOnePercent': np.where(rng.random(m) < 0.08, 'Y', None),
+        'ScramMembership': np.where(rng.random(m) < 0.05, np.nan, rng.integers(20, 181, m)),
+        'RegularPercent': _choice(rng, [1.0, 2.0, 3.0, np.nan], m, p=[0.6, 0.25, 0.1, 0.05]).astype(float),
+        'Environment': _choice(rng, ['R', 'V', 'H', None], m, p=[0.85, 0.1, 0.01, 0.04]),
+        'ExtendedSchoolYear': _choice(rng, ['Y', 'N'], m, p=[0.1, 0.9]),
+    })
+    scram = pd.concat([scram, scram.sample(frac=0.05, random_state=rng.integers(1 << 31)).assign(ScramMembership=10)], ignore_index=True)
+
+    # -------------------------------------------------------------------------------------------
+    # Course Master and Course Membership
+    master = simulate_course_master(rng, year, scale)
+    secondary = active[active['GradeLevel'] >= 6]
+    school = np.where(secondary['GradeLevel'] <= 8, secondary['middle_school'],
+                      np.where(secondary['GradeLevel'] >= 11, secondary['other_high_school'], secondary['high_school']))
+    k = courses_per_student
+    student_rows = np.repeat(np.arange(len(secondary)), k)
+    school_rows = np.repeat(school, k)
+
+    # Pick sections at each student's school; stronger students are more likely to pick advanced titles
+    master_by_school = {s: g.index.to_numpy() for s, g in master.groupby('SchoolNumber')}
+    advanced = master['CourseTitle'].str.strip().str.upper().str.match(r'^(AP|BTEC)').to_numpy() | master['CollegeGrantingCr'].notna().to_numpy()
+    picks = np.empty(len(student_rows), dtype=np.int64)
+    ability = np.repeat(secondary['ability'].to_numpy(), k)
+    for s, rows in master_by_school.items():
+        mask = school_rows == s
+        if not mask.any():
+            continue
+        regular = rows[~advanced[rows]]
+        adv = rows[advanced[rows]]
+        take_adv = (rng.random(mask.sum()) < 1 / (1 + np.exp(-(ability[mask] - 0.8)))) & (len(adv) > 0)
+        chosen = regular[rng.integers(0, len(regular), mask.sum())]
+        if len(adv):
+            chosen = np.where(take_adv, adv[rng.integers(0, len(adv), mask.sum())], chosen)
+        picks[mask] = chosen
+
+    sections = master.iloc[picks]
+    grades = _choice(rng, ['4.0', '3.7', '3.3', '3.0', '2.7', '2.0', '1.0', 'F', 'P'], len(picks),
+                     p=[0.3, 0.15, 0.12, 0.1, 0.08, 0.1, 0.05, 0.05, 0.05])
+    grade_earned = pd.Series(grades, dtype=object)
+    numeric = ~grade_earned.isin(['F', 'P'])
+    grade_earned[numeric] = grade_earned[numeric].astype(float)
+    membership = pd.DataFrame({
+        'StudentNumber': secondary['StudentNumber'].to_numpy()[student_rows],
+        'CourseRecordID': sections['CourseRecordID'].to_numpy(),
+        'SchoolNumber': sections['SchoolNumber'].to_numpy(),
+        'CourseNumber': sections['CourseNumber'].to_numpy(),
+        'CourseEntryDate': _school_year_dates(rng, year, len(picks), days=200),
+        'ConcurrEnrolled': np.where(np.isin(sections['CourseTitle'].to_numpy(), concurrent_titles) & (rng.random(len(picks)) < 0.7), 'Y', None),
+        'GradeEarned': grade_earned.to_numpy(),
+        'Credit': 0.25,
+    })
+    membership = pd.concat([membership, membership.sample(frac=0.01, random_state=rng.integers(1 << 31))], ignore_index=True)
+
+    # -------------------------------------------------------------------------------------------
+    # Transcript Assessments: ACT (and a few SAT) subtests for upperclassmen
+    upper = active[active['GradeLevel'] >= 11]
+    takers = upper[rng.random(len(upper)) < 0.6]
+    subtests = ['Composite', 'English', 'Math', 'Reading', 'Science', 'Writing']
+    t = len(takers)
+    test_date = _school_year_dates(rng, year, t)
+    base_score = np.clip(np.round(21 + 4 * takers['ability'].to_numpy() + rng.normal(0, 2, t)), 1, 36)
+    assessment = pd.DataFrame({
+        'LEANumber': 18,
+        'StudentNumber': np.repeat(takers['StudentNumber'].to_numpy(), len(subtests)),
+        'TestName': np.repeat(np.where(rng.random(t) < 0.95, 'ACT', 'SAT'), len(subtests)),
+        'TestDate': np.repeat(test_date, len(subtests)),
+        'Subtest': np.tile(subtests, t),
+        'TestScore': np.clip(np.repeat(base_score, len(subtests)) + rng.integers(-3, 4, t * len(subtests)), 1, 36).astype(int),
+    })
+
+    return {
+        'Student': student,
+        'SCRAM': scram,
+        'Course Master': master,
+        'Course Membership': membership,
+        'Transcript Assessments': assessment,
+    }
+
+
+def simulate_clearinghouse(rng, population, years):
+    """
+    Simulates the two National Student Clearinghouse extracts for graduated cohorts.
+
+    Returns:
+    - (pd.DataFrame, pd.DataFrame): The old ('Student Identifier') and new ('Student Number') files.
+    """
+    graduates = population[(population['cohort'] >= min(years)) & (population['cohort'] <= 2024)]
+    enrolled = graduates[rng.random(len(graduates)) < 1 / (1 + np.exp(-(graduates['ability'].to_numpy() + 0.3)))]
+    records = rng.integers(1, 4, len(enrolled))
+    rows = np.repeat(np.arange(len(enrolled)), records)
+    # Number the records of each student 1, 2, ...
+    sequence = np.arange(len(rows)) - np.repeat(np.cumsum(records) - records, records) + 1
+    college = rng.integers(0, len(colleges), len(rows))
+    college_table = np.array(colleges, dtype=object)
+    # Enrollment starts on August 25 of the year the student graduated from high school
+    august = (enrolled['cohort'].to_numpy()[rows] - 1970).astype('datetime64[Y]').astype('datetime64[M]') + np.timedelta64(7, 'M')
+    fall = august.astype('datetime64[D]') + np.timedelta64(24, 'D')
+    begin = pd.to_datetime(fall) + pd.to_timedelta(sequence * 180 - 180, unit='D')
+    graduated = (rng.random(len(rows)) < 0.35) & (sequence == records[rows])
+    clearing = pd.DataFrame({
+        'Student Number': enrolled['StudentNumber'].to_numpy()[rows],
+        'College_Code/Branch': college_table[college, 0],
+        'College_Name': college_table[college, 1],
+        'College_State': college_table[college, 2],
+        'Enrollment_Begin': _as_yyyymmdd(begin).to_numpy(),
+        'Enrollment_End': _as_yyyymmdd(begin + pd.to_timedelta(120, unit='D')).to_numpy(),
+        'Graduated': np.where(graduated, 'Y', 'N'),
+        'Degree_Title': np.where(graduated, _choice(rng, degrees, len(rows)), None),
+        'Major': np.where(graduated, _choice(rng, majors, len(rows)), None),
+        'College_Sequence': sequence,
+    })
+    # Students who never enrolled still get a 'no record' row
+    missing = graduates[~graduates['StudentNumber'].isin(enrolled['StudentNumber'])]
+    clearing = pd.concat([clearing, pd.DataFrame({'Student Number': missing['StudentNumber'].to_numpy()})], ignore_index=True)
+    cohort = clearing['Student Number'].map(population.set_index('StudentNumber')['cohort'])
+    old = clearing[cohort <= 2019].rename(columns={'Student Number': 'Student Identifier'})
+    new = clearing[cohort > 2019]
+    return old, new
+
+
+def write_workbook(path, sheets):
+    """
+    Writes sheets to an XLSX file with openpyxl's streaming writer.
+
+    Parameters:
+    - path (str): Output path.
+    - sheets (dict): Sheet name -> DataFrame.
+    """
+    workbook = Workbook(write_only=True)
+    for sheet_name, frame in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(list(frame.columns))
+        # Convert to python objects with None for missing values, which openpyxl writes as empty cells
+        values = frame.astype(object).where(frame.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            worksheet.append(row)
+    workbook.save(path)
+
+
+def _as_read(sheet):
+    """
+    Makes a simulated sheet look like pd.read_excel's output (missing text is NaN, empty columns are float),
+    so storing it directly gives the same data types as converting the workbook.
+    """
+    sheet = sheet.copy()
+    for column in sheet.columns[sheet.dtypes == object]:
+        sheet[column] = sheet[column].where(sheet[column].notna(), np.nan)
+        if sheet[column].isna().all():
+            sheet[column] = sheet[column].astype('float64')
+    return sheet
+
+
+def _simulate_year_files(year, population, seeds, scale, data_dir, file_format):
+    """
+    Simulates one year and writes its EOY workbook (or its converted sheets). Used as the worker function for map_years.
+
+    Returns:
+    - dict: Sheet name -> number of rows.
+    """
+    sheets = simulate_year(population, year, seeds[year], scale)
+
+    if file_format == 'xlsx':
+        too_long = [sheet_name for sheet_name, sheet in sheets.items() if len(sheet) >= xlsx_max_rows]
+        if too_long:
+            raise ValueError(f"{year}: {', '.join(too_long)} won't fit in an XLSX sheet. Use file_format='parquet' at this scale")
+        write_workbook(os.path.join(data_dir, f'{year} EOY Data - USU.xlsx'), sheets)
+    else:
+        for sheet_name, sheet in sheets.items():
+            write_sheet(year, sheet_name, _as_read(sheet), store_dir=os.path.join(data_dir, 'parquet'))
+
+    return {sheet_name: len(sheet) for sheet_name, sheet in sheets.items()}
+
+
+def simulated_files(data_dir, years, file_format='xlsx'):
+    """
+    Returns the paths simulate_data() writes to.
+    """
+    if file_format == 'xlsx':
+        paths = [os.path.join(data_dir, f'{year} EOY Data - USU.xlsx') for year in years]
+    else:
+        store_dir = os.path.join(data_dir, 'parquet')
+        paths = [sheet_path(year, sheet_name, store_dir) for year in years for sheet_name in sheet_names]
+    return paths + [os.path.join(data_dir, file_name) for file_name in other_files]
+
+
+def simulate_data(data_dir='data', years=None, scale=1.0, seed=2025, file_format='xlsx', overwrite=False, workers=None):
+    """
+    Writes every input file the pipeline reads to data_dir.
+
+    Parameters:
+    - data_dir (str): Output folder.
+    - years (list): Years to simulate (defaults to the pipeline years).
+    - scale (float): Multiplier on district size (1 is about 15,000 secondary students per year).
+    - seed (int): Seed for the random generator; the same seed and scale always produce the same files.
+    - file_format (str): 'xlsx' for EOY workbooks, or 'parquet' to store the sheets as converted by 00_convert-workbooks.py.
+    - overwrite (bool): Replace files that already exist (otherwise they're never touched, so real data is safe).
+    - workers (int): Number of worker processes to simulate the years in parallel (default is config.workers).
+
+    Returns:
+    - dict: Year -> (sheet name -> number of rows).
+    """
+    years = years or config.years
+    if file_format not in ('xlsx', 'parquet'):
+        raise ValueError(f"file_format must be 'xlsx' or 'parquet', not '{file_format}'")
+
+    existing = [path for path in simulated_files(data_dir, years, file_format) if os.path.exists(path)]
+    if existing and not overwrite:
+        raise FileExistsError(f'{existing[0]} already exists (and {len(existing) - 1} more). Use overwrite=True to replace them')
+
+    os.makedirs(data_dir, exist_ok=True)
+    root = np.random.SeedSequence(seed)
+    population_seed, clearinghouse_seed, *year_seeds = root.spawn(2 + len(years))
+
+    population = simulate_population(np.random.default_rng(population_seed), years, scale)
+
+    # Each year is independent given the population, so the years are simulated in parallel
+    rows = map_years(
+        _simulate_year_files, years, workers=workers,
+        population=population, seeds=dict(zip(years, year_seeds)), scale=scale, data_dir=data_dir, file_format=file_format
+    )
+
+    # Extracurricular course numbers and the advanced course title mapping
+    master = simulate_course_master(np.random.default_rng(0), years[0])
+    extracurricular = master.loc[master['CourseTitle'].isin(extracurricular_titles), ['CourseNumber']].drop_duplicates()
+    write_workbook(os.path.join(data_dir, 'Extracurricular Classes.xlsx'), {'Sheet1': extracurricular})
+    mapping = pd.DataFrame(
+        [(title, *values) for title, values in advanced_titles.items()],
+        columns=['course_title', 'clean_course_title', 'course_subject', 'course_type']
+    )
+    write_workbook(os.path.join(data_dir, 'Advanced Course Title Mapping.xlsx'), {'Sheet1': mapping})
+
+    old, new = simulate_clearinghouse(np.random.default_rng(clearinghouse_seed), population, years)
+    old.to_csv(os.path.join(data_dir, 'Clearing House Data - USU Version.csv'), index=False)
+    new.to_csv(os.path.join(data_dir, 'National Clearinghouse Data - Dec 2024.csv'), index=False)
+
+    return rows
@@ -0,0 +1,204 @@
+# The scripts of the pipeline (stages), in the order they run, and the files each one reads and writes
+#
+# Paths are relative to the project root (where the scripts are run from) and can be patterns
+# (e.g., data/*teacher_grid.npz). An input is written with the same path or pattern as the output it comes from,
+# so the stages a stage depends on can be found from the paths (see dependencies()).
+# Used to run the pipeline (see src/pipeline.py) and to time it (see src/benchmark.py).
+
+import fnmatch
+import glob
+import os
+
+import numpy as np
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Folder with the numbered scripts
+code_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sheets converted by 00_convert-workbooks.py, by sheet (see src/workbooks.py)
+_sheets = {
+    sheet: f'data/parquet/{sheet}/year=*/part-0.parquet'
+    for sheet in ['student', 'scram', 'course-master', 'course-membership', 'transcript-assessments']
+}
+_student_tables = 'data/student_tables/year=*/part-0.arrow'
+_clearinghouse = ['data/Clearing House Data - USU Version.csv', 'data/National Clearinghouse Data - Dec 2024.csv']
+_teacher_grids = 'data/*teacher_grid.npz'
+
+# Stage -> script, the files it reads (inputs), the files it writes (outputs) and the files of earlier stages it
+# rewrites (updates, e.g., 03 removes the regular_percent columns from the 02_academic files)
+stages = {
+    '00': {
+        'script': '00_convert-workbooks.py',
+        'inputs': ['data/* EOY Data - USU.xlsx'],
+        'outputs': ['data/parquet/*/year=*/part-0.parquet'],
+    },
+    '01': {
+        'script': '01_student-table.py',
+        'inputs': [_sheets['student'], _sheets['scram']],
+        'outputs': [_student_tables],
+    },
+    '02': {
+        'script': '02_academic-table.py',
+        'inputs': [_student_tables, _sheets['course-master'], _sheets['course-membership'], _sheets['scram'],
+                   'data/Extracurricular Classes.xlsx'],
+        'outputs': ['data/02_academic_exploratory.parquet', 'data/02_academic_modeling.parquet'],
+    },
+    '03': {
+        'script': '03_demographic-table.py',
+        'inputs': [_student_tables, 'data/02_academic_exploratory.parquet', 'data/02_academic_modeling.parquet'],
+        'outputs': ['data/03_demographic_exploratory.parquet', 'data/03_demographic_modeling.parquet'],
+        'updates': ['data/02_academic_exploratory.parquet', 'data/02_academic_modeling.parquet'],
+    },
+    '04': {
+        'script': '04_assessment-table.py',
+        'inputs': [_student_tables, _sheets['transcript-assessments']],
+        'outputs': ['data/04_assessment_data.parquet'],
+    },
+    '05': {
+        'script': '05_teacher-table.py',
+        'inputs': [_student_tables, _sheets['course-master'], _sheets['course-membership'], 'data/02_academic_modeling.parquet'],
+        'outputs': [_teacher_grids, 'data/*teacher_data.csv'],
+    },
+    '06': {
+        'script': '06_school-table.py',
+        'inputs': [_student_tables, _sheets['course-membership']],
+        'outputs': ['data/06_school_exploratory_data.parquet', 'data/06_school_modeling_data.parquet'],
+    },
+    '07': {
+        'script': '07_clearinghouse-table.py',
+        'inputs': [_student_tables, _sheets['course-master'], _sheets['course-membership'], *_clearinghouse,
+                   'data/Advanced Course Title Mapping.xlsx'],
+        'outputs': ['data/07_clearinghouse_exploratory_data.parquet', 'data/07_clearinghouse_model_data.parquet'],
+    },
+    '08': {
+        'script': '08_combine_data-table.py',
+        'inputs': [
+            _student_tables, 'data/02_academic_exploratory.parquet', 'data/02_academic_modeling.parquet',
+            'data/03_demographic_exploratory.parquet', 'data/03_demographic_modeling.parquet', 'data/04_assessment_data.parquet',
+            'data/06_school_exploratory_data.parquet', 'data/06_school_modeling_data.parquet',
+            'data/07_clearinghouse_exploratory_data.parquet', 'data/07_clearinghouse_model_data.parquet'
+        ],
+        'outputs': [
+            'data/exploratory_data.parquet', 'data/modeling_data.parquet',
+            'data/post_covid_exploratory_data.parquet', 'data/post_covid_modeling_data.parquet',
+            'data/clearinghouse_exploratory_data.parquet', 'data/clearinghouse_model_data.parquet'
+        ],
+    },
+    '09': {
+        'script': '09_exploratory-data-analysis.py',
+        'inputs': ['data/exploratory_data.parquet', 'data/clearinghouse_exploratory_data.parquet'],
+        'outputs': [],
+    },
+    '10': {
+        'script': '10_teacher-correlations.py',
+        'inputs': [_teacher_grids],
+        'outputs': ['data/teacher_correlations.xlsx'],
+    },
+    '11': {
+        'script': '11_visualize-exploratory-data.py',
+        'inputs': ['data/exploratory_data.parquet', 'data/clearinghouse_exploratory_data.parquet', *_clearinghouse,
+                   _student_tables, _sheets['course-master'], _sheets['course-membership']],
+        'outputs': [],
+    },
+    '12': {
+        'script': '12_visualize-modeling-data.py',
+        'inputs': ['data/modeling_data.parquet'],
+        'outputs': [],
+    },
+    '13': {
+        'script': '13_antecedent-model.py',
+        'inputs': ['data/modeling_data.parquet', 'data/post_covid_modeling_data.parquet'],
+        'outputs': ['output/*-model-output_*.nc', 'output/*-model-output-ordered_*.csv'],
+    },
+    '14': {
+        'script': '14_effects-model.py',
+        'inputs': ['data/clearinghouse_model_data.parquet'],
+        'outputs': ['output/*-model-output_*.nc', 'output/*-model-output-ordered_*.csv'],
+    },
+    '15': {
+        'script': '15_visualize-model.py',
+        'inputs': ['output/*-model-output_*.nc'],
+        'outputs': ['figures/*.png'],
+    },
+}
+
+
+def script_path(stage):
+    """
+    Returns the path of a stage's script (e.g., code/01_student-table.py for '01').
+    """
+    return os.path.join(code_dir, stages[stage]['script'])
+
+
+def output_paths(stage, root='.'):
+    """
+    Returns the files a stage has written.
+
+    Parameters:
+    - stage (str): The stage (e.g., '01').
+    - root (str): The project root the stage was run from.
+
+    Returns:
+    - list: Paths of the stage's output files that exist, in order.
+    """
+    return sorted(path for pattern in stages[stage]['outputs'] for path in glob.glob(os.path.join(root, pattern)))
+
+
+def output_rows(stage, root='.'):
+    """
+    Counts the rows a stage has written to its Parquet and Arrow outputs, from the file metadata (nothing is loaded),
+    and to its grids (students, see src/grids.py). Other outputs (CSV, Excel, figures) aren't counted.
+
+    Parameters:
+    - stage (str): The stage (e.g., '01').
+    - root (str): The project root the stage was run from.
+
+    Returns:
+    - int: Total number of rows.
+    """
+    rows = 0
+    for path in output_paths(stage, root):
+        if path.endswith('.parquet'):
+            rows += pq.read_metadata(path).num_rows
+        elif path.endswith('.arrow'):
+            rows += feather.read_table(path, memory_map=True).num_rows
+        elif path.endswith('.npz'):
+            with np.load(path) as f:
+                rows += int(f['shape'][0])
+    return rows
+
+
+def _overlaps(pattern, other):
+    """Checks whether two paths or patterns can match the same file."""
+    return pattern == other or fnmatch.fnmatchcase(pattern, other) or fnmatch.fnmatchcase(other, pattern)
+
+
+def dependencies(stage):
+    """
+    Returns the earlier stages a stage reads files from. A file written by one stage and rewritten by a later
+    stage (see 'updates') comes from the later stage, except for the stage that rewrites it.
+
+    Parameters:
+    - stage (str): The stage (e.g., '08').
+
+    Returns:
+    - list: The stages, in order.
+    """
+    earlier = list(stages)[:list(stages).index(stage)]
+    found = set()
+    for pattern in stages[stage]['inputs']:
+        writers = [other for other in earlier if any(_overlaps(pattern, output) for output in stages[other]['outputs'])]
+        updaters = [other for other in earlier if any(_overlaps(pattern, update) for update in stages[other].get('updates', []))]
+        found.update(updaters[-1:] if updaters else writers)
+    return sorted(found)
+
+
+def updated_by(stage):
+    """
+    Returns the later stages that rewrite a stage's outputs (e.g., ['03'] for '02').
+    """
+    return [
+        other for other in stages
+        if any(_overlaps(update, output) for update in stages[other].get('updates', []) for output in stages[stage]['outputs'])
+    ]
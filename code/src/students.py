@@ -0,0 +1,82 @@
+# Save and load the student tables made by 01_student-table.py
+#
+# The student tables are stored as one Arrow (Feather) file per year in data/student_tables
+# (e.g., data/student_tables/year=2017/part-0.arrow). The files are uncompressed so they can be memory-mapped:
+# a script only reads the years and columns it asks for, instead of unpickling every year's full table.
+
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.config import student_tables_dir
+from src.files import atomic_write
+
+
+def student_table_path(year):
+    """
+    Returns the path of the student table for a year (e.g., data/student_tables/year=2017/part-0.arrow).
+    """
+    return os.path.join(student_tables_dir, f'year={year}', 'part-0.arrow')
+
+
+def student_table_years():
+    """
+    Returns the years that have a saved student table, in order.
+    """
+    if not os.path.isdir(student_tables_dir):
+        return []
+    return sorted(
+        int(name.split('=', 1)[1]) for name in os.listdir(student_tables_dir)
+        if name.startswith('year=') and os.path.exists(student_table_path(name.split('=', 1)[1]))
+    )
+
+
+def write_student_tables(student_tables, keep_years=()):
+    """
+    Saves the student tables, one file per year. Files for years that aren't in student_tables or keep_years are removed.
+
+    Parameters:
+    - student_tables (dict): Year -> pd.DataFrame with the student table for the year.
+    - keep_years (list): Years whose saved files are kept as they are (e.g., in incremental runs, see src/cache.py).
+    """
+    for year in student_table_years():
+        if year not in student_tables and year not in keep_years:
+            os.remove(student_table_path(year))
+
+    for year, student_table in student_tables.items():
+        # A script running at the same time never reads a partial file (see src/files.py)
+        table = pa.Table.from_pandas(student_table)
+        atomic_write(
+            student_table_path(year),
+            lambda temp_path: feather.write_feather(table, temp_path, compression='uncompressed')
+        )
+
+
+def read_student_table(year, columns=None):
+    """
+    Loads the student table for a year.
+
+    Parameters:
+    - year (int): The school year (e.g., 2017).
+    - columns (list): Names of the columns to load (defaults to all columns).
+
+    Returns:
+    - pd.DataFrame: The student table for the year.
+    """
+    return feather.read_table(student_table_path(year), columns=columns, memory_map=True).to_pandas()
+
+
+def read_student_tables(years=None, columns=None):
+    """
+    Loads the student tables for several years.
+
+    Parameters:
+    - years (list): The years to load (defaults to every saved year).
+    - columns (list): Names of the columns to load (defaults to all columns).
+
+    Returns:
+    - dict: Year -> pd.DataFrame with the student table for the year (e.g., student_tables[2017]).
+    """
+    years = student_table_years() if years is None else years
+    return {year: read_student_table(year, columns) for year in years}
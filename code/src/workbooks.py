@@ -0,0 +1,214 @@
+# Load sheets from the yearly EOY workbooks ('{year} EOY Data - USU.xlsx')
+#
+# Parsing the XLSX files with openpyxl is the slowest part of the pipeline, and most scripts read the same sheets.
+# Each (year, sheet) is converted once to a Parquet file with pinned data types (see src/schemas.py), stored by sheet
+# and year in data/parquet (e.g., data/parquet/course-membership/year=2017/part-0.parquet).
+# Every file records the content hash of the workbook it came from, so a sheet is only converted again when its
+# workbook changes. Run 00_convert-workbooks.py to convert everything up front; otherwise read_sheet() converts
+# whatever is missing the first time it's needed. Once converted, the workbooks aren't needed to run the pipeline.
+
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import data_dir, parquet_dir
+from src.files import atomic_write
+from src.schemas import apply_schema, make_storable, schema_version, sheet_names as all_sheet_names
+
+# Content hashes computed in this process, keyed by (path, size, modified time)
+_workbook_hashes = {}
+
+
+def workbook_path(year):
+    """
+    Returns the path of the EOY workbook for a year.
+
+    Parameters:
+    - year (int): The school year (e.g., 2017).
+
+    Returns:
+    - str: Path to the workbook.
+    """
+    return os.path.join(data_dir, f'{year} EOY Data - USU.xlsx')
+
+
+def workbook_hash(path):
+    """
+    Computes the SHA-256 hash of a workbook's contents.
+    The hash is only recomputed in this process if the file's size or modified time changes.
+
+    Parameters:
+    - path (str): Path to the workbook.
+
+    Returns:
+    - str: Hex digest of the file contents.
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+
+    if key not in _workbook_hashes:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _workbook_hashes[key] = digest.hexdigest()
+
+    return _workbook_hashes[key]
+
+
+def sheet_path(year, sheet_name, store_dir=parquet_dir):
+    """
+    Returns the Parquet path for a sheet of a year's workbook (e.g., data/parquet/course-master/year=2017/part-0.parquet).
+    Pass store_dir to use a folder other than data/parquet (e.g., for simulated data, see src/simulate.py).
+    """
+    slug = sheet_name.lower().replace(' ', '-')
+    return os.path.join(store_dir, slug, f'year={year}', 'part-0.parquet')
+
+
+def sheet_inputs(year, sheet_names):
+    """
+    Returns the files a year's sheets are read from: the year's workbook and the converted sheets.
+    Used to tell whether results made from the sheets are out of date (e.g., the per-year cache, see src/cache.py).
+    The workbook is listed too because a replaced workbook is only converted again when a sheet is read, so until
+    then the converted sheets still look the same.
+
+    Parameters:
+    - year (int): The school year (e.g., 2017).
+    - sheet_names (list): Names of the sheets (e.g., ['Student', 'SCRAM']).
+
+    Returns:
+    - list: Paths of the workbook and of the converted sheets.
+    """
+    return [workbook_path(year)] + [sheet_path(year, sheet_name) for sheet_name in sheet_names]
+
+
+def _workbook_metadata(path):
+    """Returns the workbook details stored in the metadata of each converted sheet."""
+    stat = os.stat(path)
+    return {
+        b'workbook_sha256': workbook_hash(path).encode(),
+        b'workbook_size': str(stat.st_size).encode(),
+        b'workbook_mtime_ns': str(stat.st_mtime_ns).encode(),
+        b'schema_version': str(schema_version).encode(),
+    }
+
+
+def _is_current(store_path, path):
+    """
+    Checks whether a converted sheet came from the current version of its workbook and of the schemas in src/schemas.py.
+    The workbook is only hashed if its size or modified time differs from when the sheet was converted.
+    """
+    if not os.path.exists(store_path):
+        return False
+
+    stored = pq.read_schema(store_path).metadata or {}
+    if stored.get(b'schema_version') != str(schema_version).encode():
+        return False
+
+    stat = os.stat(path)
+    if (stored.get(b'workbook_size') == str(stat.st_size).encode()
+            and stored.get(b'workbook_mtime_ns') == str(stat.st_mtime_ns).encode()):
+        return True
+    return stored.get(b'workbook_sha256') == workbook_hash(path).encode()
+
+
+def _write_sheet(sheet, store_path, metadata):
+    """Writes a converted sheet with the workbook details in its metadata."""
+    table = pa.Table.from_pandas(sheet, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    # A script running at the same time never reads a partial file (see src/files.py)
+    atomic_write(store_path, lambda temp_path: pq.write_table(table, temp_path))
+
+
+def write_sheet(year, sheet_name, sheet, store_dir=parquet_dir):
+    """
+    Stores a sheet that didn't come from a workbook (e.g., simulated data, see src/simulate.py) as if it was converted.
+    read_sheet() reads it as is as long as there is no workbook for the year.
+
+    Parameters:
+    - year (int): The school year (e.g., 2017).
+    - sheet_name (str): Name of the sheet (e.g., 'Course Membership').
+    - sheet (pd.DataFrame): The sheet's data, with the columns of the EOY workbook.
+    - store_dir (str): Folder to store the sheet in (default is data/parquet).
+    """
+    sheet = make_storable(apply_schema(sheet, sheet_name))
+    _write_sheet(sheet, sheet_path(year, sheet_name, store_dir), {b'schema_version': str(schema_version).encode()})
+
+
+def convert_workbook(year, sheet_names=None, force=False):
+    """
+    Converts sheets of the EOY workbook for a year to Parquet, skipping sheets already converted from the current workbook.
+    All the sheets that need converting are parsed in a single pass over the workbook.
+
+    Parameters:
+    - year (int): The school year (e.g., 2017).
+    - sheet_names (list): Names of the sheets to convert (defaults to every sheet in src/schemas.py).
+    - force (bool): Convert the sheets even if they're up to date.
+
+    Returns:
+    - dict: Sheet name -> number of rows converted, for the sheets that were converted.
+    """
+    path = workbook_path(year)
+    sheet_names = all_sheet_names if sheet_names is None else sheet_names
+    stale = [sheet_name for sheet_name in sheet_names if force or not _is_current(sheet_path(year, sheet_name), path)]
+    if not stale:
+        return {}
+
+    metadata = _workbook_metadata(path)
+    sheets = pd.read_excel(path, sheet_name=stale)
+
+    for sheet_name, sheet in sheets.items():
+        sheet = make_storable(apply_schema(sheet, sheet_name))
+        _write_sheet(sheet, sheet_path(year, sheet_name), metadata)
+
+    return {sheet_name: len(sheet) for sheet_name, sheet in sheets.items()}
+
+
+def read_sheet(year, sheet_name, columns=None):
+    """
+    Reads a sheet from the EOY workbook for a year, converting it to Parquet first if it isn't converted yet.
+    If the workbook isn't there, the converted sheet is read as is.
+    Only the requested columns are read from the Parquet file. Some years are missing columns, so requested columns
+    that don't exist in a year's sheet are skipped.
+
+    Parameters:
+    - year (int): The school year (e.g., 2017).
+    - sheet_name (str): Name of the sheet (e.g., 'Course Membership').
+    - columns (list): Names of the columns to read (defaults to all columns).
+
+    Returns:
+    - pd.DataFrame: The sheet's data.
+    """
+    store_path = sheet_path(year, sheet_name)
+
+    if os.path.exists(workbook_path(year)):
+        convert_workbook(year, [sheet_name])
+    elif not os.path.exists(store_path):
+        raise FileNotFoundError(f'Neither {workbook_path(year)} nor {store_path} exists')
+
+    if columns is not None:
+        available = set(pq.read_schema(store_path).names)
+        columns = [column for column in columns if column in available]
+
+    # Always return the stored copy so the first run gets exactly the same dtypes as every later run
+    return pd.read_parquet(store_path, columns=columns)
+
+
+def read_sheets(year, sheet_columns):
+    """
+    Reads several sheets from the EOY workbook for a year (e.g., as the worker function for map_years).
+
+    Parameters:
+    - year (int): The school year (e.g., 2017).
+    - sheet_columns (dict): Sheet name -> names of the columns to read from it (None reads all columns).
+
+    Returns:
+    - dict: Sheet name -> pd.DataFrame.
+    """
+    if os.path.exists(workbook_path(year)):
+        convert_workbook(year, list(sheet_columns))
+    return {sheet_name: read_sheet(year, sheet_name, columns) for sheet_name, columns in sheet_columns.items()}
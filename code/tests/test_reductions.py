@@ -0,0 +1,88 @@
+# Check that the indicators and grids 02, 05 and 06 make with src/reductions.py match the Python lambdas they replaced
+#
+# Run from the project root: `uv run python -m unittest discover -s code/tests -t code`
+# The data comes from the seeded simulator (see src/simulate.py), so every run checks the same courses and students.
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.courses import course_is_advanced, is_advanced
+from src.reductions import indicator_per_key, presence_grid
+from src.schemas import student_key
+from src.simulate import extracurricular_titles, simulate_population, simulate_year
+
+year = 2024
+
+
+def simulated_courses(seed=2025, scale=0.1):
+    """
+    Simulates one year and joins Course Membership with Course Master, with the 0/1 flags 02 and 05 reduce.
+
+    Returns:
+    - pd.DataFrame, pd.DataFrame: The joined courses (student_number, teacher_id, school_number, advanced_course,
+      is_extracurricular) and the year's student numbers.
+    """
+    population_seed, year_seed = np.random.SeedSequence(seed).spawn(2)
+    population = simulate_population(np.random.default_rng(population_seed), [year], scale)
+    sheets = simulate_year(population, year, year_seed, scale)
+
+    master = sheets['Course Master'].copy()
+    master['course_advanced'] = course_is_advanced(master, normalize_titles=True)
+    extracurricular = master.loc[master['CourseTitle'].isin(extracurricular_titles), 'CourseNumber'].astype(str)
+
+    membership = sheets['Course Membership'][['StudentNumber', 'CourseRecordID', 'CourseNumber', 'ConcurrEnrolled']]
+    courses = pd.merge(
+        membership, master[['CourseRecordID', 'Teacher1ID', 'SchoolNumber', 'course_advanced']], on='CourseRecordID', how='left'
+    )
+    courses = courses.rename(columns={'StudentNumber': 'student_number', 'Teacher1ID': 'teacher_id', 'SchoolNumber': 'school_number'})
+    courses['student_number'] = student_key(courses['student_number'])
+    courses['advanced_course'] = is_advanced(courses['course_advanced'], courses['ConcurrEnrolled']).astype(int)
+    courses['is_extracurricular'] = courses['CourseNumber'].astype(str).isin(extracurricular).astype(int)
+
+    students = student_key(sheets['Student']['StudentNumber']).rename('student_number')
+    return courses, students
+
+
+class TestIndicatorReductions(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.courses, cls.students = simulated_courses()
+
+    def test_data_has_both_values(self):
+        # The comparisons below only mean something if some groups are 1 and others 0
+        for column in ['advanced_course', 'is_extracurricular']:
+            self.assertEqual(set(self.courses[column].unique()), {0, 1})
+
+    def test_student_indicators(self):
+        # ac_ind/ac_count and extracurricular_ind/extracurricular_count in 02_academic-table.py
+        for column, name, count_name in [('advanced_course', 'ac_ind', 'ac_count'),
+                                         ('is_extracurricular', 'extracurricular_ind', 'extracurricular_count')]:
+            expected = self.courses.groupby('student_number', as_index=False).agg(
+                **{name: (column, lambda x: 1 if x.sum() > 0 else 0), count_name: (column, 'sum')}
+            )
+            result = indicator_per_key(self.courses, column, name, count_name=count_name)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_teacher_indicator(self):
+        # teacher_ac_ind in 05_teacher-table.py
+        expected = self.courses.groupby('teacher_id', as_index=False).agg(
+            teacher_ac_ind=('advanced_course', lambda x: 1 if x.sum() > 0 else 0)
+        )
+        result = indicator_per_key(self.courses, 'advanced_course', 'teacher_ac_ind', key='teacher_id')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_school_grid(self):
+        # school_grid in 06_school-table.py: every student of the year, including those without courses (no school)
+        student_school = pd.merge(
+            self.students.to_frame(), self.courses[['student_number', 'school_number']], on='student_number', how='left'
+        )
+        expected = student_school.pivot_table(
+            index='student_number', columns='school_number', values='school_number', aggfunc=lambda x: 1, fill_value=0
+        )
+        result = presence_grid(student_school, 'student_number', 'school_number')
+        pd.testing.assert_frame_equal(result, expected, check_names=False)
+
+if __name__ == '__main__':
+    unittest.main()